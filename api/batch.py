@@ -0,0 +1,326 @@
+"""
+batch.py — Simulations en lot pour POST /simulate/batch
+-------------------------------------------------------
+
+Le corps de la requête est une liste JSON de SimulationRequest, ou un
+flux NDJSON (Content-Type: application/x-ndjson, une requête par ligne).
+Il est d'abord recopié dans un fichier temporaire (en mémoire jusqu'à
+SPOOL_MEMORY octets, sur disque au-delà), puis traité par fenêtres de
+WINDOW requêtes :
+
+    1) validation (SimulationRequest) et regroupement par tracteur,
+       machine et options non vectorisables (pneu, chargeur, profil…)
+    2) un calcul vectorisé par groupe : pentes, vitesse, virage,
+       accélération et masses additionnelles (ARRAY_OPTIONS) varient
+       d'une requête à l'autre dans le même appel
+       (cg.compute_local_CG_batch + batch.evaluate_mode)
+    3) une ligne NDJSON par requête, dans l'ordre d'entrée
+
+Comme POST /simulate (result_cache.ResultCache.solve), les flottants
+des options et de l'environnement sont arrondis à `decimals` décimales
+avant le calcul, et les masses additionnelles sont regroupées en un
+élément (cg.extra_elements_batch) : les lignes sont identiques aux
+réponses de /simulate.
+
+La mémoire utilisée dépend de WINDOW, pas de la taille du lot : une
+liste JSON est elle aussi décodée élément par élément, par blocs de
+CHUNK octets du fichier temporaire (cf. iter_array).
+
+Ligne de résultat (arrondis de POST /simulate) :
+
+    {"index", "tractor_name", "machine_name",
+     "transport" / "work": {mass_total, I_lat, I_long, I_static,
+                            I_lat_dyn, I_long_dyn, I_dynamic,
+                            FL, FR, RL, RR, status},
+     "compatible": aucun critère DANGER dans les deux modes}
+
+Ligne d'erreur : {"index", "status_code" (404 / 422 / 500), "detail"}.
+"""
+
+import codecs
+import json
+import re
+from tempfile import SpooledTemporaryFile
+
+import numpy as np
+from pydantic import ValidationError
+
+from solver_v19.batch import evaluate_mode, ENV_KEYS
+from solver_v19.cg import compute_local_CG_batch
+from solver_v19.compiled import compile_config, validate_inputs, BALLAST_OPTIONS, MODES
+from solver_v19.pipeline import fingerprint
+from solver_v19.result_cache import quantize
+from solver_v19.rules import STATUS_DANGER, STATUS_LABELS
+
+from .models import SimulationRequest
+
+
+WINDOW = 256
+
+SPOOL_MEMORY = 1 << 20
+
+CHUNK = 1 << 16
+
+_BLANK = re.compile(r"[ \t\n\r]*")
+_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*")
+
+ARRAY_OPTIONS = BALLAST_OPTIONS + ("water_ballast",)
+
+# Colonne → nombre de décimales (comme POST /simulate)
+COLUMNS = {
+    "mass_total": 2,
+    "I_lat": 4, "I_long": 4, "I_static": 4,
+    "I_lat_dyn": 4, "I_long_dyn": 4, "I_dynamic": 4,
+    "FL": 1, "FR": 1, "RL": 1, "RR": 1,
+}
+
+
+# -----------------------------------------------------------
+# Lecture du corps
+# -----------------------------------------------------------
+
+async def spool_body(request):
+    """Recopie le corps de la requête HTTP dans un fichier temporaire."""
+    spool = SpooledTemporaryFile(max_size=SPOOL_MEMORY)
+    async for chunk in request.stream():
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+
+def iter_array(spool, chunk_size=CHUNK):
+    """
+    Éléments d'une liste JSON lus par blocs du fichier temporaire
+    (json.JSONDecoder.raw_decode) : la mémoire est bornée par le plus
+    gros élément, pas par la taille de la liste.
+
+    Lève ValueError si le corps n'est pas une liste ; une erreur de
+    syntaxe après le début de la liste est produite comme élément
+    (json.JSONDecodeError) et termine la lecture.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8-sig")()
+    text, pos, eof = "", 0, False
+    state = "open"                      # open → first / item ⇄ next → closed
+
+    while True:
+        pos = _BLANK.match(text, pos).end()
+        item = end = None
+        decoding = pos < len(text) and (state == "item" or state == "first" and text[pos] != "]")
+        if decoding:
+            try:
+                item, end = decoder.raw_decode(text, pos)
+            except json.JSONDecodeError as e:
+                if eof:
+                    yield e
+                    return
+
+        # Bloc suivant : texte épuisé, élément incomplet, ou élément suivi
+        # jusqu'à la fin du bloc de caractères qui pourraient prolonger
+        # un nombre (ex. "0." | "1")
+        if not eof and (pos == len(text) or decoding and (
+                end is None or _NUMBER_TAIL.match(text, end).end() == len(text))):
+            chunk = spool.read(max(chunk_size, len(text) - pos))
+            eof = not chunk
+            try:
+                text = text[pos:] + utf8.decode(chunk, final=eof)
+            except UnicodeDecodeError as e:
+                if state == "open":
+                    raise ValueError(f"JSON invalide : {e}")
+                yield json.JSONDecodeError(f"UTF-8 invalide ({e.reason})", text, pos)
+                return
+            pos = 0
+            continue
+        if pos == len(text):
+            break
+
+        char = text[pos]
+        if state == "open":
+            if char != "[":
+                raise ValueError("Liste de requêtes attendue (ou flux NDJSON)")
+            pos += 1
+            state = "first"
+        elif char == "]" and state in ("first", "next"):
+            pos += 1
+            state = "closed"
+        elif state == "next" and char == ",":
+            pos += 1
+            state = "item"
+        elif end is not None:
+            yield item
+            pos = end
+            state = "next"
+        else:
+            yield json.JSONDecodeError("Élément, ',' ou ']' attendu", text, pos)
+            return
+
+    if state == "open":
+        raise ValueError("Liste de requêtes attendue (ou flux NDJSON)")
+    if state != "closed":
+        yield json.JSONDecodeError("Liste non terminée", text, pos)
+
+
+def iter_items(spool, ndjson):
+    """
+    (index, objet JSON) pour chaque requête du lot ; l'objet est une
+    exception si la ligne NDJSON (ou la suite de la liste) n'est pas du
+    JSON valide.
+
+    Lève ValueError si une liste JSON est attendue et absente.
+    """
+    if not ndjson:
+        yield from enumerate(iter_array(spool))
+        return
+
+    index = 0
+    for line in spool:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield index, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield index, e
+        index += 1
+
+
+def iter_windows(items, size=WINDOW):
+    """Découpe le flux de requêtes en fenêtres de `size` éléments."""
+    window = []
+    for item in items:
+        window.append(item)
+        if len(window) >= size:
+            yield window
+            window = []
+    if window:
+        yield window
+
+
+# -----------------------------------------------------------
+# Calcul d'une fenêtre
+# -----------------------------------------------------------
+
+def _error(index, status_code, detail):
+    return {"index": index, "status_code": status_code, "detail": detail}
+
+
+def _prepare(index, payload, catalog, decimals=None):
+    """
+    Valide une requête : {"index", "key" (groupe), "request", "tractor",
+    "machine", "loader", "options", "env"}, ou ligne d'erreur (cf. _error).
+
+    decimals : arrondi des options / env (cf. quantize ; None : aucun)
+    """
+    if isinstance(payload, Exception):
+        return _error(index, 422, f"JSON invalide : {payload}")
+    try:
+        request = SimulationRequest.model_validate(payload)
+    except ValidationError as e:
+        return _error(index, 422, f"Requête invalide : {e.errors(include_url=False)}")
+
+    if request.tractor_name not in catalog["tractors"]:
+        return _error(index, 404, f"Tracteur '{request.tractor_name}' introuvable")
+    if request.machine_name not in catalog["machines"]:
+        return _error(index, 404, f"Machine '{request.machine_name}' introuvable")
+
+    tractor = catalog["tractors"][request.tractor_name]
+    machine = catalog["machines"][request.machine_name]
+
+    loader = None
+    if request.options.loader_enabled:
+        loader = catalog["loaders"].select(tractor["mass"])
+
+    options = request.options.model_dump()
+    env = request.environment.model_dump()
+    if decimals is not None:
+        options = quantize(options, decimals)
+        env = quantize(env, decimals)
+    options["loader"] = loader
+    try:
+        validate_inputs(tractor, machine, loader, catalog["tires"], options)
+    except ValueError as e:
+        return _error(index, 422, f"Configuration invalide : {e}")
+
+    key = (request.tractor_name, request.machine_name, fingerprint(
+        {k: v for k, v in options.items() if k not in ARRAY_OPTIONS and k != "loader"}
+    ))
+    return {"index": index, "key": key, "request": request, "tractor": tractor,
+            "machine": machine, "loader": loader, "options": options, "env": env}
+
+
+def _evaluate_group(members, tires):
+    """
+    Un calcul vectorisé pour des requêtes qui ne diffèrent que par
+    l'environnement et les masses additionnelles.
+    """
+    first = members[0]
+    n = len(members)
+
+    options = {
+        **first["options"],
+        **{k: np.array([m["options"][k] for m in members]) for k in ARRAY_OPTIONS},
+    }
+    env = {k: np.array([m["env"][k] for m in members], dtype=float) for k in ENV_KEYS}
+
+    cfg = compile_config(first["tractor"], first["machine"], first["loader"], tires,
+                         options, extras=False)
+
+    blocks = {}
+    compatible = np.ones(n, dtype=bool)
+    for mode in MODES:
+        MT, X, Y, Z = compute_local_CG_batch(cfg, options, mode)
+        cols, codes = evaluate_mode(cfg, MT, X, Y, Z, env)
+        worst = np.broadcast_to(codes.max(axis=0), (n,))
+        compatible &= worst != STATUS_DANGER
+
+        # round() Python (arrondi décimal exact, comme POST /simulate) et
+        # non ndarray.round (mise à l'échelle : diffère sur les demi-valeurs)
+        values = {k: [round(v, d) for v in np.broadcast_to(cols[k], (n,)).tolist()]
+                  for k, d in COLUMNS.items()}
+        status = [STATUS_LABELS.get(int(code), "—") for code in worst]
+        blocks[mode] = [
+            {**{k: values[k][i] for k in COLUMNS}, "status": status[i]}
+            for i in range(n)
+        ]
+
+    return [
+        {
+            "index": m["index"],
+            "tractor_name": m["request"].tractor_name,
+            "machine_name": m["request"].machine_name,
+            **{mode: blocks[mode][i] for mode in MODES},
+            "compatible": bool(compatible[i]),
+        }
+        for i, m in enumerate(members)
+    ]
+
+
+def evaluate_window(window, catalog, decimals=None):
+    """
+    Résultats (une ligne par requête, ordre d'entrée) d'une fenêtre
+    [(index, objet JSON)].
+
+    catalog  : {"tractors", "machines", "tires", "loaders" (registre)}
+    decimals : arrondi des entrées de POST /simulate (ResultCache.decimals)
+    """
+    rows = {}
+    groups = {}
+    for index, payload in window:
+        prepared = _prepare(index, payload, catalog, decimals)
+        if "detail" in prepared:
+            rows[index] = prepared
+        else:
+            groups.setdefault(prepared["key"], []).append(prepared)
+
+    for members in groups.values():
+        try:
+            for row in _evaluate_group(members, catalog["tires"]):
+                rows[row["index"]] = row
+        except ValueError as e:
+            for m in members:
+                rows[m["index"]] = _error(m["index"], 422, f"Configuration invalide : {e}")
+        except Exception as e:
+            for m in members:
+                rows[m["index"]] = _error(m["index"], 500, f"Erreur solver : {e}")
+
+    return [rows[index] for index, _ in window]
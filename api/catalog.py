@@ -0,0 +1,226 @@
+"""
+catalog.py — Requêtes indexées sur GET /tractors et GET /machines
+------------------------------------------------------------------
+
+Les listes du catalogue sont construites UNE fois au démarrage
+(résumés + index), puis chaque requête ne lit que les entrées
+sélectionnées :
+
+    index d'intervalle   valeurs triées (bisect) : mass, ptac,
+                         wheelbase, track_front, track_rear,
+                         portee_horizontale, puissance_tracteur_mini
+                         → O(log n) + nombre d'entrées retenues
+    index de catégorie   {valeur normalisée: positions} : brand, gamme
+                         (insensible à la casse, plusieurs valeurs = OU)
+
+Les filtres se combinent en ET. Les entrées sans valeur pour un filtre
+actif sont exclues.
+
+Pagination par curseur : les entrées sont triées par clé ; `next_cursor`
+est la clé de la dernière entrée renvoyée (None en fin de liste) et se
+repasse tel quel via `cursor`. `fields` restreint les champs renvoyés
+(`key` toujours inclus).
+
+CatalogIndex.query() : {"total" (entrées filtrées), "next_cursor",
+"items": [...]}. Sans pagination demandée (ni `cursor` ni `limit`), l'API
+renvoie seulement la liste `items` (format historique des listes).
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+
+
+MAX_LIMIT = 1000
+
+
+# -----------------------------------------------------------
+# Résumés renvoyés par les listes
+# -----------------------------------------------------------
+
+def tractor_summary(key, t):
+    """Infos principales d'un tracteur (GET /tractors)."""
+    return {
+        "key":            key,
+        "name":           t.get("name"),
+        "brand":          t.get("brand"),
+        "model":          t.get("model"),
+        "mass":           t.get("mass"),
+        "mass_front_pct": t.get("mass_front_pct"),
+        "mass_rear_pct":  t.get("mass_rear_pct"),
+        "ptac":           t.get("ptac"),
+        "wheelbase":      t.get("geometry", {}).get("wheelbase"),
+        "track_front":    t.get("geometry", {}).get("track_front"),
+        "track_rear":     t.get("geometry", {}).get("track_rear"),
+        "tire_defaults":  t.get("tire_defaults"),
+        "dynamics":       t.get("dynamics"),
+    }
+
+
+def machine_summary(key, m):
+    """Infos principales d'une machine (GET /machines)."""
+    entry = {
+        "key":   key,
+        "model": m.get("model"),
+        "mass":  m.get("mass"),
+    }
+    for field in ("brand", "gamme", "portee_horizontale", "portee_verticale", "puissance_tracteur_mini"):
+        if m.get(field) is not None:
+            entry[field] = m[field]
+    return entry
+
+
+def power_cv(value):
+    """Puissance en CV d'une valeur du catalogue ("80 CV", 80) ; None si absente."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        match = re.search(r"\d+(?:[.,]\d+)?", value)
+        if match:
+            return float(match.group().replace(",", "."))
+    return None
+
+
+def _number(value):
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+def _field(name):
+    return lambda entry: _number(entry.get(name))
+
+
+TRACTOR_RANGES = {name: _field(name) for name in ("mass", "ptac", "wheelbase", "track_front", "track_rear")}
+TRACTOR_CATEGORIES = ("brand",)
+
+MACHINE_RANGES = {
+    "mass":                    _field("mass"),
+    "portee_horizontale":      _field("portee_horizontale"),
+    "puissance_tracteur_mini": lambda entry: power_cv(entry.get("puissance_tracteur_mini")),
+}
+MACHINE_CATEGORIES = ("brand", "gamme")
+
+
+# -----------------------------------------------------------
+# Index
+# -----------------------------------------------------------
+
+def _normalize(value):
+    return str(value).strip().casefold()
+
+
+class CatalogIndex:
+    """Résumés triés par clé + index d'intervalle et de catégorie."""
+
+    def __init__(self, entries, ranges, categories):
+        """
+        entries    : {clé: résumé}
+        ranges     : {filtre: fonction résumé → float ou None}
+        categories : champs des résumés filtrés par égalité
+        """
+        self.keys = sorted(entries)
+        self.entries = [entries[k] for k in self.keys]
+        self.position = {k: i for i, k in enumerate(self.keys)}
+        self.fields = {field for entry in self.entries for field in entry}
+
+        # {filtre: (valeurs triées, positions correspondantes)}
+        self.ranges = {}
+        for name, value_of in ranges.items():
+            pairs = sorted(
+                (value, i) for i, entry in enumerate(self.entries)
+                if (value := value_of(entry)) is not None
+            )
+            self.ranges[name] = ([v for v, _ in pairs], [i for _, i in pairs])
+
+        # {champ: {valeur normalisée: positions}}
+        self.categories = {}
+        for name in categories:
+            index = {}
+            for i, entry in enumerate(self.entries):
+                if entry.get(name) is not None:
+                    index.setdefault(_normalize(entry[name]), []).append(i)
+            self.categories[name] = index
+
+    def in_range(self, name, lo=None, hi=None):
+        """Positions des entrées dont la valeur `name` est dans [lo, hi]."""
+        values, positions = self.ranges[name]
+        start = 0 if lo is None else bisect_left(values, lo)
+        stop = len(values) if hi is None else bisect_right(values, hi)
+        return positions[start:stop]
+
+    def in_category(self, name, values):
+        """Positions des entrées dont le champ `name` vaut l'une des `values`."""
+        index = self.categories[name]
+        return [i for value in values for i in index.get(_normalize(value), ())]
+
+    def query(self, ranges=None, categories=None, cursor=None, limit=100, fields=None):
+        """
+        Une page de résumés filtrés.
+
+        ranges     : {filtre: (min, max)} (None = borne ouverte)
+        categories : {champ: [valeurs]} (liste vide ou None = pas de filtre)
+        cursor     : clé de la dernière entrée de la page précédente
+        fields     : champs renvoyés (None = tous)
+
+        Lève ValueError pour un filtre, un champ ou un curseur inconnu.
+        """
+        selected = None
+
+        def restrict(found):
+            nonlocal selected
+            found = set(found)
+            selected = found if selected is None else selected & found
+
+        for name, (lo, hi) in (ranges or {}).items():
+            if name not in self.ranges:
+                raise ValueError(f"Filtre inconnu : {name}")
+            if lo is not None or hi is not None:
+                restrict(self.in_range(name, lo, hi))
+        for name, values in (categories or {}).items():
+            if name not in self.categories:
+                raise ValueError(f"Filtre inconnu : {name}")
+            if values:
+                restrict(self.in_category(name, values))
+
+        if fields is not None:
+            unknown = sorted(set(fields) - self.fields)
+            if unknown:
+                raise ValueError(f"Champs inconnus : {', '.join(unknown)} "
+                                 f"(disponibles : {', '.join(sorted(self.fields))})")
+            fields = ["key", *(f for f in fields if f != "key")]
+
+        positions = range(len(self.keys)) if selected is None else sorted(selected)
+
+        start = 0
+        if cursor is not None:
+            if cursor not in self.position:
+                raise ValueError(f"Curseur inconnu : '{cursor}'")
+            start = bisect_right(positions, self.position[cursor])
+        page = positions[start:start + limit]
+
+        items = [self.entries[i] for i in page]
+        if fields is not None:
+            items = [{f: entry[f] for f in fields if f in entry} for entry in items]
+
+        return {
+            "total": len(positions),
+            "next_cursor": self.keys[page[-1]] if start + limit < len(positions) else None,
+            "items": items,
+        }
+
+
+def tractor_index(tractors):
+    """Index de GET /tractors pour {clé: JSON tracteur}."""
+    return CatalogIndex({k: tractor_summary(k, t) for k, t in tractors.items()},
+                        TRACTOR_RANGES, TRACTOR_CATEGORIES)
+
+
+def machine_index(machines):
+    """Index de GET /machines pour {clé: JSON machine}."""
+    return CatalogIndex({k: machine_summary(k, m) for k, m in machines.items()},
+                        MACHINE_RANGES, MACHINE_CATEGORIES)
+
+
+def parse_fields(fields):
+    """Paramètre `fields` ("key,name,mass") → liste de champs (None si absent)."""
+    if fields is None:
+        return None
+    return [f.strip() for f in fields.split(",") if f.strip()]
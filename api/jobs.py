@@ -0,0 +1,510 @@
+"""
+jobs.py — File de tâches longues (balayages catalogue) pour l'API
+-----------------------------------------------------------------
+
+Un balayage du catalogue complet dépasse largement la durée d'une requête
+HTTP synchrone. POST /jobs enregistre une tâche, découpée en paquets de
+tracteurs (chunks), et rend la main immédiatement ; GET /jobs/{id} suit
+l'avancement.
+
+Types de tâches (JobQueue.submit) :
+
+    "sweep"    sweep.sweep_catalog          (indices, charges, statut)
+    "payload"  payload.max_payload_catalog  (charge maximale du godet)
+
+Architecture, sans broker externe :
+
+    SQLite (jobs.sqlite)   tables jobs et chunks : la file elle-même
+    ProcessPoolExecutor    workers avec le catalogue compilé préchargé
+                           (initializer, instantané snapshot.py) ; un
+                           paquet = un appel
+    fil de répartition     réclame les paquets "queued", les soumet au
+                           pool, enregistre les fins de paquet
+    résultats              un fichier pickle par paquet dans
+                           <dossier>/<job>/<paquet>.pkl (table en colonnes,
+                           noms tracteur / machine / pneu en clair)
+
+Robustesse :
+    - un worker qui meurt (BrokenProcessPool) : le pool est recréé et les
+      paquets en cours sont remis dans la file, jusqu'à MAX_ATTEMPTS
+      tentatives
+    - un redémarrage de l'API : les paquets restés "running" sont remis
+      dans la file à l'ouverture
+    - annulation : les paquets en attente ne sont plus lancés, les
+      résultats des paquets en cours sont ignorés
+    - une erreur inattendue dans le fil de répartition (base verrouillée,
+      disque plein...) est journalisée (logging) ; la boucle reprend
+      après une attente croissante (jusqu'à MAX_BACKOFF secondes)
+
+Rétention : les tâches terminées sont supprimées (base + dossier de
+résultats) RETENTION[état] secondes après leur dernière mise à jour
+(purge() à l'ouverture puis toutes les PURGE_INTERVAL secondes).
+"""
+
+import json
+import logging
+import os
+import pickle
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+import numpy as np
+
+from solver_v19 import snapshot
+from solver_v19.payload import max_payload_catalog
+from solver_v19.sweep import subset_catalog, sweep_catalog
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+KINDS = ("sweep", "payload")
+
+MAX_ATTEMPTS = 3
+
+MAX_BACKOFF = 30.0
+
+JOB_STATES = ("queued", "running", "done", "failed", "cancelled")
+
+# Durée de conservation (s) des tâches terminées, par état (None = illimitée)
+RETENTION = {
+    "done":      7 * 24 * 3600,
+    "failed":    24 * 3600,
+    "cancelled": 24 * 3600,
+}
+
+PURGE_INTERVAL = 600.0
+
+log = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id       TEXT PRIMARY KEY,
+    kind     TEXT NOT NULL,
+    spec     TEXT NOT NULL,
+    state    TEXT NOT NULL,
+    error    TEXT,
+    created  REAL NOT NULL,
+    updated  REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    job_id    TEXT NOT NULL,
+    idx       INTEGER NOT NULL,
+    tractors  TEXT NOT NULL,
+    state     TEXT NOT NULL,
+    attempts  INTEGER NOT NULL DEFAULT 0,
+    rows      INTEGER,
+    error     TEXT,
+    PRIMARY KEY (job_id, idx)
+);
+"""
+
+
+# -----------------------------------------------------------
+# Côté worker (processus du pool)
+# -----------------------------------------------------------
+
+_CATALOG = None
+
+
+def load_catalog(root=ROOT):
+    """
+    Catalogue compilé (sweep.compile_catalog), projeté en mémoire depuis
+    l'instantané du catalogue (pages partagées entre workers).
+    """
+    return snapshot.load_catalog(root).compiled
+
+
+def _init_worker(root):
+    """Initializer du pool : catalogue compilé une fois par processus."""
+    global _CATALOG
+    _CATALOG = load_catalog(root)
+
+
+def _indices(keys, names):
+    position = {k: i for i, k in enumerate(keys)}
+    return [position[name] for name in names]
+
+
+def run_chunk(kind, spec, tractors, output):
+    """
+    Exécute un paquet (liste de noms de tracteurs) et écrit sa table
+    dans `output` ; retourne le nombre de lignes.
+    """
+    catalog = _CATALOG if _CATALOG is not None else load_catalog()
+    machines = spec.get("machines")
+    sub = subset_catalog(
+        catalog,
+        tractors=_indices(catalog["tractor_keys"], tractors),
+        machines=None if machines is None else _indices(catalog["machine_keys"], machines),
+    )
+
+    if kind == "sweep":
+        table = sweep_catalog(sub, spec.get("options"), spec.get("environment"))
+    else:
+        table = max_payload_catalog(sub, spec.get("options"), spec.get("environment"),
+                                    **spec.get("parameters", {}))
+
+    # Indices du sous-catalogue → noms
+    for axis in ("tractor", "machine", "tire"):
+        table[axis] = np.asarray(sub[f"{axis}_keys"], dtype=object)[table[axis]]
+
+    tmp = f"{output}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(table, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, output)
+    return len(table["tractor"])
+
+
+# -----------------------------------------------------------
+# File de tâches (processus de l'API)
+# -----------------------------------------------------------
+
+class JobQueue:
+    """Tâches et paquets dans SQLite, exécutés par un pool de processus."""
+
+    def __init__(self, directory, workers=None, root=ROOT, retention=None):
+        """
+        directory : dossier de la base (jobs.sqlite) et des résultats
+        workers   : taille du pool (défaut : nombre de CPU)
+        retention : {état: secondes}, fusionné avec RETENTION
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.directory / "jobs.sqlite"
+        self.workers = workers or os.cpu_count() or 1
+        self.root = root
+        self.retention = {**RETENTION, **(retention or {})}
+        self.next_purge = 0.0
+
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread = None
+        self.pool = None
+
+        db = sqlite3.connect(str(self.db_path), timeout=30)
+        db.execute("PRAGMA journal_mode = WAL")
+        db.executescript(SCHEMA)
+        db.close()
+
+        with self._db() as db:
+            # Paquets interrompus par un arrêt de l'API → remis dans la file
+            db.execute("UPDATE chunks SET state = 'queued' WHERE state = 'running'")
+            pending = db.execute(
+                "SELECT COUNT(*) FROM chunks WHERE state = 'queued'"
+            ).fetchone()[0]
+        self.purge()
+        if pending:
+            self.start()
+
+    def _db(self):
+        db = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        return _Transaction(db)
+
+    # -------------------------------------------------------
+    # API publique
+    # -------------------------------------------------------
+
+    def submit(self, kind, spec, tractors, chunk_size=4):
+        """
+        Enregistre une tâche : `tractors` (noms) découpés en paquets de
+        `chunk_size`. Retourne l'identifiant de la tâche.
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Type de tâche inconnu : {kind!r} (attendus : {', '.join(KINDS)})")
+        if not tractors:
+            raise ValueError("Aucun tracteur à évaluer")
+        if not int(chunk_size) > 0:
+            raise ValueError(f"chunk_size doit être > 0 (reçu {chunk_size!r})")
+
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        chunks = [tractors[i:i + chunk_size] for i in range(0, len(tractors), chunk_size)]
+
+        (self.directory / job_id).mkdir()
+        with self._db() as db:
+            db.execute(
+                "INSERT INTO jobs (id, kind, spec, state, created, updated) VALUES (?, ?, ?, 'queued', ?, ?)",
+                (job_id, kind, json.dumps(spec), now, now),
+            )
+            db.executemany(
+                "INSERT INTO chunks (job_id, idx, tractors, state) VALUES (?, ?, ?, 'queued')",
+                [(job_id, i, json.dumps(names)) for i, names in enumerate(chunks)],
+            )
+        self.start()
+        self.wakeup.set()
+        return job_id
+
+    def status(self, job_id):
+        """État et avancement d'une tâche (None si inconnue)."""
+        with self._db() as db:
+            job = db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if job is None:
+                return None
+            counts = dict(db.execute(
+                "SELECT state, COUNT(*) FROM chunks WHERE job_id = ? GROUP BY state", (job_id,)
+            ).fetchall())
+            rows = db.execute(
+                "SELECT COALESCE(SUM(rows), 0) FROM chunks WHERE job_id = ?", (job_id,)
+            ).fetchone()[0]
+
+        total = sum(counts.values())
+        return {
+            "id": job["id"],
+            "kind": job["kind"],
+            "state": job["state"],
+            "error": job["error"],
+            "created": job["created"],
+            "updated": job["updated"],
+            "chunks": {"total": total,
+                       **{state: counts.get(state, 0) for state in JOB_STATES}},
+            "progress": counts.get("done", 0) / total if total else 0.0,
+            "rows": rows,
+        }
+
+    def cancel(self, job_id):
+        """Annule une tâche en attente ou en cours ; retourne son état."""
+        with self._db() as db:
+            job = db.execute("SELECT state FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if job is None:
+                return None
+            if job["state"] in ("queued", "running"):
+                db.execute("UPDATE jobs SET state = 'cancelled', updated = ? WHERE id = ?",
+                           (time.time(), job_id))
+                db.execute("UPDATE chunks SET state = 'cancelled' "
+                           "WHERE job_id = ? AND state IN ('queued', 'running')", (job_id,))
+        return self.status(job_id)
+
+    def results(self, job_id, offset=0, limit=1000):
+        """
+        Lignes [offset, offset + limit) de la table résultat (paquets
+        terminés, dans l'ordre) : {"total", "offset", "rows": [...]}.
+        """
+        with self._db() as db:
+            chunks = db.execute(
+                "SELECT idx, rows FROM chunks WHERE job_id = ? AND state = 'done' ORDER BY idx",
+                (job_id,),
+            ).fetchall()
+
+        total = sum(c["rows"] for c in chunks)
+        rows = []
+        start = 0
+        for chunk in chunks:
+            stop = start + chunk["rows"]
+            if stop > offset and start < offset + limit:
+                with open(self._output(job_id, chunk["idx"]), "rb") as f:
+                    table = pickle.load(f)
+                lo = max(offset - start, 0)
+                hi = min(offset + limit - start, chunk["rows"])
+                rows += _rows(table, lo, hi)
+            start = stop
+        return {"total": total, "offset": offset, "rows": rows}
+
+    def purge(self, now=None):
+        """
+        Supprime les tâches terminées plus anciennes que leur durée de
+        rétention (lignes + dossier de résultats) ; retourne leurs
+        identifiants.
+        """
+        now = time.time() if now is None else now
+        self.next_purge = time.monotonic() + PURGE_INTERVAL
+        expired = []
+        with self._db() as db:
+            for state, seconds in self.retention.items():
+                if seconds is None or state not in ("done", "failed", "cancelled"):
+                    continue
+                ids = [row["id"] for row in db.execute(
+                    "SELECT id FROM jobs WHERE state = ? AND updated < ?", (state, now - seconds))]
+                db.executemany("DELETE FROM chunks WHERE job_id = ?", [(i,) for i in ids])
+                db.executemany("DELETE FROM jobs WHERE id = ?", [(i,) for i in ids])
+                expired += ids
+        for job_id in expired:
+            shutil.rmtree(self.directory / job_id, ignore_errors=True)
+        return expired
+
+    def close(self):
+        """Arrête le fil de répartition et le pool (tests, arrêt de l'API)."""
+        thread = self.thread
+        self.thread = None
+        self.wakeup.set()
+        if thread is not None:
+            thread.join()
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    # -------------------------------------------------------
+    # Répartition
+    # -------------------------------------------------------
+
+    def start(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._dispatch, name="jobs", daemon=True)
+                self.thread.start()
+
+    def _output(self, job_id, idx):
+        return self.directory / job_id / f"{idx:05d}.pkl"
+
+    def _new_pool(self):
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                   initargs=(self.root,))
+
+    def _claim(self, n):
+        """Passe jusqu'à n paquets "queued" à "running" (ordre d'arrivée)."""
+        with self._db() as db:
+            rows = db.execute(
+                "SELECT c.job_id, c.idx, c.tractors, j.kind, j.spec FROM chunks c "
+                "JOIN jobs j ON j.id = c.job_id "
+                "WHERE c.state = 'queued' AND j.state IN ('queued', 'running') "
+                "ORDER BY j.created, c.idx LIMIT ?", (n,),
+            ).fetchall()
+            now = time.time()
+            for row in rows:
+                db.execute("UPDATE chunks SET state = 'running', attempts = attempts + 1 "
+                           "WHERE job_id = ? AND idx = ?", (row["job_id"], row["idx"]))
+                db.execute("UPDATE jobs SET state = 'running', updated = ? "
+                           "WHERE id = ? AND state = 'queued'", (now, row["job_id"]))
+        return rows
+
+    def _finish(self, job_id, idx, rows=None, error=None, crashed=False):
+        """Enregistre la fin d'un paquet et, le cas échéant, de la tâche."""
+        now = time.time()
+        with self._db() as db:
+            chunk = db.execute("SELECT state, attempts FROM chunks WHERE job_id = ? AND idx = ?",
+                               (job_id, idx)).fetchone()
+            if chunk is None or chunk["state"] != "running":
+                return                                  # tâche annulée entre-temps
+
+            if crashed and chunk["attempts"] < MAX_ATTEMPTS:
+                # Worker mort (ou pool cassé avant le lancement) → remis dans la file
+                db.execute("UPDATE chunks SET state = 'queued' WHERE job_id = ? AND idx = ?",
+                           (job_id, idx))
+                return
+
+            if error is None:
+                db.execute("UPDATE chunks SET state = 'done', rows = ? WHERE job_id = ? AND idx = ?",
+                           (rows, job_id, idx))
+                left = db.execute("SELECT COUNT(*) FROM chunks WHERE job_id = ? AND state != 'done'",
+                                  (job_id,)).fetchone()[0]
+                if left == 0:
+                    db.execute("UPDATE jobs SET state = 'done', updated = ? WHERE id = ?",
+                               (now, job_id))
+                else:
+                    db.execute("UPDATE jobs SET updated = ? WHERE id = ?", (now, job_id))
+                return
+
+            db.execute("UPDATE chunks SET state = 'failed', error = ? WHERE job_id = ? AND idx = ?",
+                       (error, job_id, idx))
+            db.execute("UPDATE chunks SET state = 'cancelled' WHERE job_id = ? AND state = 'queued'",
+                       (job_id,))
+            db.execute("UPDATE jobs SET state = 'failed', error = ?, updated = ? WHERE id = ?",
+                       (error, now, job_id))
+
+    def _dispatch(self):
+        """
+        Boucle du fil de répartition. Une erreur inattendue est
+        journalisée puis la boucle reprend après une attente croissante :
+        les paquets en cours restent suivis et seront enregistrés.
+        """
+        running = {}                                    # future → (job_id, idx)
+        backoff = 0.0
+        while self.thread is threading.current_thread():
+            try:
+                self._step(running)
+                backoff = 0.0
+            except Exception:
+                backoff = min(2 * backoff or 0.5, MAX_BACKOFF)
+                log.exception("File de tâches : erreur de répartition (reprise dans %.1f s)",
+                              backoff)
+                self.wakeup.wait(timeout=backoff)
+                self.wakeup.clear()
+
+    def _step(self, running):
+        """Un tour de répartition : purge, lancement puis fin de paquets."""
+        if time.monotonic() >= self.next_purge:
+            self.purge()
+
+        if self.pool is None:
+            self.pool = self._new_pool()
+
+        broken = False
+        for row in self._claim(self.workers - len(running)):
+            if broken:
+                self._finish(row["job_id"], row["idx"], error="Worker interrompu", crashed=True)
+                continue
+            try:
+                future = self.pool.submit(
+                    run_chunk, row["kind"], json.loads(row["spec"]),
+                    json.loads(row["tractors"]), str(self._output(row["job_id"], row["idx"])),
+                )
+            except BrokenProcessPool:
+                broken = True
+                self._finish(row["job_id"], row["idx"], error="Worker interrompu", crashed=True)
+                continue
+            except Exception as e:
+                self._finish(row["job_id"], row["idx"], error=f"{type(e).__name__} : {e}")
+                continue
+            running[future] = (row["job_id"], row["idx"])
+
+        if not running and not broken:
+            self.wakeup.wait(timeout=1.0)
+            self.wakeup.clear()
+            return
+
+        done, _ = wait(running, timeout=0.5, return_when=FIRST_COMPLETED)
+        for future in done:
+            # Retiré de `running` une fois la fin enregistrée seulement
+            job_id, idx = running[future]
+            try:
+                rows = future.result()
+            except BrokenProcessPool:
+                broken = True
+                self._finish(job_id, idx, error="Worker interrompu", crashed=True)
+            except Exception as e:
+                self._finish(job_id, idx, error=f"{type(e).__name__} : {e}")
+            else:
+                self._finish(job_id, idx, rows=rows)
+            del running[future]
+
+        if broken:
+            # Le pool est inutilisable : paquets en cours remis dans la file
+            for future, (job_id, idx) in list(running.items()):
+                self._finish(job_id, idx, error="Worker interrompu", crashed=True)
+                del running[future]
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+
+class _Transaction:
+    """Connexion SQLite utilisée comme bloc transactionnel (puis fermée)."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute("BEGIN IMMEDIATE")
+        return self.db
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.db.close()
+
+
+def _rows(table, lo, hi):
+    """Lignes [lo, hi) d'une table en colonnes (NaN → None)."""
+    columns = {}
+    for name, values in table.items():
+        values = values[lo:hi]
+        if values.dtype.kind == "f":
+            values = np.where(np.isnan(values), None, values).astype(object)
+        columns[name] = values.tolist()
+    return [dict(zip(columns, row)) for row in zip(*columns.values())]
@@ -4,35 +4,79 @@ main.py — API FastAPI du simulateur de stabilité
 
 Endpoints :
     GET  /                      → health check
-    GET  /tractors              → liste des tracteurs disponibles
-    GET  /machines              → liste des machines disponibles
+    GET  /tractors              → liste des tracteurs (filtres, pagination par curseur)
+    GET  /machines              → liste des machines (filtres, pagination par curseur)
     GET  /tires                 → liste des pneus disponibles
+    GET  /rules                 → profils de règles de compatibilité
     GET  /tractors/{name}       → données complètes d'un tracteur
-    POST /simulate              → lancer une simulation complète
+    POST /simulate              → lancer une simulation complète (tous les cas de charge)
+    POST /simulate/batch        → lot de simulations (liste JSON ou NDJSON), réponse NDJSON en flux
+    POST /simulate/montecarlo   → probabilités de non-compatibilité (incertitudes catalogue)
+    POST /ballast               → lestage minimal rendant la configuration compatible
+    POST /tires/search          → pneus arrière classés par marge de stabilité
+    POST /simulate/polar        → stabilité selon le cap sur un versant (carte polaire)
+    POST /simulate/reach        → enveloppe de portée du bras (zones sûres par critère)
+    POST /simulate/lift         → courbe de levage du chargeur (levage maximal compatible)
+    POST /simulate/approx       → réponse approchée instantanée (surface de réponse interpolée)
+    POST /jobs                  → tâche longue (balayage catalogue) exécutée en arrière-plan
+    GET  /jobs/{id}             → état et avancement d'une tâche
+    GET  /jobs/{id}/result      → lignes de la table résultat (pagination)
+    POST /jobs/{id}/cancel      → annulation d'une tâche
+    GET  /pipeline/stats        → compteurs hits / misses du pipeline
+    GET  /surface/stats         → compteurs du cache de surfaces de réponse
+    GET  /cache/stats           → compteurs du cache de résultats de /simulate
 
 Usage :
     uvicorn api.main:app --reload
+
+Variables d'environnement :
+    SIMULATEUR_RESULT_CACHE   base SQLite du cache de résultats de
+                              /simulate (conservé entre redémarrages)
+    SIMULATEUR_JOBS_DIR       dossier de la file de tâches et de leurs
+                              résultats (défaut : <tmp>/simulateur_jobs)
+    SIMULATEUR_JOBS_WORKERS   nombre de processus de calcul des tâches
 """
 
 import os
 import sys
 import json
 import glob
+import itertools
+import tempfile
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 
 # --- Résolution des chemins ---
 # L'API est dans api/, le solver est à la racine
 ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT))
 
-from solver_v19.solver import solve
+from solver_v19.solver import pipeline_stats
+from solver_v19.montecarlo import monte_carlo
+from solver_v19.ballast import optimize_ballast
+from solver_v19.tire_search import search_tires
+from solver_v19.polar import polar_map
+from solver_v19.reach import reach_envelope
+from solver_v19.lift import lift_curve
+from solver_v19.surface import solve_approx, surface_stats
+from solver_v19.result_cache import ResultCache
+from solver_v19.snapshot import load_catalog
+from solver_v19.loader_registry import default_registry
+from solver_v19.rules import available_profiles, load_profile
+from .catalog import tractor_index, machine_index, parse_fields, MAX_LIMIT
+from .batch import spool_body, iter_items, iter_windows, evaluate_window
+from .jobs import JobQueue
 from .models import (
-    SimulationRequest, SimulationResponse,
+    SimulationRequest, SimulationResponse, MonteCarloRequest, BallastRequest,
+    TireSearchRequest, PolarRequest, ReachRequest, LiftRequest, JobRequest,
     CGModeResult, CGResult, WheelLoads,
-    StaticResult, DynamicResult, CriterionResult
+    StaticResult, DynamicResult, CriterionResult, LoadCaseResult
 )
 
 # -----------------------------------------------------------
@@ -54,30 +98,37 @@ app.add_middleware(
 )
 
 # -----------------------------------------------------------
-# Chargement des données JSON au démarrage
+# Chargement du catalogue au démarrage
 # -----------------------------------------------------------
 
-DATA_DIR      = ROOT / "data"
-TRACTORS_DIR  = ROOT / "tractors"
-MACHINES_DIR  = ROOT / "machines"
-LOADERS_DIR   = ROOT / "loaders"
+# Instantané binaire du catalogue (solver_v19/snapshot.py), relu depuis
+# les JSON et réécrit s'il est périmé
+CATALOG_SNAPSHOT = load_catalog(ROOT)
 
-def load_json(path: Path) -> dict:
-    with open(path, encoding="utf-8") as f:
-        return json.load(f)
+TIRES    = CATALOG_SNAPSHOT.tires
+TRACTORS = CATALOG_SNAPSHOT.tractors
+MACHINES = CATALOG_SNAPSHOT.machines
+LOADERS  = default_registry()   # registre partagé avec le solver
 
-def load_all(directory: Path) -> dict:
-    """Charge tous les JSON d'un dossier. Clé = nom de fichier sans extension."""
-    result = {}
-    for f in sorted(directory.glob("*.json")):
-        result[f.stem] = load_json(f)
-    return result
+# Index des listes GET /tractors et GET /machines (filtres, pagination)
+TRACTOR_INDEX = tractor_index(TRACTORS)
+MACHINE_INDEX = machine_index(MACHINES)
+
+# Rang de chaque clé dans l'ordre du catalogue (listes non paginées)
+TRACTOR_ORDER = {key: i for i, key in enumerate(TRACTORS)}
+MACHINE_ORDER = {key: i for i, key in enumerate(MACHINES)}
 
-# Chargement au démarrage
-TIRES    = load_json(DATA_DIR / "tires.json")
-TRACTORS = load_all(TRACTORS_DIR)
-MACHINES = load_all(MACHINES_DIR)
-LOADERS  = load_all(LOADERS_DIR)
+# Catalogue passé aux simulations en lot (api/batch.py)
+CATALOG = {"tractors": TRACTORS, "machines": MACHINES, "tires": TIRES, "loaders": LOADERS}
+
+# Cache des résultats de /simulate (mémoire + SQLite optionnel)
+RESULT_CACHE = ResultCache(path=os.environ.get("SIMULATEUR_RESULT_CACHE"))
+
+# File des tâches longues (SQLite + pool de processus, cf. api/jobs.py)
+JOBS = JobQueue(
+    os.environ.get("SIMULATEUR_JOBS_DIR", Path(tempfile.gettempdir()) / "simulateur_jobs"),
+    workers=int(os.environ.get("SIMULATEUR_JOBS_WORKERS", 0)) or None,
+)
 
 
 # -----------------------------------------------------------
@@ -89,27 +140,77 @@ def health():
     return {"status": "ok", "version": "20.0"}
 
 
+@app.get("/pipeline/stats", tags=["Health"])
+def get_pipeline_stats():
+    """Compteurs hits / misses des étapes mémoïsées du solver."""
+    return pipeline_stats()
+
+
+@app.get("/surface/stats", tags=["Health"])
+def get_surface_stats():
+    """Compteurs hits / misses / évictions et taille du cache de surfaces."""
+    return surface_stats()
+
+
+@app.get("/cache/stats", tags=["Health"])
+def get_cache_stats():
+    """Compteurs hits (mémoire / disque) / misses du cache de résultats."""
+    return RESULT_CACHE.stats()
+
+
+def _catalog_page(index, order, ranges, categories, cursor, limit, fields):
+    """
+    Liste du catalogue (cf. api/catalog.py) ; 422 si requête invalide.
+
+    Sans `cursor` ni `limit` : liste simple de toutes les entrées retenues,
+    dans l'ordre du catalogue (format historique). Avec l'un des deux :
+    page {"total", "next_cursor", "items"}.
+    """
+    paginated = cursor is not None or limit is not None
+    if not paginated:
+        limit = len(index.keys)
+    elif limit is None:
+        limit = 100
+    elif not 0 < limit <= MAX_LIMIT:
+        raise HTTPException(status_code=422, detail=f"0 < limit ≤ {MAX_LIMIT} attendu")
+    try:
+        page = index.query(ranges, categories, cursor=cursor, limit=limit,
+                           fields=parse_fields(fields))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if paginated:
+        return page
+    return sorted(page["items"], key=lambda entry: order[entry["key"]])
+
+
 @app.get("/tractors", tags=["Catalogue"])
-def get_tractors():
-    """Retourne la liste des tracteurs disponibles avec leurs infos principales."""
-    result = []
-    for key, t in TRACTORS.items():
-        result.append({
-            "key":            key,
-            "name":           t.get("name"),
-            "brand":          t.get("brand"),
-            "model":          t.get("model"),
-            "mass":           t.get("mass"),
-            "mass_front_pct": t.get("mass_front_pct"),
-            "mass_rear_pct":  t.get("mass_rear_pct"),
-            "ptac":           t.get("ptac"),
-            "wheelbase":      t.get("geometry", {}).get("wheelbase"),
-            "track_front":    t.get("geometry", {}).get("track_front"),
-            "track_rear":     t.get("geometry", {}).get("track_rear"),
-            "tire_defaults":  t.get("tire_defaults"),
-            "dynamics":       t.get("dynamics"),
-        })
-    return result
+def get_tractors(
+    brand: Optional[list[str]] = Query(None, description="Marque(s), insensible à la casse"),
+    mass_min: Optional[float] = None, mass_max: Optional[float] = None,
+    ptac_min: Optional[float] = None, ptac_max: Optional[float] = None,
+    wheelbase_min: Optional[float] = None, wheelbase_max: Optional[float] = None,
+    track_front_min: Optional[float] = None, track_front_max: Optional[float] = None,
+    track_rear_min: Optional[float] = None, track_rear_max: Optional[float] = None,
+    cursor: Optional[str] = Query(None, description="next_cursor de la page précédente"),
+    limit: Optional[int] = Query(None, description=f"Taille de page (100 par défaut si cursor, {MAX_LIMIT} au plus)"),
+    fields: Optional[str] = Query(None, description="Champs renvoyés, séparés par des virgules"),
+):
+    """
+    Tracteurs disponibles avec leurs infos principales, filtrés : liste
+    simple, ou page {"total", "next_cursor", "items"} si cursor / limit.
+    """
+    return _catalog_page(
+        TRACTOR_INDEX, TRACTOR_ORDER,
+        {
+            "mass": (mass_min, mass_max),
+            "ptac": (ptac_min, ptac_max),
+            "wheelbase": (wheelbase_min, wheelbase_max),
+            "track_front": (track_front_min, track_front_max),
+            "track_rear": (track_rear_min, track_rear_max),
+        },
+        {"brand": brand},
+        cursor, limit, fields,
+    )
 
 
 @app.get("/tractors/{key}", tags=["Catalogue"])
@@ -121,20 +222,32 @@ def get_tractor(key: str):
 
 
 @app.get("/machines", tags=["Catalogue"])
-def get_machines():
-    """Retourne la liste des machines disponibles."""
-    result = []
-    for key, m in MACHINES.items():
-        entry = {
-            "key":   key,
-            "model": m.get("model"),
-            "mass":  m.get("mass"),
-        }
-        for field in ("brand", "gamme", "portee_horizontale", "portee_verticale", "puissance_tracteur_mini"):
-            if m.get(field) is not None:
-                entry[field] = m[field]
-        result.append(entry)
-    return result
+def get_machines(
+    brand: Optional[list[str]] = Query(None, description="Marque(s), insensible à la casse"),
+    gamme: Optional[list[str]] = Query(None, description="Gamme(s) : Agri, Pro, TP, Pro-TP…"),
+    mass_min: Optional[float] = None, mass_max: Optional[float] = None,
+    portee_horizontale_min: Optional[float] = None, portee_horizontale_max: Optional[float] = None,
+    puissance_tracteur_mini_min: Optional[float] = Query(None, description="CV"),
+    puissance_tracteur_mini_max: Optional[float] = Query(None, description="CV"),
+    cursor: Optional[str] = Query(None, description="next_cursor de la page précédente"),
+    limit: Optional[int] = Query(None, description=f"Taille de page (100 par défaut si cursor, {MAX_LIMIT} au plus)"),
+    fields: Optional[str] = Query(None, description="Champs renvoyés, séparés par des virgules"),
+):
+    """
+    Machines disponibles, filtrées : liste simple, ou page
+    {"total", "next_cursor", "items"} si cursor / limit.
+    puissance_tracteur_mini_max=90 : machines utilisables avec un tracteur de 90 CV.
+    """
+    return _catalog_page(
+        MACHINE_INDEX, MACHINE_ORDER,
+        {
+            "mass": (mass_min, mass_max),
+            "portee_horizontale": (portee_horizontale_min, portee_horizontale_max),
+            "puissance_tracteur_mini": (puissance_tracteur_mini_min, puissance_tracteur_mini_max),
+        },
+        {"brand": brand, "gamme": gamme},
+        cursor, limit, fields,
+    )
 
 
 @app.get("/machines/{key}", tags=["Catalogue"])
@@ -154,20 +267,36 @@ def get_tires():
     ]
 
 
+@app.get("/rules", tags=["Catalogue"])
+def get_rules():
+    """Retourne les profils de règles de compatibilité disponibles."""
+    result = []
+    for name in available_profiles():
+        profile = load_profile(name)
+        result.append({
+            "name":        profile.name,
+            "description": profile.description,
+            "rules": [
+                {"id": r.id, "name": r.name, "metric": r.metric,
+                 "limit": r.limit, "type": r.type}
+                for r in profile.rules
+            ],
+        })
+    return result
+
+
 # -----------------------------------------------------------
-# Endpoint simulation
+# Résolution commune des requêtes de simulation
 # -----------------------------------------------------------
 
-@app.post("/simulate", response_model=SimulationResponse, tags=["Simulation"])
-def simulate(request: SimulationRequest):
+def _resolve_request(request):
     """
-    Lance une simulation complète.
+    Tracteur, machine, chargeur et options d'une requête de simulation
+    (tractor_name, machine_name, options).
 
-    Corps de la requête : SimulationRequest
-    Retourne           : SimulationResponse
+    404 si le tracteur ou la machine est absent du catalogue ; chargeur
+    sélectionné automatiquement par masse tracteur si loader_enabled.
     """
-
-    # --- Validation des clés ---
     if request.tractor_name not in TRACTORS:
         raise HTTPException(status_code=404, detail=f"Tracteur '{request.tractor_name}' introuvable")
 
@@ -177,25 +306,48 @@ def simulate(request: SimulationRequest):
     tractor = TRACTORS[request.tractor_name]
     machine = MACHINES[request.machine_name]
 
-    # --- Sélection du chargeur (automatique par masse tracteur) ---
     loader = None
     if request.options.loader_enabled:
-        from solver_v19.loader import get_loader_category
-        loader_key = get_loader_category(tractor["mass"])
-        loader = LOADERS.get(loader_key)
+        loader = LOADERS.select(tractor["mass"])
 
-    # --- Construction des options ---
     options = request.options.model_dump()
+    options["loader"] = loader
+    return tractor, machine, loader, options
 
-    # --- Construction de l'environnement ---
-    env = request.environment.model_dump()
 
-    # --- Appel du solver ---
+@contextmanager
+def _solver_errors():
+    """Erreurs du solver → HTTP : ValueError → 422, autre exception → 500."""
     try:
-        result = solve(tractor, machine, loader, TIRES, options, env)
+        yield
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Configuration invalide : {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur solver : {str(e)}")
 
+
+# -----------------------------------------------------------
+# Endpoint simulation
+# -----------------------------------------------------------
+
+@app.post("/simulate", response_model=SimulationResponse, tags=["Simulation"])
+def simulate(request: SimulationRequest):
+    """
+    Lance une simulation complète.
+
+    Corps de la requête : SimulationRequest
+    Retourne           : SimulationResponse
+    """
+
+    tractor, machine, loader, options = _resolve_request(request)
+    env = request.environment.model_dump()
+
+    # --- Appel du solver ---
+    with _solver_errors():
+        result = RESULT_CACHE.solve(tractor, machine, loader, TIRES, options, env)
+
     # --- Formatage de la réponse ---
     def fmt_cg(mode: str) -> CGModeResult:
         block = result["CG"][mode]
@@ -249,7 +401,252 @@ def simulate(request: SimulationRequest):
         compatibility=fmt_compat("compatibility"),
         compatibility_transport=fmt_compat("compatibility_transport"),
         compatibility_work=fmt_compat("compatibility_work"),
+        load_cases={
+            case: LoadCaseResult(
+                cg=fmt_cg(case),
+                wheels=fmt_wheels(case),
+                static=fmt_static(case),
+                dynamic=fmt_dynamic(case),
+                compatibility=fmt_compat(f"compatibility_{case}"),
+            )
+            for case in result["cases"]
+        },
     )
+
+
+@app.post("/simulate/batch", tags=["Simulation"])
+async def simulate_batch(request: Request):
+    """
+    Lot de simulations : liste JSON de SimulationRequest, ou flux NDJSON
+    (Content-Type: application/x-ndjson). Les requêtes sont regroupées
+    par tracteur / machine et calculées en vectorisé, par fenêtres.
+
+    Retourne un flux NDJSON : une ligne par requête, dans l'ordre
+    d'entrée (cf. api/batch.py) ; une requête invalide donne une ligne
+    d'erreur sans interrompre le lot.
+    """
+    spool = await spool_body(request)
+    ndjson = "ndjson" in request.headers.get("content-type", "")
+
+    items = iter_items(spool, ndjson)
+    try:
+        first = next(items, None)
+    except ValueError as e:
+        spool.close()
+        raise HTTPException(status_code=422, detail=str(e))
+
+    async def lines():
+        try:
+            stream = items if first is None else itertools.chain([first], items)
+            for window in iter_windows(stream):
+                rows = await run_in_threadpool(evaluate_window, window, CATALOG,
+                                              RESULT_CACHE.decimals)
+                yield "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+        finally:
+            spool.close()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@app.post("/simulate/montecarlo", tags=["Simulation"])
+def simulate_montecarlo(request: MonteCarloRequest):
+    """
+    Propagation des incertitudes du catalogue (Monte Carlo).
+
+    Corps de la requête : MonteCarloRequest
+    Retourne           : probabilités DANGER / WARNING par critère et
+                         percentiles (cf. solver_v19.montecarlo.monte_carlo)
+    """
+    tractor, machine, loader, options = _resolve_request(request)
+
+    with _solver_errors():
+        return monte_carlo(tractor, machine, loader, TIRES, options,
+                           request.environment.model_dump(),
+                           n_samples=request.n_samples,
+                           seed=request.seed,
+                           uncertainty=request.uncertainty)
+
+
+@app.post("/ballast", tags=["Simulation"])
+def ballast(request: BallastRequest):
+    """
+    Recherche le lestage minimal (masses avant / arrière, masses de roues)
+    pour lequel tous les critères passent en transport et en travail.
+
+    Corps de la requête : BallastRequest (les masses de lest des options
+                          sont ignorées : elles sont recherchées)
+    Retourne           : cf. solver_v19.ballast.optimize_ballast
+    """
+    tractor, machine, loader, options = _resolve_request(request)
+
+    with _solver_errors():
+        return optimize_ballast(tractor, machine, loader, TIRES, options,
+                                request.environment.model_dump(),
+                                front_offsets=request.front_offsets,
+                                rear_offsets=request.rear_offsets,
+                                max_mass=request.max_mass,
+                                allow_warning=request.allow_warning,
+                                resolution=request.resolution)
+
+
+@app.post("/tires/search", tags=["Simulation"])
+def tires_search(request: TireSearchRequest):
+    """
+    Évalue les pneus arrière (avec et sans lestage à l'eau) pour un
+    couple tracteur + machine et les classe par marge de stabilité.
+
+    Corps de la requête : TireSearchRequest
+    Retourne           : cf. solver_v19.tire_search.search_tires
+    """
+    tractor, machine, loader, options = _resolve_request(request)
+
+    with _solver_errors():
+        results = search_tires(tractor, machine, loader, TIRES, options,
+                               request.environment.model_dump(),
+                               same_rim=request.same_rim)
+
+    return results[:request.limit] if request.limit else results
+
+
+@app.post("/simulate/polar", tags=["Simulation"])
+def simulate_polar(request: PolarRequest):
+    """
+    Balaie les caps de 0 à 360° sur un versant de pente donnée :
+    indices, charges aux roues et statut par cap, secteurs sûrs.
+
+    Corps de la requête : PolarRequest
+    Retourne           : cf. solver_v19.polar.polar_map
+    """
+    tractor, machine, loader, options = _resolve_request(request)
+
+    with _solver_errors():
+        return polar_map(tractor, machine, loader, TIRES, options, request.terrain_slope,
+                         env=request.environment.model_dump(),
+                         resolution=request.resolution)
+
+
+@app.post("/simulate/reach", tags=["Simulation"])
+def simulate_reach(request: ReachRequest):
+    """
+    Évalue la stabilité sur toute la grille de poses du bras
+    (portée × hauteur, côtés droit / gauche) : zone de portée sûre par
+    critère.
+
+    Corps de la requête : ReachRequest
+    Retourne           : cf. solver_v19.reach.reach_envelope
+    """
+    tractor, machine, loader, options = _resolve_request(request)
+
+    with _solver_errors():
+        return reach_envelope(tractor, machine, loader, TIRES, options,
+                              env=request.environment.model_dump(),
+                              sides=tuple(request.sides),
+                              n_reach=request.n_reach, n_height=request.n_height)
+
+
+@app.post("/simulate/lift", tags=["Simulation"])
+def simulate_lift(request: LiftRequest):
+    """
+    Évalue la stabilité sur toute la plage de levage du chargeur frontal
+    (charge du godet : options.loader_payload) : indices par hauteur et
+    levage maximal compatible.
+
+    Corps de la requête : LiftRequest
+    Retourne           : cf. solver_v19.lift.lift_curve
+    """
+    tractor, machine, loader, options = _resolve_request(request)
+
+    with _solver_errors():
+        return lift_curve(tractor, machine, loader, TIRES, options,
+                          env=request.environment.model_dump(),
+                          n_lift=request.n_lift)
+
+
+@app.post("/simulate/approx", tags=["Simulation"])
+def simulate_approx(request: SimulationRequest):
+    """
+    Réponse approchée instantanée : indices et charges aux roues
+    interpolés sur la surface de réponse de la configuration (construite
+    au premier appel), avec la borne d'erreur de chaque grandeur.
+    Hors du domaine de la grille ("inside" = false), utiliser /simulate.
+
+    Corps de la requête : SimulationRequest
+    Retourne           : cf. solver_v19.surface.solve_approx
+    """
+    tractor, machine, loader, options = _resolve_request(request)
+
+    with _solver_errors():
+        return solve_approx(tractor, machine, loader, TIRES, options,
+                            request.environment.model_dump())
+
+
 @app.api_route("/health", methods=["GET", "HEAD"])
 def health():
     return {"status": "ok"}
+
+
+# -----------------------------------------------------------
+# Tâches longues
+# -----------------------------------------------------------
+
+@app.post("/jobs", tags=["Tâches"], status_code=202)
+def submit_job(request: JobRequest):
+    """
+    Enregistre une tâche longue (balayage du catalogue) exécutée en
+    arrière-plan par paquets de tracteurs ; retourne son identifiant.
+
+    Corps de la requête : JobRequest
+    Retourne           : état initial (cf. GET /jobs/{id})
+    """
+    tractors = request.tractors if request.tractors is not None else list(TRACTORS)
+    unknown = [t for t in tractors if t not in TRACTORS]
+    unknown += [m for m in request.machines or [] if m not in MACHINES]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Introuvable(s) dans le catalogue : {', '.join(unknown)}")
+
+    spec = {
+        "machines": request.machines,
+        "options": request.options.model_dump(),
+        "environment": request.environment.model_dump(),
+    }
+    if request.kind == "payload":
+        spec["parameters"] = {"payload_max": request.payload_max, "n_grid": request.n_grid,
+                              "tolerance": request.tolerance}
+
+    try:
+        job_id = JOBS.submit(request.kind, spec, tractors, chunk_size=request.chunk_size)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Tâche invalide : {str(e)}")
+    return JOBS.status(job_id)
+
+
+@app.get("/jobs/{job_id}", tags=["Tâches"])
+def get_job(job_id: str):
+    """État d'une tâche : queued / running / done / failed / cancelled, avancement."""
+    status = JOBS.status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Tâche '{job_id}' introuvable")
+    return status
+
+
+@app.get("/jobs/{job_id}/result", tags=["Tâches"])
+def get_job_result(job_id: str, offset: int = 0, limit: int = 1000):
+    """
+    Lignes [offset, offset + limit) de la table résultat (paquets déjà
+    terminés, dans l'ordre) ; colonnes de sweep_catalog / max_payload_catalog.
+    """
+    if JOBS.status(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Tâche '{job_id}' introuvable")
+    if offset < 0 or not 0 < limit <= 10_000:
+        raise HTTPException(status_code=422, detail="offset ≥ 0 et 0 < limit ≤ 10000 attendus")
+    return JOBS.results(job_id, offset=offset, limit=limit)
+
+
+@app.post("/jobs/{job_id}/cancel", tags=["Tâches"])
+def cancel_job(job_id: str):
+    """Annule une tâche en attente ou en cours."""
+    status = JOBS.cancel(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Tâche '{job_id}' introuvable")
+    return status
+
@@ -4,12 +4,22 @@ models.py — Structures de données entrée/sortie de l'API
 
 Définit les schémas Pydantic pour :
 - SimulationRequest  : ce que l'interface envoie
-- SimulationResponse : ce que l'API renvoie
+- MonteCarloRequest  : simulation + tirages Monte Carlo
+- BallastRequest     : recherche du lestage minimal
+- TireSearchRequest  : classement des pneus arrière
+- PolarRequest       : stabilité selon le cap sur un versant
+- ReachRequest       : enveloppe de portée du bras
+- LiftRequest        : courbe de levage du chargeur frontal
+- JobRequest         : tâche longue (balayage catalogue) pour POST /jobs
+- SimulationResponse : ce que l'API renvoie (dont load_cases : un bloc
+                       LoadCaseResult par cas de charge)
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional
 
+from solver_v19.rules import available_profiles
+
 
 # -----------------------------------------------------------
 # ENTRÉE
@@ -19,6 +29,8 @@ class OptionsInput(BaseModel):
     rear_tire: str                          = Field(..., description="Référence pneu arrière (ex: '520/85R38')")
     loader_enabled: bool                    = Field(False, description="Chargeur frontal activé")
     loader_mode: str                        = Field("low", description="Position chargeur : 'low' ou 'high'")
+    loader_lift: Optional[float]            = Field(None, ge=0, le=1, description="Levage continu du chargeur (0 = bas, 1 = haut) ; prioritaire sur loader_mode")
+    loader_payload: float                   = Field(0.0, ge=0, description="Charge dans le godet (kg)")
     water_ballast: bool                     = Field(False, description="Lestage à l'eau activé")
     wheel_weight_ARG: float                 = Field(0.0, description="Masse roue arrière gauche (kg)")
     wheel_weight_ARD: float                 = Field(0.0, description="Masse roue arrière droite (kg)")
@@ -26,6 +38,15 @@ class OptionsInput(BaseModel):
     front_ballast_offset: float             = Field(0.5, description="Offset masse avant / essieu AV (m)")
     rear_ballast_mass: float                = Field(0.0, description="Masse arrière (kg)")
     rear_ballast_offset: float              = Field(0.3, description="Offset masse arrière / essieu AR (m)")
+    rules_profile: Optional[str]            = Field(None, description="Profil de règles de compatibilité (défaut : 'maneko', cf. GET /rules)")
+
+    @field_validator("rules_profile")
+    @classmethod
+    def _known_profile(cls, name):
+        # Noms du dossier rules/ uniquement (pas de chemin de fichier)
+        if name is not None and name not in available_profiles():
+            raise ValueError(f"profil inconnu {name!r} (disponibles : {', '.join(available_profiles())})")
+        return name
 
 
 class EnvironmentInput(BaseModel):
@@ -43,6 +64,60 @@ class SimulationRequest(BaseModel):
     environment: EnvironmentInput           = Field(default_factory=EnvironmentInput)
 
 
+class MonteCarloRequest(SimulationRequest):
+    n_samples: int                          = Field(100_000, ge=1, le=1_000_000, description="Nombre de tirages Monte Carlo")
+    seed: int                               = Field(0, description="Graine du générateur (résultat reproductible)")
+    uncertainty: Optional[dict]             = Field(None, description="Lois des paramètres incertains (cf. solver_v19.montecarlo.DEFAULT_UNCERTAINTY ; null = figer)")
+
+
+class BallastRequest(SimulationRequest):
+    front_offsets: Optional[list[float]]    = Field(None, description="Déports possibles de la masse avant (m) ; défaut : options.front_ballast_offset")
+    rear_offsets: Optional[list[float]]     = Field(None, description="Déports possibles de la masse arrière (m) ; défaut : options.rear_ballast_offset")
+    max_mass: float                         = Field(3000.0, gt=0, description="Masse ajoutée totale maximale (kg)")
+    allow_warning: bool                     = Field(True, description="Accepter les critères en avertissement")
+    resolution: float                       = Field(1.0, gt=0, description="Pas d'arrondi des masses (kg)")
+
+
+class TireSearchOptions(OptionsInput):
+    rear_tire: Optional[str]                = Field(None, description="Ignoré : tous les pneus candidats sont évalués")
+
+
+class TireSearchRequest(BaseModel):
+    tractor_name: str                       = Field(..., description="Nom du fichier tracteur")
+    machine_name: str                       = Field(..., description="Nom du fichier machine")
+    options: TireSearchOptions              = Field(default_factory=TireSearchOptions)
+    environment: EnvironmentInput           = Field(default_factory=EnvironmentInput)
+    same_rim: bool                          = Field(True, description="Limiter à la famille de jante du pneu arrière de série")
+    limit: Optional[int]                    = Field(None, ge=1, description="Nombre maximal de résultats")
+
+
+class PolarRequest(SimulationRequest):
+    terrain_slope: float                    = Field(..., ge=0, lt=90, description="Pente du versant (degrés) ; environment.slope_lat / slope_long sont ignorés")
+    resolution: float                       = Field(1.0, gt=0, le=90, description="Pas du balayage des caps (degrés)")
+
+
+class ReachRequest(SimulationRequest):
+    n_reach: int                            = Field(50, ge=2, le=500, description="Nombre de portées (0 → portee_horizontale)")
+    n_height: int                           = Field(50, ge=1, le=500, description="Nombre de hauteurs de tête (0 → portee_verticale)")
+    sides: list[str]                        = Field(["right", "left"], description="Côtés évalués : 'right', 'left'")
+
+
+class LiftRequest(SimulationRequest):
+    n_lift: int                             = Field(51, ge=2, le=1001, description="Nombre de fractions de levage (0 → 1)")
+
+
+class JobRequest(BaseModel):
+    kind: str                               = Field("sweep", description="'sweep' (balayage tracteurs × machines × pneus) ou 'payload' (charge maximale du godet)")
+    tractors: Optional[list[str]]           = Field(None, description="Tracteurs évalués (défaut : tout le catalogue)")
+    machines: Optional[list[str]]           = Field(None, description="Machines évaluées (défaut : tout le catalogue)")
+    options: TireSearchOptions              = Field(default_factory=TireSearchOptions)
+    environment: EnvironmentInput           = Field(default_factory=EnvironmentInput)
+    chunk_size: int                         = Field(4, ge=1, le=100, description="Tracteurs par paquet de calcul")
+    payload_max: float                      = Field(5000.0, gt=0, description="'payload' : borne haute de la recherche (kg)")
+    n_grid: int                             = Field(33, ge=2, le=1000, description="'payload' : points du balayage grossier")
+    tolerance: float                        = Field(1.0, gt=0, description="'payload' : précision de la bissection (kg)")
+
+
 # -----------------------------------------------------------
 # SORTIE
 # -----------------------------------------------------------
@@ -84,6 +159,14 @@ class CriterionResult(BaseModel):
     value: float
 
 
+class LoadCaseResult(BaseModel):
+    cg: CGModeResult
+    wheels: WheelLoads
+    static: StaticResult
+    dynamic: DynamicResult
+    compatibility: list[CriterionResult]
+
+
 class SimulationResponse(BaseModel):
     # CG global
     transport: CGModeResult
@@ -105,3 +188,6 @@ class SimulationResponse(BaseModel):
     compatibility: list[CriterionResult]
     compatibility_transport: list[CriterionResult]
     compatibility_work: list[CriterionResult]
+
+    # Tous les cas de charge (transport, work + poses nommées machine / chargeur)
+    load_cases: dict[str, LoadCaseResult]
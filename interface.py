@@ -87,6 +87,8 @@ sys.path.append(BASE_PATH)
 from solver_v19.solver import solve
 from solver_v19.geometry import get_geometry
 from solver_v19.solver import select_loader_name
+from solver_v19.loader_registry import default_registry
+from solver_v19.snapshot import load_catalog, source_signature
 
 # --------------------------------------------------------------------
 # Configuration style constructeur
@@ -463,6 +465,18 @@ st.markdown("""
 )
 
 
+# ---------------------------------------------------------
+# Catalogue (instantané binaire, cf. solver_v19/snapshot.py)
+# ---------------------------------------------------------
+@st.cache_resource(max_entries=1, show_spinner=False)
+def get_catalog(signature):
+    """Catalogue partagé entre les rafraîchissements ; `signature` (tailles /
+    dates des JSON) le fait relire quand un fichier du catalogue change."""
+    return load_catalog(os.path.dirname(os.path.abspath(__file__)))
+
+CATALOG = get_catalog(json.dumps(source_signature(os.path.dirname(os.path.abspath(__file__)))))
+
+
 # ---------------------------------------------------------
 # 🟩 1) Sélection du TRACTEUR
 # ---------------------------------------------------------
@@ -472,19 +486,9 @@ st.markdown("""
 
 st.subheader("Tracteur")
 
-tractor_files = [f for f in os.listdir("tractors") if f.endswith(".json")]
-
-# Charger tous les JSON pour récupérer les noms lisibles
-tractor_display = []
-tractor_map = {}
-
-for file in tractor_files:
-    data = load_json(f"tractors/{file}")
-    pretty = data.get("name", file.replace(".json", ""))  # nom lisible
-    key = file.replace(".json", "")                       # identifiant interne
-    tractor_display.append(pretty)
-    tractor_map[pretty] = key
-    tractor_display = sorted(tractor_display)
+# Noms lisibles → identifiant interne (index de l'instantané du catalogue)
+tractor_map = {pretty: key for key, pretty in CATALOG.labels["tractors"].items()}
+tractor_display = sorted(tractor_map)
 
 # Selectbox : montre le vrai nom lisible
 selected_pretty = st.selectbox("Choisir un tracteur", tractor_display)
@@ -492,8 +496,8 @@ selected_pretty = st.selectbox("Choisir un tracteur", tractor_display)
 # On retrouve la clé correspondant à ce nom
 selected_tractor = tractor_map[selected_pretty]
 
-# Charger le JSON correct
-tractor = load_json(f"tractors/{selected_tractor}.json")
+# JSON du tracteur choisi
+tractor = CATALOG.tractors[selected_tractor]
 
 
 # ---------------------------------------------------------
@@ -505,19 +509,9 @@ st.markdown("""
 
 st.subheader("Machine arrière")
 
-machine_files = [f for f in os.listdir("machines") if f.endswith(".json")]
-
-# Charger tous les JSON pour récupérer le nom lisible
-machine_display = []
-machine_map = {}
-
-for file in machine_files:
-    data = load_json(f"machines/{file}")
-    pretty = data.get("model", file.replace(".json", ""))  # nom affiché
-    key = file.replace(".json", "")                       # identifiant interne
-    machine_display.append(pretty)
-    machine_map[pretty] = key
-    machine_display = sorted(machine_display)
+# Noms affichés → identifiant interne (index de l'instantané du catalogue)
+machine_map = {pretty: key for key, pretty in CATALOG.labels["machines"].items()}
+machine_display = sorted(machine_map)
 
 # Selectbox — affiche les noms lisibles
 selected_machine_pretty = st.selectbox("Choisir une machine", machine_display)
@@ -525,8 +519,8 @@ selected_machine_pretty = st.selectbox("Choisir une machine", machine_display)
 # Trouver la clé interne
 selected_machine = machine_map[selected_machine_pretty]
 
-# Charger le JSON correspondant
-machine = load_json(f"machines/{selected_machine}.json")
+# JSON de la machine choisie
+machine = CATALOG.machines[selected_machine]
 
 # ---------------------------------------------------------
 # 🟦 3) Chargeur frontal (optionnel)
@@ -677,9 +671,7 @@ if loader_enabled:
         unsafe_allow_html=True
     )
 
-    loader_files = os.listdir("loaders")
-    loader_list = [f.replace(".json", "") for f in loader_files if f.endswith(".json")]
-    loader_list = sorted(loader_list)
+    loader_list = sorted(default_registry().names())
 
     # Selectbox avec valeur persistante
     st.selectbox(
@@ -692,15 +684,22 @@ if loader_enabled:
 
     # Chargement du JSON correct
     if choice == "De série":
-        loader = load_json(f"loaders/{loader_name_auto}.json")
+        loader = default_registry().get(loader_name_auto)
     else:
-        loader = load_json(f"loaders/{choice}.json")
+        loader = default_registry().get(choice)
+
+    # Levage continu (0 % = position basse, 100 % = position haute)
+    st.slider("Levage du chargeur (%) :", 0, 100, 0, step=5, key="loader_lift_pct")
+    st.number_input("Charge dans le godet (kg) :", min_value=0.0, value=0.0,
+                    step=50.0, key="loader_payload")
 
 # MISE À JOUR DES OPTIONS
 options = st.session_state["options"]
 
 options["loader_enabled"] = loader_enabled
 options["loader_mode"]    = "low"
+options["loader_lift"]    = st.session_state.get("loader_lift_pct", 0) / 100.0 if loader_enabled else None
+options["loader_payload"] = float(st.session_state.get("loader_payload", 0.0)) if loader_enabled else 0.0
 
 # Sauvegarde du loader sélectionné
 st.session_state["loader_json"] = loader
@@ -835,7 +834,7 @@ def load_json(path):
     with open(full_path, "r") as f:
         return json.load(f)
 
-tires = load_json("data/tires.json")
+tires = CATALOG.tires
 
 #TRACTOR_LIST = os.listdir(os.path.join(BASE_PATH, "tractors"))
 #MACHINE_LIST = os.listdir(os.path.join(BASE_PATH, "machines"))
@@ -1096,9 +1095,9 @@ if run:
 # ----- Traitement après clic -----
 if run:
 
-    # Chargement du tracteur et de la machine par défaut
-    tractor = load_json(f"tractors/{selected_tractor}.json")
-    machine = load_json(f"machines/{selected_machine}.json")
+    # Tracteur et machine choisis
+    tractor = CATALOG.tractors[selected_tractor]
+    machine = CATALOG.machines[selected_machine]
     loader = None
 
     status_placeholder = st.empty()   # emplacement réservé
@@ -1158,6 +1157,18 @@ if run:
     with st.expander("Stabilité statique (mode work)"):
         st.json(result["static"]["work"])
 
+    # Poses nommées des JSON machine / chargeur (cf. compiled.load_cases)
+    extra_cases = [case for case in result.get("cases", []) if case not in ("transport", "work")]
+    if extra_cases:
+        with st.expander("Autres cas de charge"):
+            for case in extra_cases:
+                worst = [c["status"] for c in result[f"compatibility_{case}"] if "OK" not in c["status"]]
+                st.markdown(
+                    f"**{case}** — I_static = {result['static'][case]['I_static']:.3f}, "
+                    f"I_dynamic = {result['dynamic'][case]['I_dynamic']:.3f} — "
+                    f"{', '.join(sorted(set(worst))) or '✅ OK'}"
+                )
+
 
 
 
@@ -4,18 +4,42 @@ solver_v19 package
 
 Ce package regroupe tous les modules du solver :
 
+- compiled.py      → configuration compilée (validation + pré-calculs)
 - cg.py            → calcul du centre de gravité
 - loader.py        → gestion du chargeur (bras + outil)
+- loader_registry.py → registre des chargeurs (sélection par masse tracteur)
 - static_pfs.py    → stabilité statique
 - dynamic_pfd.py   → stabilité dynamique
 - wheels.py        → charges aux roues
+- compatibility.py → critères de compatibilité (rendu des règles)
+- rules.py         → moteur de règles (profils JSON du dossier rules/)
 - geometry.py      → géométrie & rotations
 - solver.py        → orchestrateur principal
+- pipeline.py      → étapes du solver mémoïsées (hits / misses)
+- scalar.py        → noyau scalaire (un scénario, sans NumPy)
+- stacked.py       → cas de charge empilés (N poses en un calcul tableau)
+- batch.py         → solver vectorisé (tableaux de scénarios)
+- sweep.py         → balayage catalogue (tracteurs × machines × pneus)
+- critical_slope.py → pentes critiques (dévers / pente) par configuration
+- montecarlo.py    → propagation d'incertitudes catalogue (Monte Carlo)
+- ballast.py       → lestage minimal (masses avant / arrière, roues)
+- tire_search.py   → choix du pneu arrière (famille de jante)
+- drive_cycle.py   → cycle de conduite (série temporelle évaluée en flux)
+- route.py         → itinéraire GPS sur MNT (profil de risque par tronçons)
+- hazard.py        → carte de danger d'une parcelle (raster, tuiles en parallèle)
+- polar.py         → carte polaire (stabilité selon le cap sur un versant)
+- reach.py         → enveloppe de portée du bras (CG machine continu)
+- lift.py          → courbe de levage du chargeur frontal (levage continu)
+- payload.py       → charge maximale du godet sur tout le catalogue
+- surface.py       → surfaces de réponse précalculées (réponses approchées)
+- result_cache.py  → cache de résultats de solve() (LRU mémoire + SQLite)
+- snapshot.py      → instantané binaire du catalogue (démarrage rapide)
 
 L’objectif du package est de fournir une API simple :
     from solver_v12 import solve
 """
 
 from .solver import solve
+from .batch import solve_batch
 
-__all__ = ["solve"]
+__all__ = ["solve", "solve_batch"]
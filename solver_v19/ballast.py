@@ -0,0 +1,450 @@
+"""
+ballast.py — Lestage minimal (masses avant / arrière, masses de roues)
+----------------------------------------------------------------------
+
+Question type d'un concessionnaire : « quel lestage rend cette machine
+sûre sur ce tracteur ? ».
+
+optimize_ballast() cherche la plus petite masse ajoutée totale
+
+    front_ballast_mass + rear_ballast_mass
+        + wheel_weight_ARG + wheel_weight_ARD
+
+(avec choix des déports avant / arrière) pour laquelle tous les critères
+du profil de règles passent dans les DEUX modes (transport et work).
+
+Principe — on n'explore pas une grille de masses :
+
+    - un mélange de lests en proportions fixées u (direction) équivaut
+      à UNE masse t placée au barycentre p des positions
+      (cf. extra_masses_CG) ;
+    - le CG local vaut alors (S0 + t·p) / (M0 + t) : fonction rationnelle
+      de t, comme le CG au sol après rotation ;
+    - chaque marge de critère multipliée par (M0 + t)² est un polynôme
+      de degré ≤ 3 en t, par morceaux : les changements de forme
+      (|X|, |Y|, min(FL, FR)…) ont lieu quand le CG au sol franchit
+      X = -L/2, 0, +L/2 ou Y = 0, valeurs de t obtenues en forme close.
+
+Sur chaque morceau, 4 évaluations suffisent pour reconstruire ces
+polynômes ; leurs racines donnent les seules valeurs de t où un statut
+peut changer. Le statut réel (profil de règles) est ensuite vérifié une
+fois dans chaque intervalle. Toutes les directions sont traitées
+ensemble, en quelques appels vectorisés de la chaîne batch.
+
+Directions examinées :
+    - chaque lest seul (avant / arrière pour chaque déport, roue G, roue D)
+    - masses de roues G + D à parts égales
+    - un lest avant OU arrière combiné à des masses de roues
+      (G, D ou G + D), pour chaque part de MIX_FRACTIONS
+
+La solution retenue est arrondie (par lest) au multiple supérieur de
+`resolution` kg puis vérifiée par solve().
+"""
+
+import math
+
+import numpy as np
+
+from .batch import evaluate_mode_batch, mode_metrics, ENV_KEYS
+from .cg import extra_masses_CG_batch
+from .compatibility import STATUS_OK, STATUS_WARNING
+from .compiled import compile_config, MODES
+from .rules import STATUS_LABELS
+from .scalar import rotation_entries
+from .solver import resolve_loader, solve
+
+
+BALLAST_MASSES = (
+    "front_ballast_mass", "rear_ballast_mass",
+    "wheel_weight_ARG", "wheel_weight_ARD",
+)
+
+# Parts du lest avant / arrière dans les directions combinées
+MIX_FRACTIONS = (0.2, 0.4, 0.6, 0.8)
+
+# Nœuds de Tchebychev sur [0, 1] (reconstruction des polynômes de degré 3)
+_NODES = 0.5 - 0.5 * np.cos((2 * np.arange(4) + 1) * np.pi / 8)
+_VANDERMONDE_INV = np.linalg.inv(np.vander(_NODES, 4, increasing=True))
+
+# Recherche des racines des polynômes reconstruits (sur [0, 1])
+_SCAN = np.linspace(0.0, 1.0, 65)
+_BISECTION_STEPS = 40
+
+_LABEL_CODES = {label: code for code, label in STATUS_LABELS.items()}
+
+
+# -----------------------------------------------------------
+# Lests et directions
+# -----------------------------------------------------------
+
+def ballast_slots(cfg, front_offsets, rear_offsets):
+    """
+    Emplacements de lest possibles : liste de (option, déport, position),
+    positions locales (x, y, z) reprises de extra_masses_CG_batch().
+    """
+    slots = []
+    for key, offsets in (("front_ballast_mass", front_offsets),
+                         ("rear_ballast_mass", rear_offsets)):
+        for offset in offsets:
+            elements = extra_masses_CG_batch(
+                cfg.wheelbase, cfg.track_rear, cfg.rear_radius, cfg.rear_volume,
+                rear_ballast_mass=1.0, rear_ballast_offset=offset,
+                front_ballast_mass=1.0, front_ballast_offset=offset,
+            )
+            _, x, y, z = elements[5 if key == "front_ballast_mass" else 4]
+            slots.append((key, float(offset), (float(x), float(y), float(z))))
+
+    elements = extra_masses_CG_batch(cfg.wheelbase, cfg.track_rear,
+                                     cfg.rear_radius, cfg.rear_volume)
+    for key, (_, x, y, z) in zip(("wheel_weight_ARG", "wheel_weight_ARD"), elements[:2]):
+        slots.append((key, None, (float(x), float(y), float(z))))
+
+    return slots
+
+
+def ballast_directions(slots):
+    """
+    Proportions des lests (tableau (K, n_slots), lignes de somme 1),
+    cf. en-tête du module.
+    """
+    n = len(slots)
+    wheels = [i for i, (key, _, _) in enumerate(slots) if key.startswith("wheel_weight")]
+    longitudinal = [i for i in range(n) if i not in wheels]
+
+    wheel_mixes = []
+    for i in wheels:
+        u = np.zeros(n)
+        u[i] = 1.0
+        wheel_mixes.append(u)
+    pair = np.zeros(n)
+    pair[wheels] = 1.0 / len(wheels)
+    wheel_mixes.append(pair)
+
+    directions = [np.eye(n)[i] for i in longitudinal] + wheel_mixes
+    for i in longitudinal:
+        for w in wheel_mixes:
+            for alpha in MIX_FRACTIONS:
+                u = (1.0 - alpha) * w
+                u[i] = alpha
+                directions.append(u)
+
+    return np.array(directions)
+
+
+# -----------------------------------------------------------
+# Évaluation le long des directions
+# -----------------------------------------------------------
+
+def _base_sums(cfg):
+    """Masse et moments {mode: (M0, S0)} sans lest ajouté."""
+    sums = {}
+    for mode in MODES:
+        M0 = 0.0
+        S0 = np.zeros(3)
+        for m, cg in cfg.elements[mode]:
+            if m > 0:
+                M0 += m
+                S0 += m * np.asarray(cg, dtype=float)
+        sums[mode] = (M0, S0)
+    return sums
+
+
+class _Evaluator:
+    """Critères du profil pour une masse t le long de chaque direction."""
+
+    def __init__(self, cfg, env, points, allow_warning):
+        self.cfg = cfg
+        self.env = env
+        self.points = points                          # (K, 3)
+        self.sums = _base_sums(cfg)
+        self.allow_warning = allow_warning
+
+    def _columns(self, mode, t):
+        """Colonnes de la chaîne batch ; t : tableau (K, ...)."""
+        M0, S0 = self.sums[mode]
+        p = self.points.reshape(self.points.shape[:1] + (1,) * (t.ndim - 1) + (3,))
+        MT = M0 + t
+        X = (S0[0] + t * p[..., 0]) / MT
+        Y = (S0[1] + t * p[..., 1]) / MT
+        Z = (S0[2] + t * p[..., 2]) / MT
+        cfg = self.cfg
+        return evaluate_mode_batch(MT, X, Y, Z, self.env,
+                                   cfg.wheelbase, cfg.track_front, cfg.track_rear)
+
+    def _evaluation(self, mode, t):
+        # Marges et statuts complets (RuleProfile.evaluate), pas seulement
+        # les codes de batch.evaluate_mode
+        cols = self._columns(mode, t)
+        return self.cfg.profile.evaluate(mode_metrics(self.cfg, cols))
+
+    def margins(self, mode, t):
+        """
+        Marges (n_règles, *t.shape) par rapport au seuil à respecter
+        (limite, ou limite × warning si allow_warning=False) ;
+        NaN (règle non applicable) → +1.
+        """
+        evaluation = self._evaluation(mode, t)
+        out = []
+        for rule, value, limit in zip(self.cfg.profile.rules,
+                                      evaluation["value"], evaluation["limit"]):
+            if not self.allow_warning and rule.warning is not None:
+                limit = limit * rule.warning
+            margin = np.broadcast_to(rule.margin(value, limit), t.shape)
+            out.append(np.where(np.isnan(margin), 1.0, margin))
+        return np.stack(out)
+
+    def feasible(self, t):
+        """Tous les critères passent dans les deux modes (tableau bool)."""
+        worst_allowed = STATUS_WARNING if self.allow_warning else STATUS_OK
+        ok = np.ones(t.shape, dtype=bool)
+        for mode in MODES:
+            statuses = self._evaluation(mode, t)["status"]
+            for status in statuses:
+                ok &= np.broadcast_to(status, t.shape) <= worst_allowed
+        return ok & np.isfinite(t)
+
+    def breakpoints(self, t_max):
+        """
+        Valeurs de t (forme close) où le CG au sol franchit
+        X = -L/2, 0, +L/2 ou Y = 0 : tableau (K, 8), NaN hors de ]0, t_max[.
+        """
+        cfg = self.cfg
+        rows = rotation_entries(self.env["slope_lat"], self.env["slope_long"])
+        out = []
+        for mode in MODES:
+            M0, S0 = self.sums[mode]
+            for row, levels in ((rows[0], (-cfg.wheelbase / 2.0, 0.0, cfg.wheelbase / 2.0)),
+                                (rows[1], (0.0,))):
+                r = np.array(row)
+                a0 = r @ S0
+                a1 = self.points @ r
+                for c in levels:
+                    with np.errstate(divide="ignore", invalid="ignore"):
+                        t = (c * M0 - a0) / (a1 - c)
+                    out.append(np.where((t > 0) & (t < t_max), t, np.nan))
+        return np.stack(out, axis=1)
+
+
+# -----------------------------------------------------------
+# Racines des marges (polynômes reconstruits)
+# -----------------------------------------------------------
+
+def _polyval(coefs, s):
+    """Polynômes de degré 3 (coefficients croissants, dernier axe) en s."""
+    return coefs[..., 0] + s * (coefs[..., 1] + s * (coefs[..., 2] + s * coefs[..., 3]))
+
+
+def _piece_roots(evaluator, a, b):
+    """
+    Racines des marges sur les morceaux [a, b] (tableaux (K, P)).
+
+    Retourne (k, t) : indices de direction et valeurs de t des racines.
+    """
+    t_nodes = a[..., None] + (b - a)[..., None] * _NODES       # (K, P, 4)
+    ks, ts = [], []
+
+    for mode in MODES:
+        M0 = evaluator.sums[mode][0]
+        values = evaluator.margins(mode, t_nodes) * (M0 + t_nodes) ** 2
+        coefs = values @ _VANDERMONDE_INV.T                       # (R, K, P, 4)
+
+        scan = _polyval(coefs[..., None, :], _SCAN)              # (R, K, P, S)
+        sign = np.sign(scan)
+        change = sign[..., :-1] * sign[..., 1:] <= 0
+        r, k, p, j = np.nonzero(change)
+        if k.size == 0:
+            continue
+
+        c = coefs[r, k, p]
+        lo = _SCAN[j].copy()
+        hi = _SCAN[j + 1].copy()
+        f_lo = _polyval(c, lo)
+        for _ in range(_BISECTION_STEPS):
+            mid = 0.5 * (lo + hi)
+            f_mid = _polyval(c, mid)
+            left = f_lo * f_mid <= 0
+            hi = np.where(left, mid, hi)
+            lo = np.where(left, lo, mid)
+            f_lo = np.where(left, f_lo, f_mid)
+
+        s = 0.5 * (lo + hi)
+        ks.append(k)
+        ts.append(a[k, p] + (b[k, p] - a[k, p]) * s)
+
+    if not ks:
+        return np.zeros(0, dtype=int), np.zeros(0)
+    return np.concatenate(ks), np.concatenate(ts)
+
+
+def _candidates(n_dirs, edges, root_k, root_t):
+    """
+    Valeurs de t où un statut peut changer, par direction :
+    tableau (K, C) trié, complété par NaN.
+    """
+    k_edges = np.repeat(np.arange(n_dirs), edges.shape[1])
+    k_all = np.concatenate([k_edges, root_k])
+    t_all = np.concatenate([edges.ravel(), root_t])
+    keep = np.isfinite(t_all)
+    k_all, t_all = k_all[keep], t_all[keep]
+
+    order = np.lexsort((t_all, k_all))
+    k_all, t_all = k_all[order], t_all[order]
+    counts = np.bincount(k_all, minlength=n_dirs)
+    rank = np.arange(k_all.size) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    cand = np.full((n_dirs, counts.max()), np.nan)
+    cand[k_all, rank] = t_all
+    return cand
+
+
+# -----------------------------------------------------------
+# OPTIMISEUR
+# -----------------------------------------------------------
+
+def optimize_ballast(tractor, machine, loader, tires, options, env,
+                     front_offsets=None, rear_offsets=None,
+                     max_mass=3000.0, allow_warning=True, resolution=1.0,
+                     n_alternatives=5):
+    """
+    Entrées :
+        tractor, machine, loader, tires, options, env : comme solve()
+                        (les masses de lest des options sont ignorées :
+                        elles sont recherchées ; lestage à l'eau conservé)
+        front_offsets : déports possibles de la masse avant (m)
+                        (défaut : options["front_ballast_offset"])
+        rear_offsets  : idem pour la masse arrière
+        max_mass      : masse ajoutée totale maximale (kg)
+        allow_warning : True  → critères en avertissement acceptés
+                        False → tous les critères doivent être OK
+        resolution    : pas d'arrondi des masses (kg)
+        n_alternatives: nombre de solutions alternatives retournées
+
+    Sortie :
+        {
+            "feasible":     bool,
+            "total_mass":   masse ajoutée totale (kg) ou None,
+            "options":      options de lestage (masses + déports) ou None,
+            "compatibility_transport" / "compatibility_work" :
+                            critères de solve() pour la solution,
+            "alternatives": [{"total_mass", "options"}, ...]  (autres
+                            combinaisons, par masse croissante)
+        }
+
+    Lève ValueError si la configuration est invalide.
+    """
+    if not (isinstance(max_mass, (int, float)) and max_mass > 0):
+        raise ValueError(f"max_mass doit être > 0 (reçu {max_mass!r})")
+    if not (isinstance(resolution, (int, float)) and resolution > 0):
+        raise ValueError(f"resolution doit être > 0 (reçu {resolution!r})")
+
+    base_options = {**options, **{key: 0.0 for key in BALLAST_MASSES}}
+    if front_offsets is None:
+        front_offsets = [float(options.get("front_ballast_offset", 0.5) or 0)]
+    if rear_offsets is None:
+        rear_offsets = [float(options.get("rear_ballast_offset", 0.3) or 0)]
+    for offset in list(front_offsets) + list(rear_offsets):
+        if not (isinstance(offset, (int, float)) and math.isfinite(offset) and offset >= 0):
+            raise ValueError(f"Déport de lest invalide : {offset!r} (attendu ≥ 0)")
+    if not front_offsets and not rear_offsets:
+        raise ValueError("Aucun déport de lest avant / arrière")
+
+    loader = resolve_loader(tractor, base_options)
+    cfg = compile_config(tractor, machine, loader, tires, base_options)
+    env = {k: float(env.get(k, 0.0)) for k in ENV_KEYS}
+
+    slots = ballast_slots(cfg, front_offsets, rear_offsets)
+    directions = ballast_directions(slots)
+    points = directions @ np.array([pos for _, _, pos in slots])
+    evaluator = _Evaluator(cfg, env, points, allow_warning)
+    n_dirs = len(directions)
+
+    # ----- Morceaux lisses et racines des marges -----
+    bps = evaluator.breakpoints(max_mass)
+    edges = np.sort(np.concatenate([
+        np.zeros((n_dirs, 1)), bps, np.full((n_dirs, 1), float(max_mass))
+    ], axis=1), axis=1)
+    edges = np.where(np.isnan(edges), float(max_mass), edges)
+    root_k, root_t = _piece_roots(evaluator, edges[:, :-1], edges[:, 1:])
+
+    # ----- Statut réel aux candidats et dans chaque intervalle -----
+    cand = _candidates(n_dirs, edges, root_k, root_t)
+    mid = 0.5 * (cand[:, :-1] + cand[:, 1:])
+    ok_cand = evaluator.feasible(cand)
+    ok_mid = evaluator.feasible(mid)
+
+    # Première masse admissible (bord gauche d'un intervalle admissible)
+    entry = np.where(ok_cand, cand, np.inf)
+    entry[:, :-1] = np.minimum(entry[:, :-1], np.where(ok_mid, cand[:, :-1], np.inf))
+    first = np.argmin(entry, axis=1)
+    t_star = entry[np.arange(n_dirs), first]
+
+    # Repli : milieu de l'intervalle (si l'arrondi sort de l'intervalle)
+    mid_pad = np.concatenate([mid, np.full((n_dirs, 1), np.nan)], axis=1)
+    t_mid = np.where(ok_mid.any(axis=1) | ok_cand.any(axis=1),
+                     mid_pad[np.arange(n_dirs), first], np.nan)
+
+    # ----- Arrondi par lest (au multiple supérieur de resolution) -----
+    # L'arrondi déplace légèrement le barycentre : chaque solution est
+    # revérifiée par solve() ci-dessous, par masse totale croissante
+    # (milieux d'intervalle en dernier recours).
+    candidates = []
+    for t in (t_star, t_mid):
+        valid = np.isfinite(t)
+        masses = np.ceil(np.where(valid, t, 0.0)[:, None] * directions
+                         / resolution - 1e-9) * resolution
+        total = masses.sum(axis=1)
+        candidates += sorted(
+            ((float(total[k]), np.count_nonzero(masses[k]), masses[k])
+             for k in np.nonzero(valid & (total <= max_mass))[0]),
+            key=lambda c: c[:2],
+        )
+
+    result = {"feasible": False, "total_mass": None, "options": None,
+              "compatibility_transport": [], "compatibility_work": [],
+              "alternatives": []}
+
+    seen = set()
+    for total, _, masses in candidates:
+        ballast = _ballast_options(slots, masses, options)
+        key = tuple(sorted(ballast.items()))
+        if key in seen:
+            continue
+        seen.add(key)
+
+        sim = solve(tractor, machine, loader, tires, {**options, **ballast}, env)
+        worst = max((_LABEL_CODES[c["status"]]
+                     for mode in ("transport", "work")
+                     for c in sim["compatibility_" + mode]), default=STATUS_OK)
+        if worst > (STATUS_WARNING if allow_warning else STATUS_OK):
+            continue
+
+        if not result["feasible"]:
+            result.update({
+                "feasible": True,
+                "total_mass": total,
+                "options": ballast,
+                "compatibility_transport": sim["compatibility_transport"],
+                "compatibility_work": sim["compatibility_work"],
+            })
+            if total == 0:
+                break       # déjà compatible sans lest
+        elif len(result["alternatives"]) < n_alternatives:
+            result["alternatives"].append({"total_mass": total, "options": ballast})
+        else:
+            break
+
+    return result
+
+
+def _ballast_options(slots, masses, options):
+    """Options de lestage (masses + déports) d'une solution."""
+    ballast = {key: 0.0 for key in BALLAST_MASSES}
+    ballast["front_ballast_offset"] = float(options.get("front_ballast_offset", 0.5) or 0)
+    ballast["rear_ballast_offset"] = float(options.get("rear_ballast_offset", 0.3) or 0)
+
+    for (key, offset, _), m in zip(slots, masses):
+        if m > 0:
+            ballast[key] += float(m)
+            if offset is not None:
+                ballast[key.replace("_mass", "_offset")] = offset
+    return ballast
@@ -0,0 +1,148 @@
+"""
+batch.py — Solver vectorisé (plusieurs scénarios en un seul appel)
+------------------------------------------------------------------
+
+Même pipeline que solver.solve(), mais sur des TABLEAUX de scénarios :
+
+    CG local (par mode)   → cg.compute_local_CG_batch
+    rotation (pente)      → geometry.rotate_by_slopes_batch
+    stabilité statique    → static_pfs.compute_static_stability_batch
+    stabilité dynamique   → dynamic_pfd.compute_dynamic_stability_batch
+    charges aux roues     → wheels.wheel_loads_batch
+
+Les paramètres d'environnement (slope_lat, slope_long, speed, turn_radius,
+accel_long) et les masses additionnelles des options peuvent être des
+tableaux NumPy : ils sont broadcastés entre eux.
+
+Le résultat est "en colonnes" : un tableau par grandeur et par mode,
+identique (aux arrondis flottants près) à ce que donnerait solve()
+appelé scénario par scénario.
+
+evaluate_mode() ajoute à cette chaîne les statuts du profil de règles
+d'une configuration compilée : point d'entrée commun des analyses
+vectorisées (polar, lift, reach, route, drive_cycle, tire_search,
+api/batch.py).
+"""
+
+import numpy as np
+
+from .cg import compute_local_CG_batch
+from .compatibility import metrics_from
+from .compiled import compile_config, MODES
+from .geometry import rotate_by_slopes_batch
+from .static_pfs import compute_static_stability_batch
+from .dynamic_pfd import compute_dynamic_stability_batch
+from .wheels import wheel_loads_batch
+from .solver import resolve_loader
+
+
+ENV_KEYS = ("slope_lat", "slope_long", "speed", "turn_radius", "accel_long")
+
+
+# -----------------------------------------------------------
+# Chaîne vectorisée pour UN mode
+# -----------------------------------------------------------
+
+def evaluate_mode_batch(MT, X, Y, Z, env, wheelbase, track_front, track_rear):
+    """
+    Applique rotation → statique → dynamique → roues à un CG local.
+
+    MT, X, Y, Z : masse totale et CG local (tableaux broadcastables)
+    env         : dict de tableaux (ENV_KEYS)
+
+    Retourne un dictionnaire de colonnes.
+    """
+    X_rot, Y_rot, Z_rot = rotate_by_slopes_batch(env["slope_lat"], env["slope_long"], X, Y, Z)
+
+    static = compute_static_stability_batch(
+        MT, X_rot, Y_rot, Z_rot,
+        env["slope_lat"], env["slope_long"],
+        track_rear, wheelbase,
+    )
+
+    dynamic = compute_dynamic_stability_batch(
+        MT, Z_rot, static,
+        env["speed"], env["turn_radius"], env["accel_long"],
+    )
+
+    wheels = wheel_loads_batch(MT, X_rot, Y_rot, wheelbase, track_front, track_rear)
+
+    return {
+        "mass_total": MT,
+        "CG_X": X, "CG_Y": Y, "CG_Z": Z,
+        "CG_rot_X": X_rot, "CG_rot_Y": Y_rot, "CG_rot_Z": Z_rot,
+        **static,
+        **dynamic,
+        **wheels,
+    }
+
+
+def mode_metrics(cfg, cols):
+    """Grandeurs du profil de règles (cf. rules.METRICS) pour des colonnes."""
+    return metrics_from(cols, cols, cols["mass_total"],
+                        cfg.machine_mass, cfg.tractor_mass, cfg.ptac)
+
+
+def evaluate_mode(cfg, MT, X, Y, Z, env):
+    """
+    Chaîne vectorisée d'un mode pour une configuration compilée :
+    evaluate_mode_batch (géométrie de cfg) puis statut de chaque règle
+    de cfg.profile.
+
+    Retourne (colonnes, codes) ; codes : tableau int8 (n_règles, *forme
+    commune des colonnes), cf. RuleProfile.status_codes.
+    """
+    cols = evaluate_mode_batch(MT, X, Y, Z, env,
+                               cfg.wheelbase, cfg.track_front, cfg.track_rear)
+    codes = cfg.profile.status_codes(mode_metrics(cfg, cols))
+    shape = np.broadcast_shapes(*(np.shape(v) for v in cols.values()))
+    return cols, np.broadcast_to(codes, codes.shape[:1] + shape)
+
+
+# -----------------------------------------------------------
+# SOLVER VECTORISÉ
+# -----------------------------------------------------------
+
+def solve_batch(tractor, machine, loader, tires, options, env_arrays):
+    """
+    Entrées :
+        tractor, machine, loader, tires : comme solve()
+        options    : comme solve() ; wheel_weight_ARG/ARD, water_ballast,
+                     front/rear_ballast_mass et front/rear_ballast_offset
+                     peuvent être des tableaux
+        env_arrays : dict de tableaux (ou scalaires) :
+                        slope_lat, slope_long, speed, turn_radius, accel_long
+
+    Sortie :
+        {
+            "transport": {colonne: tableau, ...},
+            "work":      {colonne: tableau, ...}
+        }
+
+    Colonnes : mass_total, CG_X/Y/Z, CG_rot_X/Y/Z, I_lat, I_long, I_static,
+               d_lat, d_long, M_roll, M_rest_roll, M_pitch, M_rest_pitch,
+               F_lat, F_long, M_dyn_lat, M_dyn_long,
+               I_lat_dyn, I_long_dyn, I_dynamic, FL, FR, RL, RR
+
+    Tous les tableaux ont la forme commune (broadcast) des entrées.
+    """
+
+    loader = resolve_loader(tractor, options)
+    cfg = compile_config(tractor, machine, loader, tires, options, extras=False)
+
+    env = {k: np.asarray(env_arrays.get(k, 0.0), dtype=float) for k in ENV_KEYS}
+
+    results = {}
+    for mode in MODES:
+        MT, X, Y, Z = compute_local_CG_batch(cfg, options, mode)
+        cols = evaluate_mode_batch(MT, X, Y, Z, env,
+                                   cfg.wheelbase, cfg.track_front, cfg.track_rear)
+        results[mode] = _broadcast_columns(cols)
+
+    return results
+
+
+def _broadcast_columns(cols):
+    """Ramène toutes les colonnes à la même forme (copies contiguës)."""
+    shape = np.broadcast_shapes(*(np.shape(v) for v in cols.values()))
+    return {k: np.array(np.broadcast_to(v, shape), dtype=float) for k, v in cols.items()}
@@ -6,10 +6,12 @@ Ce module calcule le CG du système complet :
 
     CG_total = Tracteur + Machine(mode) + Loader(mode_user) + masses additionnelles
 
-Pour chaque simulation, on retourne DEUX CG :
+Pour chaque simulation, on retourne un CG par cas de charge
+(cf. compiled.load_cases) :
 
     - CG_transport
     - CG_work
+    - poses supplémentaires de la machine / du chargeur
 
 Chaque CG comprend :
     - CG_local   : avant rotation (sol plat)
@@ -18,13 +20,13 @@ Chaque CG comprend :
     - masse totale
 
 Le chargeur utilise loader_CG(), la machine dépend du mode,
-le tracteur dépend de ses propriétés.
+le tracteur dépend de ses propriétés. Les éléments de masse sont
+pré-calculés une fois par compiled.compile_config().
 """
 
 import numpy as np
 
 from .geometry import rotation_matrix
-from .loader import loader_CG
 from .geometry import get_geometry
 
 #---------------------------------------------------------------------------
@@ -90,9 +92,20 @@ def tractor_CG(tractor: dict, tires: dict = None, options: dict = None):
 
 
 # ---------------------------------------------------------------------------
-# CG de la machine (mode transport / mode work)
+# CG de la machine (mode transport / mode work / poses nommées)
 # ---------------------------------------------------------------------------
 
+def machine_pose(machine: dict, name: str):
+    """
+    Offsets {x_rel, y_rel, z_rel} d'une pose de la machine :
+    machine["transport"], machine["work"] ou machine["poses"][name].
+    """
+    poses = machine.get("poses") or {}
+    if name in poses:
+        return poses[name]
+    return machine[name]
+
+
 def machine_CG(machine: dict, tractor: dict, tires: dict,options: dict, mode: str):
     """
     Calcule le CG global de la machine en utilisant la règle officielle :
@@ -109,7 +122,7 @@ def machine_CG(machine: dict, tractor: dict, tires: dict,options: dict, mode: st
 
     m = float(machine["mass"])
 
-    cg_rel = machine[mode]
+    cg_rel = machine_pose(machine, mode)
     x_rel = float(cg_rel["x_rel"])
     y_rel = float(cg_rel["y_rel"])
     z_rel = float(cg_rel["z_rel"])
@@ -247,104 +260,282 @@ def extra_masses_CG(options: dict, tractor: dict, tires: dict):
     return MT_extra, CG_sum
 
 # ---------------------------------------------------------------------------
-# CG GLOBAL (transport + work)
+# CG GLOBAL (un bloc par cas de charge : transport, work, ...)
 # ---------------------------------------------------------------------------
 
-def compute_global_CG(tractor, machine, loader, tires, options,
-                      slope_lat, slope_long):
+def compute_local_CG(cfg):
     """
-    Calcule DEUX CG globaux :
-
-        - mode transport
-        - mode work
+    CG local (sol plat) de chaque cas de charge (cfg.cases), à partir
+    des éléments de masse de la configuration compilée :
 
-    Le chargeur utilise loader_CG(loader, tractor, tires, mode_user)
-    -> où mode_user = options["loader_mode"] ("low" ou "high")
+        1) tracteur
+        2) machine (selon la pose du cas)
+        3) chargeur (bras + chargeur low/high), si activé
+        4) masses additionnelles regroupées, si présentes
 
-    La machine dépend du mode (transport / work).
+    Ne dépend pas de la pente : peut être réutilisé pour plusieurs env.
 
     Retourne :
     {
-        "transport": {...},
-        "work": {...}
+        "transport": {"mass_total", "CG_local"},
+        "work":      {"mass_total", "CG_local"},
+        ...
     }
     """
 
-    # Chargeur : on calcule UNE SEULE FOIS le CG bras+loader
-    loader_mass, loader_cg = loader_CG(
-        loader,
-        tractor,
-        tires,
-        options
-    )
-
-    # Machine : deux modes
-    machine_modes = {
-        "transport": machine_CG(machine, tractor, tires, options, mode="transport"),
-        "work":      machine_CG(machine, tractor, tires, options, mode="work")
-    }
-    
     results = {}
 
-    for mode in ["transport", "work"]:
+    for mode in cfg.cases:
 
         MT = 0.0
         CG = np.zeros(3)
 
-        # ----------------------------------------------------------
-        # 1) Tracteur
-        # ----------------------------------------------------------
-        m, cg = tractor_CG(tractor, tires=tires, options=options)
-        MT, CG = accumulate_CG(MT, CG, m, cg)
-
-        # ----------------------------------------------------------
-        # 2) Machine (selon mode)
-        # ----------------------------------------------------------
-        m, cg = machine_modes[mode]
-        MT, CG = accumulate_CG(MT, CG, m, cg)
-
-        # ----------------------------------------------------------
-        # 3) Loader (bras + chargeur low/high)
-        # ----------------------------------------------------------
-        if options.get("loader_enabled", True) and loader is not None:
-            loader_mass, loader_cg = loader_CG(loader, tractor, tires, options)
-        else:
-            loader_mass, loader_cg = 0.0, np.zeros(3)
-
-        MT, CG = accumulate_CG(MT, CG, loader_mass, loader_cg)
-
-        # ----------------------------------------------------------
-        # 4) Masses additionnelles
-        # ----------------------------------------------------------
-        m_extra, cg_sum = extra_masses_CG(options, tractor, tires)
-        if m_extra > 0:
-            CG_extra = cg_sum / m_extra
-            MT, CG = accumulate_CG(MT, CG, m_extra, CG_extra)
-
-        # ----------------------------------------------------------
-        # 5) Normalisation du CG (local)
-        # ----------------------------------------------------------
-        CG_local = CG / MT
-
-        # ----------------------------------------------------------
-        # 6) Rotation selon la pente
-        # ----------------------------------------------------------
-        R = rotation_matrix(slope_lat, slope_long)
-        CG_rot = R @ CG_local
-
-        # ----------------------------------------------------------
-        # 7) Projection au sol
-        # ----------------------------------------------------------
-        CG_ground = np.array([CG_rot[0], CG_rot[1]])
+        for m, cg in cfg.elements[mode]:
+            MT, CG = accumulate_CG(MT, CG, m, cg)
 
-        # ----------------------------------------------------------
-        # 8) Stockage
-        # ----------------------------------------------------------
         results[mode] = {
             "mass_total": MT,
+            "CG_local": CG / MT
+        }
+
+    return results
+
+
+def rotate_CG(local_data, slope_lat, slope_long):
+    """
+    Applique la pente aux CG locaux (cf. compute_local_CG) :
+    rotation puis projection au sol.
+    """
+
+    R = rotation_matrix(slope_lat, slope_long)
+
+    results = {}
+
+    for mode, block in local_data.items():
+
+        CG_local = block["CG_local"]
+        # Somme colonne par colonne (et non R @ CG_local) : résultat
+        # indépendant de l'implémentation BLAS, identique au bit près
+        # au noyau scalaire (scalar.rotate_CG_scalar).
+        CG_rot = R[:, 0] * CG_local[0] + R[:, 1] * CG_local[1] + R[:, 2] * CG_local[2]
+        CG_ground = np.array([CG_rot[0], CG_rot[1]])
+
+        results[mode] = {
+            "mass_total": block["mass_total"],
             "CG_local": CG_local,
             "CG_rotated": CG_rot,
             "CG_ground": CG_ground
         }
 
     return results
+
+
+def compute_global_CG(cfg, slope_lat, slope_long):
+    """
+    Calcule un CG global par cas de charge :
+
+        - mode transport
+        - mode work
+        - poses nommées supplémentaires (cfg.cases)
+
+    cfg : CompiledConfig (cf. compiled.compile_config)
+
+    = compute_local_CG (accumulation des masses)
+      + rotate_CG (rotation selon la pente + projection au sol)
+
+    Retourne :
+    {
+        "transport": {...},
+        "work": {...},
+        ...
+    }
+    """
+
+    return rotate_CG(compute_local_CG(cfg), slope_lat, slope_long)
+
+
+# ---------------------------------------------------------------------------
+# Versions vectorisées (batch)
+# ---------------------------------------------------------------------------
+#
+# Chaque élément de masse est décrit par un tuple (m, x, y, z) de tableaux
+# broadcastables : un même code sert pour un tableau de scénarios, pour un
+# produit croisé de catalogues, etc. Les formules sont celles des fonctions
+# scalaires ci-dessus.
+
+def accumulate_CG_batch(elements):
+    """
+    Version vectorisée de accumulate_CG() + normalisation.
+
+    elements : liste de tuples (m, x, y, z)
+    Retourne : MT, X, Y, Z (CG local normalisé)
+
+    Comme dans accumulate_CG(), une masse nulle ou négative est ignorée.
+    """
+    MT, SX, SY, SZ = _weighted_sums(elements)
+    return MT, SX / MT, SY / MT, SZ / MT
+
+
+def _weighted_sums(elements):
+    """Σm, Σm·x, Σm·y, Σm·z dans l'ordre des éléments (masses ≤ 0 ignorées)."""
+    MT = 0.0
+    SX = SY = SZ = 0.0
+
+    for m, x, y, z in elements:
+        m = np.where(np.asarray(m, dtype=float) > 0, m, 0.0)
+        MT = MT + m
+        SX = SX + m * x
+        SY = SY + m * y
+        SZ = SZ + m * z
+
+    return MT, SX, SY, SZ
+
+
+def tractor_CG_batch(mass, pct_front, wheelbase, R_AR, cg_height_nominal=1.0,
+                     z_factor=1.30):
+    """
+    Version vectorisée de tractor_CG().
+
+    pct_front : part de masse sur l'essieu avant (0..1)
+    R_AR      : rayon du pneu arrière (m) ; Z = R_AR * z_factor si R_AR > 0
+    z_factor  : 1.30 dans tractor_CG() (tableau possible, cf. montecarlo.py)
+    """
+    X = (pct_front * wheelbase) - (wheelbase / 2.0)
+    Z = np.where(np.asarray(R_AR) > 0, R_AR * z_factor, cg_height_nominal)
+    return mass, X, 0.0, Z
+
+
+def machine_CG_batch(mass, x_rel, y_rel, z_rel, wheelbase, R_AR):
+    """Version vectorisée de machine_CG() : x = -L/2 - R - x_rel."""
+    x = -wheelbase / 2.0 - R_AR - x_rel
+    return mass, x, y_rel, z_rel
+
+
+def loader_CG_batch(mass_loader, mass_arms, kx_arms, z_arms, kx, kz,
+                    wheelbase, R_AR, payload=0.0):
+    """
+    Version vectorisée de loader_CG() (bras + chargeur + charge du godet).
+
+    kx, kz  : coefficients de la position choisie (low / high, ou levage
+              continu, cf. loader.lift_coefficients)
+    payload : charge du godet (kg), au CG du chargeur
+    """
+    mass_total = mass_arms + mass_loader + payload
+
+    X = (mass_arms * (kx_arms * wheelbase)
+         + (mass_loader + payload) * (kx * wheelbase)) / mass_total
+    Z = (mass_arms * (R_AR + z_arms)
+         + (mass_loader + payload) * (R_AR + kz * mass_loader)) / mass_total
+
+    return mass_total, X, 0.0, Z
+
+
+def extra_masses_CG_batch(wheelbase, track_rear, R_AR, volume_l,
+                          wheel_weight_ARG=0.0, wheel_weight_ARD=0.0,
+                          water_ballast=False,
+                          rear_ballast_mass=0.0, rear_ballast_offset=0.0,
+                          front_ballast_mass=0.0, front_ballast_offset=0.0):
+    """
+    Version vectorisée de extra_masses_CG().
+
+    Retourne la liste des éléments (m, x, y, z) — à passer directement
+    à accumulate_CG_batch().
+    """
+    M_water = np.where(water_ballast, 0.754875 * volume_l, 0.0)
+
+    return [
+        # Masses roues ARG / ARD
+        (wheel_weight_ARG, -wheelbase / 2.0, +track_rear / 2.0, R_AR),
+        (wheel_weight_ARD, -wheelbase / 2.0, -track_rear / 2.0, R_AR),
+
+        # Lestage à l'eau (un pneu gauche, un pneu droit)
+        (M_water, -wheelbase / 2.0, +track_rear / 2.0, R_AR * 0.3),
+        (M_water, -wheelbase / 2.0, -track_rear / 2.0, R_AR * 0.3),
+
+        # Masses arrière / avant paramétrables
+        (rear_ballast_mass, -wheelbase / 2.0 - rear_ballast_offset, 0.0, 0.8),
+        (front_ballast_mass, +wheelbase / 2.0 + front_ballast_offset, 0.0, 0.8),
+    ]
+
+
+def _option_array(options, key, default, dtype=float):
+    """Lit une option (scalaire ou tableau) ; None est traité comme la valeur par défaut."""
+    value = options.get(key, default)
+    if value is None:
+        value = default
+    return np.asarray(value, dtype=dtype)
+
+
+def group_elements_batch(elements):
+    """
+    Regroupe des éléments (m, x, y, z) en UN élément (masse totale, CG) ;
+    version vectorisée de scalar.extra_element() : même ordre de somme,
+    CG = Σ(m·pos) / Σm, masse nulle là où aucune masse n'est positive.
+    """
+    MT, SX, SY, SZ = _weighted_sums(elements)
+    safe = np.where(MT > 0, MT, 1.0)
+    return MT, SX / safe, SY / safe, SZ / safe
+
+
+def extra_elements_batch(wheelbase, track_rear, R_AR, volume_l, options):
+    """
+    Élément unique des masses additionnelles lues dans `options`
+    (scalaires ou tableaux, cf. _option_array), regroupées comme
+    compiled.extra_element (cf. group_elements_batch) : même somme
+    qu'un solve() au bit près.
+    """
+    return [group_elements_batch(extra_masses_CG_batch(
+        wheelbase, track_rear, R_AR, volume_l,
+        wheel_weight_ARG=_option_array(options, "wheel_weight_ARG", 0.0),
+        wheel_weight_ARD=_option_array(options, "wheel_weight_ARD", 0.0),
+        water_ballast=_option_array(options, "water_ballast", False, bool),
+        rear_ballast_mass=_option_array(options, "rear_ballast_mass", 0.0),
+        rear_ballast_offset=_option_array(options, "rear_ballast_offset", 0.0),
+        front_ballast_mass=_option_array(options, "front_ballast_mass", 0.0),
+        front_ballast_offset=_option_array(options, "front_ballast_offset", 0.0),
+    ))]
+
+
+def local_elements_batch(wheelbase, track_rear, R_AR, volume_l, options,
+                         tractor, machine, loader=None):
+    """
+    Éléments (m, x, y, z) d'un mode quand tracteur, machine ou pneu
+    arrière varient : tracteur, machine, chargeur puis masses
+    additionnelles (même ordre que compute_local_CG()).
+
+    Toutes les valeurs sont broadcastables :
+        tractor : {"mass", "pct_front", "cg_height_nominal"[, "z_factor"]}
+                  (cf. tractor_CG_batch)
+        machine : {"mass", "x_rel", "y_rel", "z_rel"} (cf. machine_CG_batch)
+        loader  : élément (m, x, y, z) du chargeur, ou None
+        options : masses additionnelles (cf. extra_elements_batch)
+    """
+    elements = [
+        tractor_CG_batch(tractor["mass"], tractor["pct_front"], wheelbase, R_AR,
+                         tractor["cg_height_nominal"], tractor.get("z_factor", 1.30)),
+        machine_CG_batch(machine["mass"], machine["x_rel"], machine["y_rel"],
+                         machine["z_rel"], wheelbase, R_AR),
+    ]
+    if loader is not None:
+        elements.append(loader)
+
+    return elements + extra_elements_batch(wheelbase, track_rear, R_AR, volume_l, options)
+
+
+def compute_local_CG_batch(cfg, options, mode):
+    """
+    CG local (avant rotation) d'un mode pour des options vectorisées.
+
+    cfg     : CompiledConfig (éléments tracteur / machine / chargeur)
+    options : les masses additionnelles (wheel_weight_ARG/ARD,
+              water_ballast, rear/front_ballast_mass/offset) peuvent
+              être des tableaux
+
+    Retourne : MT, X, Y, Z
+    """
+    elements = [(m, cg[0], cg[1], cg[2]) for m, cg in cfg.base_elements[mode]]
+
+    elements += extra_elements_batch(cfg.wheelbase, cfg.track_rear,
+                                     cfg.rear_radius, cfg.rear_volume, options)
+
+    return accumulate_CG_batch(elements)
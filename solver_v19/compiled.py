@@ -0,0 +1,370 @@
+"""
+compiled.py — Configuration compilée (tracteur + machine + chargeur + pneu + options)
+-------------------------------------------------------------------------------------
+
+Les étapes du solver relisaient chacune les mêmes dictionnaires JSON
+(get_geometry(), tires[options["rear_tire"]], masses additionnelles…).
+
+compile_config() fait ce travail UNE SEULE FOIS :
+
+    - validation des entrées (erreurs explicites avant le calcul)
+    - géométrie : empattement, voies AV / AR
+    - rayon et volume du pneu arrière
+    - cas de charge nommés (transport, work + poses déclarées dans les
+      JSON machine / chargeur, cf. load_cases)
+    - liste des éléments de masse (m, CG local) pour chaque cas
+    - profil de règles de compatibilité (options["rules_profile"])
+
+et retourne un CompiledConfig immuable, consommé par toutes les étapes
+(cg, static_pfs, dynamic_pfd, wheels, compatibilité).
+"""
+
+import math
+
+import numpy as np
+
+from .cg import tractor_CG, machine_CG, extra_masses_CG, machine_pose
+from .loader import loader_CG
+from .rules import load_profile
+from . import scalar
+
+
+MODES = ("transport", "work")
+
+LOADER_MODES = ("low", "high")
+
+KERNELS = ("numpy", "scalar")
+
+# Position des éléments de chaque cas dans base_elements / elements :
+# tracteur, machine, chargeur (si activé), puis masses additionnelles
+TRACTOR_ELEMENT = 0
+MACHINE_ELEMENT = 1
+LOADER_ELEMENT = 2
+
+BALLAST_OPTIONS = (
+    "wheel_weight_ARG", "wheel_weight_ARD",
+    "front_ballast_mass", "front_ballast_offset",
+    "rear_ballast_mass", "rear_ballast_offset",
+)
+
+
+# -----------------------------------------------------------
+# Objet compilé
+# -----------------------------------------------------------
+
+class CompiledConfig:
+    """
+    Configuration figée et pré-calculée.
+
+    Attributs :
+        tractor, machine, loader : JSON d'origine (loader = None si absent)
+        options                  : options d'origine
+        wheelbase, track_front, track_rear : géométrie (m)
+        rear_radius, rear_volume : rayon (m) et volume (L) du pneu arrière
+        tractor_mass, machine_mass, ptac
+        profile       : profil de règles compilé (rules.RuleProfile)
+        cases         : noms des cas de charge (transport, work, ...)
+        base_elements : {cas: ((m, cg), ...)} tracteur, machine, chargeur
+                        (positions TRACTOR_ELEMENT, MACHINE_ELEMENT,
+                        LOADER_ELEMENT)
+        extra_element : (m, cg) masses additionnelles regroupées, ou None
+        elements      : {cas: base_elements[cas] (+ extra_element)}
+        kernel        : "numpy" (cg = tableau NumPy en lecture seule)
+                        ou "scalar" (cg = tuple de flottants)
+    """
+
+    __slots__ = (
+        "tractor", "machine", "loader", "options",
+        "wheelbase", "track_front", "track_rear",
+        "rear_radius", "rear_volume",
+        "tractor_mass", "machine_mass", "ptac", "profile", "cases",
+        "base_elements", "extra_element", "elements", "kernel",
+    )
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            object.__setattr__(self, name, fields[name])
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CompiledConfig est immuable")
+
+    def __delattr__(self, name):
+        raise AttributeError("CompiledConfig est immuable")
+
+    def __repr__(self):
+        return (f"CompiledConfig(tractor={self.tractor.get('name')!r}, "
+                f"machine={self.machine.get('model')!r}, "
+                f"loader={self.loader.get('name') if self.loader else None!r})")
+
+
+# -----------------------------------------------------------
+# Validation
+# -----------------------------------------------------------
+
+def _require_number(value, label, *args, positive=False, allow_none=False):
+    """
+    Vérifie qu'une valeur est un nombre fini (et > 0 si demandé).
+
+    label : modèle du message d'erreur, complété par label.format(*args)
+            uniquement en cas d'erreur (la validation est faite à chaque
+            solve()).
+    """
+    if type(value) in (float, int) and math.isfinite(value) and (value > 0 or not positive):
+        return
+    if value is None and allow_none:
+        return
+    label = label.format(*args)
+    if isinstance(value, bool) or not isinstance(value, (int, float, np.number)):
+        raise ValueError(f"{label} : nombre attendu, reçu {value!r}")
+    if not math.isfinite(value):
+        raise ValueError(f"{label} : valeur non finie ({value!r})")
+    if positive and value <= 0:
+        raise ValueError(f"{label} : doit être > 0 (reçu {value!r})")
+
+
+def validate_inputs(tractor, machine, loader, tires, options, extras=True):
+    """
+    Vérifie la cohérence des entrées avant le calcul.
+    Lève ValueError avec un message explicite.
+    """
+    name = tractor.get("name", "?")
+    _require_number(tractor.get("mass"), "Tracteur '{}' : mass", name, positive=True)
+    geometry = tractor.get("geometry") or {}
+    for key in ("wheelbase", "track_front", "track_rear"):
+        _require_number(geometry.get(key), "Tracteur '{}' : geometry.{}", name, key,
+                        positive=True)
+    pct = tractor.get("mass_front_pct", 50)
+    _require_number(pct, "Tracteur '{}' : mass_front_pct", name)
+    if not 0 <= pct <= 100:
+        raise ValueError(f"Tracteur '{name}' : mass_front_pct hors de [0, 100] ({pct})")
+
+    model = machine.get("model", "?")
+    _require_number(machine.get("mass"), "Machine '{}' : mass", model)
+    if machine["mass"] < 0:
+        raise ValueError(f"Machine '{model}' : mass doit être ≥ 0")
+    poses = machine.get("poses") or {}
+    if not isinstance(poses, dict):
+        raise ValueError(f"Machine '{model}' : 'poses' doit être un objet {{nom: pose}}")
+    for mode in MODES + tuple(poses):
+        pose = machine_pose(machine, mode) if mode in poses or mode in machine else None
+        if not isinstance(pose, dict):
+            raise ValueError(f"Machine '{model}' : pose '{mode}' manquante")
+        for axis in ("x_rel", "y_rel", "z_rel"):
+            _require_number(pose.get(axis), "Machine '{}' : {}.{}", model, mode, axis)
+
+    rear_tire = options.get("rear_tire")
+    if rear_tire not in tires:
+        raise ValueError(f"Pneu arrière inconnu : {rear_tire!r}")
+    _require_number(tires[rear_tire].get("diameter_mm"),
+                    "Pneu '{}' : diameter_mm", rear_tire, positive=True)
+    water_ballast = options.get("water_ballast", False)
+    if isinstance(water_ballast, np.ndarray):
+        water_ballast = water_ballast.any()
+    if water_ballast:
+        _require_number(tires[rear_tire].get("volume_l"), "Pneu '{}' : volume_l", rear_tire)
+
+    if loader is not None:
+        label = f"Chargeur '{loader.get('name', '?')}'"
+        try:
+            rules_x, rules_z = loader["rules"]["x"], loader["rules"]["z"]
+            coefs = [rules_x[k] for k in ("arms", "low", "high")]
+            coefs += [rules_z[k] for k in ("arms", "k_low", "k_high")]
+        except (KeyError, TypeError):
+            raise ValueError(f"{label} : bloc 'rules' incomplet")
+        for value in coefs:
+            _require_number(value, "{} : coefficient", label)
+        if float(loader.get("mass_loader", 0)) + float(loader.get("mass_arms", 0)) <= 0:
+            raise ValueError(f"{label} : masse nulle")
+
+        lift = options.get("loader_lift")
+        _require_number(lift, "Option {}", "loader_lift", allow_none=True)
+        if lift is not None and not 0 <= lift <= 1:
+            raise ValueError(f"Option loader_lift : fraction de levage dans [0, 1] attendue (reçu {lift!r})")
+        payload = options.get("loader_payload")
+        _require_number(payload, "Option {}", "loader_payload", allow_none=True)
+        if payload is not None and payload < 0:
+            raise ValueError(f"Option loader_payload : doit être ≥ 0 (reçu {payload!r})")
+
+    if extras:
+        for key in BALLAST_OPTIONS:
+            value = options.get(key, 0)
+            _require_number(value, "Option {}", key, allow_none=True)
+            if value is not None and value < 0:
+                raise ValueError(f"Option {key} : doit être ≥ 0 (reçu {value!r})")
+
+
+# -----------------------------------------------------------
+# Compilation
+# -----------------------------------------------------------
+
+def _frozen(element):
+    """Élément (m, cg) avec un CG en lecture seule."""
+    m, cg = element
+    cg = np.array(cg, dtype=float)
+    cg.setflags(write=False)
+    return float(m), cg
+
+
+# -----------------------------------------------------------
+# Cas de charge
+# -----------------------------------------------------------
+
+def load_cases(machine, loader=None):
+    """
+    Cas de charge nommés, dans l'ordre :
+
+        transport, work      : poses du JSON machine (obligatoires)
+        machine["poses"]     : {nom: {"x_rel", "y_rel", "z_rel"}}
+                               (ex. travail à gauche, replié en bout de champ)
+        loader["poses"]      : {nom: {"loader_mode": "high",
+                                      "machine": "transport"}}
+                               (chargeur actif seulement ; ex. chargeur levé)
+
+    Retourne {nom: (pose machine, position du chargeur)} ; position None
+    = options["loader_mode"].
+    """
+    model = machine.get("model", "?")
+    cases = {mode: (mode, None) for mode in MODES}
+
+    for name in machine.get("poses") or {}:
+        if name in cases:
+            raise ValueError(f"Machine '{model}' : cas de charge '{name}' en double")
+        cases[name] = (name, None)
+
+    if loader is not None:
+        label = f"Chargeur '{loader.get('name', '?')}'"
+        poses = loader.get("poses") or {}
+        if not isinstance(poses, dict):
+            raise ValueError(f"{label} : 'poses' doit être un objet {{nom: pose}}")
+        for name, pose in poses.items():
+            if name in cases:
+                raise ValueError(f"{label} : cas de charge '{name}' en double")
+            if not isinstance(pose, dict):
+                raise ValueError(f"{label} : pose '{name}' invalide")
+            machine_name = pose.get("machine", "transport")
+            if cases.get(machine_name, (None,))[0] != machine_name:
+                raise ValueError(f"{label} : pose '{name}' → pose machine inconnue {machine_name!r}")
+            loader_mode = pose.get("loader_mode", "high")
+            if loader_mode not in LOADER_MODES:
+                raise ValueError(f"{label} : pose '{name}' → loader_mode 'low' ou 'high' attendu")
+            cases[name] = (machine_name, loader_mode)
+
+    return cases
+
+
+def _loader_options(options, loader_mode):
+    """Options avec la position du chargeur imposée par un cas de charge."""
+    if loader_mode is None:
+        return options
+    return {**options, "loader_mode": loader_mode, "loader_lift": None}
+
+
+def _numpy_elements(tractor, machine, loader, tires, options, extras, cases):
+    """Éléments de masse (CG en tableaux NumPy), cf. cg.py / loader.py."""
+    tractor_el = _frozen(tractor_CG(tractor, tires=tires, options=options))
+    loader_els = {}
+    if loader is not None:
+        loader_els = {
+            mode: _frozen(loader_CG(loader, tractor, tires, _loader_options(options, mode)))
+            for mode in {mode for _, mode in cases.values()}
+        }
+    machine_els = {
+        pose: _frozen(machine_CG(machine, tractor, tires, options, mode=pose))
+        for pose in {pose for pose, _ in cases.values()}
+    }
+
+    # Masses additionnelles regroupées en un seul élément
+    extra_element = None
+    if extras:
+        m_extra, cg_sum = extra_masses_CG(options, tractor, tires)
+        if m_extra > 0:
+            extra_element = _frozen((m_extra, cg_sum / m_extra))
+
+    return tractor_el, machine_els, loader_els, extra_element
+
+
+def _scalar_elements(tractor, machine, loader, tires, options, extras, cases):
+    """Éléments de masse (CG en tuples de flottants), cf. scalar.py."""
+    tractor_el = scalar.tractor_element(tractor, tires, options)
+    loader_els = {}
+    if loader is not None:
+        loader_els = {
+            mode: scalar.loader_element(loader, tractor, tires, _loader_options(options, mode))
+            for mode in {mode for _, mode in cases.values()}
+        }
+    machine_els = {
+        pose: scalar.machine_element(machine, tractor, tires, options, pose)
+        for pose in {pose for pose, _ in cases.values()}
+    }
+    # Masses additionnelles regroupées en un seul élément
+    extra_element = scalar.extra_element(options, tractor, tires) if extras else None
+
+    return tractor_el, machine_els, loader_els, extra_element
+
+
+def compile_config(tractor, machine, loader, tires, options, extras=True,
+                   kernel="numpy"):
+    """
+    Entrées : comme solve() — `loader` est le chargeur EFFECTIF
+              (None si désactivé, cf. solver.resolve_loader).
+
+    extras=False : ne compile pas les masses additionnelles des options
+                   (utilisé par le solver vectorisé, où elles sont des
+                   tableaux traités à part).
+
+    kernel : "numpy"  → CG des éléments en tableaux NumPy
+             "scalar" → CG des éléments en tuples (noyau scalar.py)
+
+    Retourne un CompiledConfig.
+    """
+    if kernel not in KERNELS:
+        raise ValueError(f"Noyau inconnu : {kernel!r} (attendu : {', '.join(KERNELS)})")
+
+    validate_inputs(tractor, machine, loader, tires, options, extras=extras)
+    profile = load_profile(options.get("rules_profile"))
+
+    geometry = tractor["geometry"]
+    tire = tires[options["rear_tire"]]
+
+    if not (options.get("loader_enabled", True) and loader is not None):
+        loader = None
+
+    # ----- Éléments communs / par cas de charge -----
+    cases = load_cases(machine, loader)
+    build = _scalar_elements if kernel == "scalar" else _numpy_elements
+    tractor_el, machine_els, loader_els, extra_element = build(
+        tractor, machine, loader, tires, options, extras, cases
+    )
+
+    base_elements = {}
+    for case, (pose, loader_mode) in cases.items():
+        els = [tractor_el, machine_els[pose]]          # TRACTOR_ELEMENT, MACHINE_ELEMENT
+        if loader is not None:
+            els.append(loader_els[loader_mode])        # LOADER_ELEMENT
+        base_elements[case] = tuple(els)
+
+    elements = {
+        case: base_elements[case] + ((extra_element,) if extra_element else ())
+        for case in cases
+    }
+
+    return CompiledConfig(
+        tractor=tractor,
+        machine=machine,
+        loader=loader,
+        options=options,
+        wheelbase=float(geometry["wheelbase"]),
+        track_front=float(geometry["track_front"]),
+        track_rear=float(geometry["track_rear"]),
+        rear_radius=tire["diameter_mm"] / 2000.0,
+        rear_volume=float(tire.get("volume_l", 0.0)),
+        tractor_mass=float(tractor.get("mass", 0)),
+        machine_mass=float(machine.get("mass", 0)),
+        ptac=tractor.get("ptac", None),
+        profile=profile,
+        cases=tuple(cases),
+        base_elements=base_elements,
+        extra_element=extra_element,
+        elements=elements,
+        kernel=kernel,
+    )
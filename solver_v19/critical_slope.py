@@ -0,0 +1,234 @@
+"""
+critical_slope.py — Pente maximale admissible (dévers / pente critique)
+-----------------------------------------------------------------------
+
+Pour une configuration (CG local, masse, géométrie), cherche la pente à
+partir de laquelle chaque critère de compatibilité est violé pour la
+première fois :
+
+    - "I_lat"  : règles du profil portant sur I_lat seul
+                 (options["rules_profile"], ex. I_lat ≥ 0.40)
+    - "I_long" : règles du profil portant sur I_long seul (ex. ≥ 0.50)
+    - "wheels" : aucune roue délestée (FL, FR, RL, RR > 0)
+
+Un critère est violé dès qu'une de ses règles est en danger ; un profil
+sans règle sur l'indice ne le viole jamais (cf. index_rules).
+
+Deux axes sont explorés séparément (l'autre pente restant nulle) :
+
+    - "lat"  : dévers    (slope_lat)
+    - "long" : pente     (slope_long)
+
+et pour chaque axe les deux sens (pente positive / négative, même
+convention que geometry.rotation_matrix).
+
+Méthode (vectorisée sur toutes les configurations à la fois) :
+
+    1) balayage grossier de 0 à slope_max → premier pas violé
+    2) bissection dans l'intervalle encadrant jusqu'à la tolérance
+
+Les pentes critiques sont retournées en degrés (valeur absolue) :
+    0      → critère déjà violé sur sol plat
+    np.inf → critère jamais violé jusqu'à slope_max
+"""
+
+import math
+
+import numpy as np
+
+from .cg import accumulate_CG_batch, compute_local_CG_batch
+from .compiled import compile_config, MODES
+from .geometry import rotate_by_slopes_batch
+from .rules import load_profile, METRICS, STATUS_DANGER, STATUS_NA
+from .solver import resolve_loader
+from .static_pfs import static_indices_batch
+from .sweep import catalog_elements
+from .wheels import wheel_loads_batch
+
+
+CRITERIA = ("I_lat", "I_long", "wheels")
+AXES = ("lat", "long")
+
+
+# -----------------------------------------------------------
+# Critères violés pour une pente donnée
+# -----------------------------------------------------------
+
+def index_rules(profile):
+    """
+    Règles du profil évaluables avec un seul indice de stabilité :
+    {"I_lat": [règles], "I_long": [règles]} (cf. hazard.stability_rules).
+    """
+    out = {}
+    for index in ("I_lat", "I_long"):
+        probe = {name: np.nan for name in METRICS}
+        probe[index] = 1.0
+        out[index] = [rule for rule in profile.rules
+                      if rule.evaluate(probe)[2] != STATUS_NA]
+    return out
+
+
+def _violations(MT, X, Y, Z, slope_lat, slope_long,
+                wheelbase, track_front, track_rear, rules):
+    """Retourne {critère: tableau booléen (True = critère violé)}."""
+    X_rot, Y_rot, Z_rot = rotate_by_slopes_batch(slope_lat, slope_long, X, Y, Z)
+
+    I_lat, I_long, I_static = static_indices_batch(X_rot, Y_rot, Z_rot, track_rear, wheelbase)
+    wheels = wheel_loads_batch(MT, X_rot, Y_rot, wheelbase, track_front, track_rear)
+    min_wheel = np.minimum(np.minimum(wheels["FL"], wheels["FR"]),
+                           np.minimum(wheels["RL"], wheels["RR"]))
+
+    metrics = {name: np.nan for name in METRICS}
+    metrics.update(I_lat=np.asarray(I_lat), I_long=np.asarray(I_long),
+                   I_static=np.asarray(I_static))
+
+    violations = {"wheels": min_wheel <= 0}
+    for index, group in rules.items():
+        violated = False
+        for rule in group:
+            violated = violated | (rule.evaluate(metrics)[2] == STATUS_DANGER)
+        violations[index] = violated
+    return violations
+
+
+# -----------------------------------------------------------
+# Recherche vectorisée (balayage + bissection)
+# -----------------------------------------------------------
+
+def critical_slopes_batch(MT, X, Y, Z, wheelbase, track_front, track_rear,
+                          slope_max=45.0, step=2.5, tol=0.01, rules_profile=None):
+    """
+    Pentes critiques pour des tableaux de configurations.
+
+    Entrées : CG local (MT, X, Y, Z) et géométrie, tableaux broadcastables
+    rules_profile : profil de règles des critères I_lat / I_long
+                    (nom ou RuleProfile ; None → profil par défaut)
+    slope_max : borne de recherche (degrés)
+    step      : pas du balayage grossier (degrés)
+    tol       : précision finale de la bissection (degrés)
+
+    Sortie :
+        {
+            "lat":  {"I_lat": {"positive": arr, "negative": arr}, ...,
+                     "all":   {"positive": arr, "negative": arr}},
+            "long": {...}
+        }
+    "all" = première pente à laquelle AU MOINS un critère est violé.
+    """
+    shape = np.broadcast_shapes(*(np.shape(a) for a in
+                                  (MT, X, Y, Z, wheelbase, track_front, track_rear)))
+    geom = (wheelbase, track_front, track_rear)
+    rules = index_rules(load_profile(rules_profile))
+
+    # Configuration invalide (ex. pneu inconnu) → NaN
+    invalid = np.broadcast_to(np.isnan(np.asarray(MT + X + Y + Z, dtype=float)), shape)
+
+    n_steps = int(math.ceil(slope_max / step))
+    scan = np.linspace(0.0, n_steps * step, n_steps + 1)
+    n_bisect = max(0, int(math.ceil(math.log2(step / tol))))
+
+    results = {}
+    for axis in AXES:
+        results[axis] = {c: {} for c in CRITERIA}
+
+        for sign_name, sign in (("positive", 1.0), ("negative", -1.0)):
+
+            def violated(slope):
+                slope = sign * slope
+                if axis == "lat":
+                    return _violations(MT, X, Y, Z, slope, 0.0, *geom, rules)
+                return _violations(MT, X, Y, Z, 0.0, slope, *geom, rules)
+
+            # 1) Balayage : premier pas violé par critère
+            first = {c: np.full(shape, -1) for c in CRITERIA}
+            for k, s in enumerate(scan):
+                v = violated(s)
+                for c in CRITERIA:
+                    new = (first[c] < 0) & np.broadcast_to(v[c], shape)
+                    first[c][new] = k
+
+            # 2) Bissection entre scan[k-1] (sûr) et scan[k] (violé)
+            for c in CRITERIA:
+                k = first[c]
+                found = k > 0
+                lo = np.where(found, scan[np.maximum(k - 1, 0)], 0.0)
+                hi = np.where(found, scan[np.maximum(k, 0)], 0.0)
+
+                for _ in range(n_bisect):
+                    mid = 0.5 * (lo + hi)
+                    v = np.broadcast_to(violated(mid)[c], shape)
+                    hi = np.where(found & v, mid, hi)
+                    lo = np.where(found & ~v, mid, lo)
+
+                critical = np.where(k == 0, 0.0, np.where(found, hi, np.inf))
+                critical = np.where(invalid, np.nan, critical)
+                results[axis][c][sign_name] = critical
+
+        results[axis]["all"] = {
+            s: np.minimum.reduce([results[axis][c][s] for c in CRITERIA])
+            for s in ("positive", "negative")
+        }
+
+    return results
+
+
+# -----------------------------------------------------------
+# Une configuration (dicts JSON)
+# -----------------------------------------------------------
+
+def critical_slopes(tractor, machine, loader, tires, options, **kwargs):
+    """
+    Pentes critiques d'UNE configuration, pour les deux modes.
+
+    Entrées : comme solve() (sans env) ; kwargs → critical_slopes_batch
+    Sortie  : {"transport": {...}, "work": {...}} (valeurs scalaires)
+    """
+    loader = resolve_loader(tractor, options)
+    cfg = compile_config(tractor, machine, loader, tires, options, extras=False)
+
+    results = {}
+    for mode in MODES:
+        MT, X, Y, Z = compute_local_CG_batch(cfg, options, mode)
+        res = critical_slopes_batch(MT, X, Y, Z, cfg.wheelbase, cfg.track_front,
+                                    cfg.track_rear, rules_profile=cfg.profile, **kwargs)
+        results[mode] = {
+            axis: {c: {s: float(v) for s, v in signs.items()} for c, signs in crits.items()}
+            for axis, crits in res.items()
+        }
+    return results
+
+
+# -----------------------------------------------------------
+# Catalogue complet (tableaux issus de sweep.compile_catalog)
+# -----------------------------------------------------------
+
+def critical_slopes_catalog(catalog, options: dict = None,
+                            default_tire=True, **kwargs):
+    """
+    Pentes critiques de tout le catalogue en un seul appel.
+
+    default_tire=True  : pneu arrière de série de chaque tracteur
+                         → tableaux (T, M)
+    default_tire=False : tous les pneus du catalogue → tableaux (T, M, P)
+
+    Sortie : {"transport": résultat critical_slopes_batch, "work": ...}
+    """
+    options = options or {}
+    t_all = slice(0, len(catalog["tractor_keys"]))
+
+    wheelbase = catalog["tractor_wheelbase"][:, None, None]
+    track_front = catalog["tractor_track_front"][:, None, None]
+    track_rear = catalog["tractor_track_rear"][:, None, None]
+
+    results = {}
+    for mode in MODES:
+        elements = catalog_elements(catalog, t_all, mode, options, default_tire=default_tire)
+        MT, X, Y, Z = accumulate_CG_batch(elements)
+        res = critical_slopes_batch(MT, X, Y, Z, wheelbase, track_front, track_rear,
+                                    rules_profile=options.get("rules_profile"), **kwargs)
+        if default_tire:
+            res = {axis: {c: {s: v[:, :, 0] for s, v in signs.items()}
+                          for c, signs in crits.items()}
+                   for axis, crits in res.items()}
+        results[mode] = res
+    return results
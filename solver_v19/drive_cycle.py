@@ -0,0 +1,285 @@
+"""
+drive_cycle.py — Cycle de conduite (série temporelle) évalué en flux
+--------------------------------------------------------------------
+
+compute_dynamic_stability() travaille à vitesse, rayon de virage et
+accélération constants. Un chantier de fauchage de bord de route est au
+contraire une longue suite de pentes, de vitesses et de courbures.
+
+run_drive_cycle() accepte une série temporelle d'échantillons :
+
+    t (ou time), slope_lat, slope_long, speed, turn_radius, accel_long
+
+(colonne absente = 0 ; sans colonne de temps, t = i / rate_hz), fournie
+par un fichier CSV ou par un itérable (générateur) de dictionnaires.
+
+La série est lue et évaluée PAR PAQUETS de chunk_size échantillons avec
+la chaîne vectorisée (batch.evaluate_mode : colonnes + profil de règles) :
+la mémoire ne dépend pas de la durée du cycle. Le CG local ne dépend pas
+de l'environnement : il est calculé une seule fois.
+
+Sortie, pour chaque mode :
+
+    min       : minimum de chaque indice et instant où il est atteint
+    envelope  : enveloppe des minima par fenêtre de `window` secondes
+    bands     : temps passé (s) OK / WARNING / DANGER / non applicable,
+                par critère
+    worst     : les n_worst instants les plus critiques (I_dynamic
+                minimal), tenus dans un tas borné
+
+Chaque échantillon compte pour la durée qui le sépare du précédent
+(1 / rate_hz sans colonne de temps ; 0 pour le premier échantillon
+d'une série horodatée).
+"""
+
+import csv
+import heapq
+import io
+from itertools import islice
+from pathlib import Path
+
+import numpy as np
+
+from .batch import evaluate_mode, ENV_KEYS
+from .cg import compute_local_CG
+from .compiled import compile_config, MODES
+from .rules import STATUS_NA, STATUS_OK, STATUS_WARNING, STATUS_DANGER
+from .solver import resolve_loader
+
+
+TIME_KEYS = ("t", "time")
+
+INDEX_COLUMNS = ("I_static", "I_lat", "I_long", "I_dynamic", "I_lat_dyn", "I_long_dyn")
+
+ENVELOPE_COLUMNS = ("I_static", "I_dynamic")
+
+BAND_KEYS = {STATUS_OK: "ok_s", STATUS_WARNING: "warning_s",
+             STATUS_DANGER: "danger_s", STATUS_NA: "na_s"}
+
+
+# -----------------------------------------------------------
+# Sources : CSV ou itérable d'échantillons → paquets de tableaux
+# -----------------------------------------------------------
+
+def read_cycle_csv(source, chunk_size=65536, delimiter=None):
+    """
+    Lit un CSV de cycle par paquets : génère des dicts {colonne: tableau}.
+
+    source    : chemin ou fichier texte ouvert
+    delimiter : None → ';' si l'en-tête en contient (virgule décimale
+                acceptée dans ce cas), sinon ','
+    """
+    handle = open(source, newline="", encoding="utf-8") if isinstance(source, (str, Path)) else source
+    try:
+        header = handle.readline()
+        if not header:
+            return
+        if delimiter is None:
+            delimiter = ";" if ";" in header else ","
+        names = [name.strip().lower() for name in next(csv.reader([header], delimiter=delimiter))]
+        wanted = [(i, name) for i, name in enumerate(names) if name in ENV_KEYS + TIME_KEYS]
+        decimal_comma = delimiter != ","
+
+        reader = csv.reader(handle, delimiter=delimiter)
+        while True:
+            rows = list(islice(reader, chunk_size))
+            rows = [row for row in rows if row]
+            if not rows:
+                return
+            try:
+                if decimal_comma:
+                    rows = [[v.replace(",", ".") for v in row] for row in rows]
+                values = np.array([[row[i] for i, _ in wanted] for row in rows], dtype=float)
+            except (ValueError, IndexError) as e:
+                raise ValueError(f"CSV de cycle illisible : {e}")
+            yield {name: values[:, k] for k, (_, name) in enumerate(wanted)}
+    finally:
+        if handle is not source:
+            handle.close()
+
+
+def iter_sample_chunks(samples, chunk_size=65536):
+    """Regroupe un itérable de dicts (un échantillon chacun) en paquets de tableaux."""
+    it = iter(samples)
+    while True:
+        rows = list(islice(it, chunk_size))
+        if not rows:
+            return
+        keys = [k for k in ENV_KEYS + TIME_KEYS if any(k in row for row in rows)]
+        yield {k: np.array([float(row.get(k, 0.0)) for row in rows]) for k in keys}
+
+
+def _chunks(source, chunk_size):
+    """Paquets de tableaux depuis un CSV (chemin / fichier) ou un itérable."""
+    if isinstance(source, (str, Path, io.IOBase)):
+        return read_cycle_csv(source, chunk_size)
+    return iter_sample_chunks(source, chunk_size)
+
+
+# -----------------------------------------------------------
+# Accumulateurs (mémoire constante)
+# -----------------------------------------------------------
+
+class _ModeStats:
+    """Agrégats d'un mode mis à jour paquet par paquet."""
+
+    def __init__(self, rules, window, n_worst):
+        self.rules = rules
+        self.window = window
+        self.n_worst = n_worst
+        self.minimum = {col: (np.inf, None) for col in INDEX_COLUMNS}
+        self.bands = np.zeros((len(rules), len(BAND_KEYS)))
+        self.envelope_t = []
+        self.envelope = {col: [] for col in ENVELOPE_COLUMNS}
+        self.heap = []              # (-I_dynamic, t, n°, échantillon) : tas borné
+        self.seen = 0
+
+    def update(self, t, dt, env, cols, statuses, t0):
+        """t, dt, env, cols : tableaux d'un paquet (forme de t)."""
+        for col in INDEX_COLUMNS:
+            i = int(np.argmin(cols[col]))
+            if cols[col][i] < self.minimum[col][0]:
+                self.minimum[col] = (float(cols[col][i]), float(t[i]))
+
+        # Temps passé dans chaque bande, par critère
+        for b, code in enumerate(BAND_KEYS):
+            self.bands[:, b] += ((statuses == code) * dt).sum(axis=1)
+
+        self._update_envelope(t, cols, t0)
+        self._update_worst(t, env, cols)
+
+    def _update_envelope(self, t, cols, t0):
+        w = np.floor((t - t0) / self.window).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, w[1:] != w[:-1]])
+        window_t = (t0 + w[starts] * self.window).tolist()
+        merge = bool(self.envelope_t) and self.envelope_t[-1] == window_t[0]
+
+        for col in ENVELOPE_COLUMNS:
+            mins = np.minimum.reduceat(cols[col], starts).tolist()
+            series = self.envelope[col]
+            if merge:
+                series[-1] = min(series[-1], mins.pop(0))
+            series.extend(mins)
+        self.envelope_t.extend(window_t[1:] if merge else window_t)
+
+    def _update_worst(self, t, env, cols):
+        values = cols["I_dynamic"]
+        k = min(self.n_worst, values.size)
+        if k == 0:
+            return
+        for i in np.argpartition(values, k - 1)[:k]:
+            self.seen += 1
+            key = (-float(values[i]), float(t[i]), self.seen)
+            if len(self.heap) < self.n_worst:
+                heapq.heappush(self.heap, key + (self._sample(i, env, cols),))
+            elif key > self.heap[0][:3]:
+                heapq.heapreplace(self.heap, key + (self._sample(i, env, cols),))
+
+    @staticmethod
+    def _sample(i, env, cols):
+        sample = {k: float(env[k][i]) for k in ENV_KEYS}
+        sample.update({col: float(cols[col][i]) for col in INDEX_COLUMNS})
+        return sample
+
+    def result(self):
+        return {
+            "min": {col: {"value": v if t is not None else None, "t": t}
+                    for col, (v, t) in self.minimum.items()},
+            "envelope": {"t": self.envelope_t, **self.envelope},
+            "bands": [
+                {"id": rule.id, "name": rule.name,
+                 **{key: float(self.bands[r, b]) for b, key in enumerate(BAND_KEYS.values())}}
+                for r, rule in enumerate(self.rules)
+            ],
+            "worst": [
+                {"t": t, **sample}
+                for _, t, _, sample in sorted(self.heap, key=lambda item: (-item[0], item[1]))
+            ],
+        }
+
+
+# -----------------------------------------------------------
+# CYCLE DE CONDUITE
+# -----------------------------------------------------------
+
+def run_drive_cycle(tractor, machine, loader, tires, options, source,
+                    rate_hz=None, chunk_size=65536, window=1.0, n_worst=10):
+    """
+    Entrées :
+        tractor, machine, loader, tires, options : comme solve()
+        source     : chemin / fichier CSV, ou itérable de dicts
+                     (cf. en-tête du module)
+        rate_hz    : fréquence d'échantillonnage si la série n'est pas
+                     horodatée (obligatoire dans ce cas)
+        chunk_size : taille des paquets (mémoire bornée)
+        window     : largeur des fenêtres de l'enveloppe (s)
+        n_worst    : nombre d'instants critiques retournés
+
+    Sortie :
+        {
+            "n_samples", "duration_s",
+            "transport" / "work": {"min", "envelope", "bands", "worst"}
+        }
+
+    Lève ValueError si la configuration ou la série est invalide.
+    """
+    if rate_hz is not None and not rate_hz > 0:
+        raise ValueError(f"rate_hz doit être > 0 (reçu {rate_hz!r})")
+    if not window > 0:
+        raise ValueError(f"window doit être > 0 (reçu {window!r})")
+    if not int(chunk_size) > 0:
+        raise ValueError(f"chunk_size doit être > 0 (reçu {chunk_size!r})")
+
+    loader = resolve_loader(tractor, options)
+    cfg = compile_config(tractor, machine, loader, tires, options)
+    local = compute_local_CG(cfg)
+    stats = {mode: _ModeStats(cfg.profile.rules, float(window), int(n_worst)) for mode in MODES}
+
+    n_samples = 0
+    duration = 0.0
+    t0 = t_prev = None
+
+    for chunk in _chunks(source, int(chunk_size)):
+        n = len(next(iter(chunk.values()))) if chunk else 0
+        if n == 0:
+            continue
+
+        # ----- Temps et durée de chaque échantillon -----
+        time_key = next((k for k in TIME_KEYS if k in chunk), None)
+        if time_key is not None:
+            t = chunk[time_key]
+            previous = t[0] if t_prev is None else t_prev
+            dt = np.diff(t, prepend=previous)
+            if (dt < 0).any() or not np.isfinite(t).all():
+                raise ValueError("Cycle : temps non croissant ou non fini")
+        else:
+            if rate_hz is None:
+                raise ValueError("Cycle sans colonne de temps : rate_hz obligatoire")
+            t = (n_samples + np.arange(n)) / float(rate_hz)
+            dt = np.full(n, 1.0 / float(rate_hz))
+
+        if t0 is None:
+            t0 = float(t[0])
+        t_prev = float(t[-1])
+
+        env = {k: np.broadcast_to(np.asarray(chunk.get(k, 0.0), dtype=float), (n,))
+               for k in ENV_KEYS}
+
+        for mode in MODES:
+            block = local[mode]
+            X, Y, Z = block["CG_local"]
+            cols, statuses = evaluate_mode(cfg, block["mass_total"], X, Y, Z, env)
+            stats[mode].update(
+                t, dt, env,
+                {col: np.broadcast_to(cols[col], (n,)) for col in INDEX_COLUMNS},
+                statuses,
+                t0,
+            )
+
+        n_samples += n
+        duration += float(dt.sum())
+
+    result = {"n_samples": n_samples, "duration_s": duration}
+    for mode in MODES:
+        result[mode] = stats[mode].result()
+    return result
@@ -18,7 +18,8 @@ Indices dynamiques :
 
     I_dynamic  = min(I_lat_dyn, I_long_dyn)
 
-Tout est calculé pour les modes "transport" et "work".
+Tout est calculé pour chaque cas de charge ("transport", "work" et les
+poses nommées, cf. compiled.load_cases).
 """
 
 import numpy as np
@@ -37,8 +38,10 @@ def dynamic_forces(MT, speed, turn_radius, accel_long):
     accel_long  = accélération (+) ou freinage (-) (m/s²)
     """
     # Force latérale (si rayon non nul)
+    # speed * speed (arrondi IEEE exact) plutôt que speed ** 2 : pow() de
+    # la libm peut différer d'un ulp du carré calculé par NumPy
     if turn_radius > 0:
-        F_lat = MT * (speed ** 2) / turn_radius
+        F_lat = MT * (speed * speed) / turn_radius
     else:
         F_lat = 0.0
 
@@ -117,7 +120,7 @@ def dynamic_risk_direction(CG_ground, M_dyn_lat, M_dyn_long):
 # Fonction principale : dynamique transport / work
 # -----------------------------------------------------------
 
-def compute_dynamic_stability(tractor,
+def compute_dynamic_stability(cfg,
                               CG_data,
                               static_data,
                               speed,
@@ -125,19 +128,21 @@ def compute_dynamic_stability(tractor,
                               accel_long):
     """
     Entrée :
-        CG_data["transport"], CG_data["work"]
-        static_data["transport"], static_data["work"]
+        cfg (CompiledConfig)
+        CG_data["transport"], CG_data["work"], ...
+        static_data["transport"], static_data["work"], ...
 
     Sortie :
         {
             "transport": {...},
-            "work": {...}
+            "work": {...},
+            ...
         }
     """
 
     results = {}
 
-    for mode in ["transport", "work"]:
+    for mode in CG_data:
 
         # ------------------------------
         # Extraction CG
@@ -200,3 +205,62 @@ def compute_dynamic_stability(tractor,
         }
 
     return results
+
+
+# -----------------------------------------------------------
+# Version vectorisée (batch)
+# -----------------------------------------------------------
+
+def compute_dynamic_stability_batch(MT, ZG, static_cols,
+                                    speed, turn_radius, accel_long):
+    """
+    Version vectorisée de compute_dynamic_stability() pour UN mode.
+
+    static_cols : colonnes issues de compute_static_stability_batch()
+                  (M_roll, M_rest_roll, M_pitch, M_rest_pitch)
+
+    Sortie : dictionnaire de tableaux.
+    """
+    speed = np.asarray(speed, dtype=float)
+    turn_radius = np.asarray(turn_radius, dtype=float)
+
+    # Forces (F_lat = 0 si rayon nul, comme dynamic_forces)
+    turning = turn_radius > 0
+    F_lat = np.where(
+        turning,
+        MT * (speed * speed) / np.where(turning, turn_radius, 1.0),
+        0.0,
+    )
+    F_long = MT * accel_long
+
+    M_dyn_lat  = F_lat  * ZG
+    M_dyn_long = F_long * ZG
+
+    M_roll       = static_cols["M_roll"]
+    M_rest_roll  = static_cols["M_rest_roll"]
+    M_pitch      = static_cols["M_pitch"]
+    M_rest_pitch = static_cols["M_rest_pitch"]
+
+    # Éviter division par 0 (indice nul, comme dynamic_indices)
+    rest_roll_ok  = M_rest_roll != 0
+    rest_pitch_ok = M_rest_pitch != 0
+    I_lat = np.where(
+        rest_roll_ok,
+        1.0 - (M_roll + M_dyn_lat) / np.where(rest_roll_ok, M_rest_roll, 1.0),
+        0.0,
+    )
+    I_long = np.where(
+        rest_pitch_ok,
+        1.0 - (M_pitch + M_dyn_long) / np.where(rest_pitch_ok, M_rest_pitch, 1.0),
+        0.0,
+    )
+
+    return {
+        "F_lat":      F_lat,
+        "F_long":     F_long,
+        "M_dyn_lat":  M_dyn_lat,
+        "M_dyn_long": M_dyn_long,
+        "I_lat_dyn":  I_lat,
+        "I_long_dyn": I_long,
+        "I_dynamic":  np.minimum(I_lat, I_long),
+    }
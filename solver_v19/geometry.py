@@ -74,3 +74,57 @@ def get_geometry(tractor: dict):
     track_rear = float(g["track_rear"])
 
     return track_rear, wheelbase
+
+
+# -----------------------------------------------------------
+# Version vectorisée (batch)
+# -----------------------------------------------------------
+
+def rotate_by_slopes_batch(slope_lat_deg, slope_long_deg, X, Y, Z):
+    """
+    Version vectorisée de rotation_matrix() appliquée à des CG donnés
+    composante par composante (tableaux broadcastables de pentes en
+    degrés et de coordonnées) : forme fermée de R_long @ R_lat, sans
+    construire une matrice 3×3 par scénario.
+
+        [ cos_lo,  sin_lo*sin_la,  sin_lo*cos_la ]
+        [ 0,       cos_la,        -sin_la        ]
+        [-sin_lo,  cos_lo*sin_la,  cos_lo*cos_la ]
+
+    Retourne (X_rot, Y_rot, Z_rot).
+    """
+    # Mêmes opérations que scalar.rotation_entries / rotate_CG_scalar
+    # (degrés · π / 180, coefficients puis somme ligne par ligne) :
+    # identique au bit près au chemin de solve()
+    th_lat  = np.asarray(slope_lat_deg, dtype=float) * math.pi / 180.0
+    th_long = np.asarray(slope_long_deg, dtype=float) * math.pi / 180.0
+
+    c_la, s_la = np.cos(th_lat), np.sin(th_lat)
+    c_lo, s_lo = np.cos(th_long), np.sin(th_long)
+
+    X_rot = c_lo * X + (s_lo * s_la) * Y + (s_lo * c_la) * Z
+    Y_rot = c_la * Y + (-s_la) * Z
+    Z_rot = (-s_lo) * X + (c_lo * s_la) * Y + (c_lo * c_la) * Z
+    return X_rot, Y_rot, Z_rot
+
+
+def slopes_from_heading(terrain_slope_deg, heading_deg):
+    """
+    Pentes (slope_lat, slope_long) vues par le tracteur sur un versant
+    de pente terrain_slope_deg, pour un cap mesuré depuis la ligne de
+    plus grande pente (0° = face à l'amont, 90° = amont à droite,
+    sens trigonométrique vu de dessus).
+
+    Convention de rotation_matrix (R appliqué au repère tracteur) :
+
+        slope_lat  = -asin(sin θ · sin φ)
+        slope_long = -atan(tan θ · cos φ)
+
+    Entrées / sorties : tableaux broadcastables, en degrés.
+    """
+    theta = np.radians(np.asarray(terrain_slope_deg, dtype=float))
+    phi = np.radians(np.asarray(heading_deg, dtype=float))
+
+    slope_lat = -np.degrees(np.arcsin(np.sin(theta) * np.sin(phi)))
+    slope_long = -np.degrees(np.arctan(np.tan(theta) * np.cos(phi)))
+    return slope_lat, slope_long
@@ -0,0 +1,287 @@
+"""
+hazard.py — Carte de danger d'une parcelle (raster, tuiles en parallèle)
+-----------------------------------------------------------------------
+
+Pour chaque cellule d'un MNT et une configuration tracteur + machine
+(mode "work") : pire I_static sur TOUS les caps de circulation, et
+classe de danger (OK / WARNING / DANGER) selon les critères de
+stabilité du profil de règles.
+
+Pente sous le tracteur : plan moyen à l'échelle de l'empreinte
+(différences centrées sur ±k cellules, k ≈ (empattement + voie) / 4).
+Pour un cap h (u = avant, l = gauche, cf. route.py) :
+
+    s_u = ∇z · u          s_l = ∇z · l
+    slope_long = -atan(s_u)
+    slope_lat  =  asin(s_l / sqrt(1 + |∇z|²))
+
+Noyau vectorisé par tuile et par cap (pas de solve() par cellule) :
+
+    geometry.rotate_by_slopes_batch → static_pfs.static_indices_batch
+    → règles du profil portant sur I_lat / I_long / I_static seuls
+      (cf. stability_rules)
+
+Le MNT est découpé en tuiles (+ marge de k cellules) lues depuis la
+source mémoire-mappée (.npy) ou par fenêtre (GeoTIFF / VRT, rasterio),
+traitées dans un pool de processus ; chaque processus écrit sa tuile
+dans les rasters de sortie (.npy ouverts en memmap) :
+
+    <output>.npy            int8    classe (STATUS_* ; -1 = hors MNT)
+    <output>_I_static.npy   float32 pire I_static
+    <output>_heading.npy    float32 cap le plus défavorable (°, depuis +X)
+
+plus un .json de géoréférencement à côté de chacun (cf. route.open_dem).
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from .cg import compute_local_CG
+from .compiled import compile_config
+from .geometry import rotate_by_slopes_batch
+from .route import open_dem
+from .rules import (
+    load_profile, RuleProfile, METRICS,
+    STATUS_NA, STATUS_OK, STATUS_WARNING, STATUS_DANGER,
+)
+from .solver import resolve_loader
+from .static_pfs import static_indices_batch
+
+
+MODE = "work"
+
+CLASS_KEYS = {STATUS_OK: "ok", STATUS_WARNING: "warning",
+              STATUS_DANGER: "danger", STATUS_NA: "na"}
+
+RASTERIO_SUFFIXES = (".tif", ".tiff", ".vrt")
+
+
+# -----------------------------------------------------------
+# Source raster (memmap .npy ou fenêtres rasterio)
+# -----------------------------------------------------------
+
+def raster_info(path):
+    """(forme, {"x0", "y0", "dx", "dy"}, nodata) sans lire le raster."""
+    path = Path(path)
+    if path.suffix.lower() in RASTERIO_SUFFIXES:
+        dem = _rasterio().open(path)
+        with dem:
+            t = dem.transform
+            if t.b or t.d:
+                raise ValueError(f"MNT {path.name} : raster tourné non pris en charge")
+            return ((dem.height, dem.width),
+                    {"x0": t.c, "y0": t.f, "dx": t.a, "dy": t.e}, dem.nodata)
+
+    dem = open_dem(path)
+    return (dem.z.shape,
+            {"x0": dem.x0, "y0": dem.y0, "dx": dem.dx, "dy": dem.dy}, dem.nodata)
+
+
+def read_window(path, r0, r1, c0, c1, nodata=None):
+    """
+    Lit z[r0:r1, c0:c1] en float ; les parties hors raster et les
+    cellules nodata valent NaN.
+    """
+    path = Path(path)
+    out = np.full((r1 - r0, c1 - c0), np.nan)
+
+    if path.suffix.lower() in RASTERIO_SUFFIXES:
+        rasterio = _rasterio()
+        with rasterio.open(path) as dem:
+            rows, cols = dem.height, dem.width
+            a0, a1, b0, b1 = max(r0, 0), min(r1, rows), max(c0, 0), min(c1, cols)
+            if a0 < a1 and b0 < b1:
+                window = rasterio.windows.Window(b0, a0, b1 - b0, a1 - a0)
+                out[a0 - r0:a1 - r0, b0 - c0:b1 - c0] = dem.read(1, window=window)
+    else:
+        z = np.load(path, mmap_mode="r")
+        rows, cols = z.shape
+        a0, a1, b0, b1 = max(r0, 0), min(r1, rows), max(c0, 0), min(c1, cols)
+        if a0 < a1 and b0 < b1:
+            out[a0 - r0:a1 - r0, b0 - c0:b1 - c0] = z[a0:a1, b0:b1]
+
+    if nodata is not None:
+        out[out == nodata] = np.nan
+    return out
+
+
+def _rasterio():
+    try:
+        import rasterio
+        import rasterio.windows
+    except ImportError:
+        raise ImportError("Lecture des GeoTIFF / VRT : installer rasterio (ou convertir le MNT en .npy)")
+    return rasterio
+
+
+# -----------------------------------------------------------
+# Noyau vectorisé (une tuile)
+# -----------------------------------------------------------
+
+def stability_rules(profile):
+    """
+    Règles du profil évaluables avec les seuls indices de stabilité
+    (les autres grandeurs — charges, masses — valent NaN : non applicables).
+    """
+    probe = {name: np.nan for name in METRICS}
+    probe.update(I_lat=1.0, I_long=1.0, I_static=1.0)
+    return [rule for rule in profile.rules if rule.evaluate(probe)[2] != STATUS_NA]
+
+
+def hazard_kernel(gx, gy, X, Y, Z, wheelbase, track_rear, rules, headings_deg):
+    """
+    Pire cas sur les caps pour des gradients de terrain (tableaux).
+
+    rules : règles de stabilité (cf. stability_rules)
+
+    Retourne (classe int8, I_static minimal, cap le plus défavorable).
+    """
+    norm = np.sqrt(1.0 + gx ** 2 + gy ** 2)
+    metrics = {name: np.nan for name in METRICS}
+
+    worst_class = np.full(gx.shape, STATUS_OK, dtype=np.int8)
+    worst_I = np.full(gx.shape, np.inf)
+    worst_heading = np.full(gx.shape, np.nan)
+
+    for h in headings_deg:
+        c, s = np.cos(np.radians(h)), np.sin(np.radians(h))
+        slope_long = -np.degrees(np.arctan(gx * c + gy * s))
+        slope_lat = np.degrees(np.arcsin((gy * c - gx * s) / norm))
+
+        X_rot, Y_rot, Z_rot = rotate_by_slopes_batch(slope_lat, slope_long, X, Y, Z)
+        I_lat, I_long, I_static = static_indices_batch(X_rot, Y_rot, Z_rot, track_rear, wheelbase)
+
+        metrics.update(I_lat=I_lat, I_long=I_long, I_static=I_static)
+        for rule in rules:
+            np.maximum(worst_class, rule.evaluate(metrics)[2], out=worst_class)
+
+        lower = I_static < worst_I
+        worst_I = np.where(lower, I_static, worst_I)
+        worst_heading = np.where(lower, h, worst_heading)
+
+    invalid = ~np.isfinite(gx) | ~np.isfinite(gy)
+    worst_class[invalid] = STATUS_NA
+    worst_I[invalid] = np.nan
+    worst_heading[invalid] = np.nan
+    return worst_class, worst_I, worst_heading
+
+
+def _hazard_tile(job):
+    """Traite une tuile (exécuté dans un processus du pool)."""
+    r0, r1, c0, c1 = job["window"]
+    k = job["halo"]
+
+    z = read_window(job["source"], r0 - k, r1 + k, c0 - k, c1 + k, job["nodata"])
+    gx = (z[k:-k, 2 * k:] - z[k:-k, :-2 * k]) / (2 * k * job["dx"])
+    gy = (z[2 * k:, k:-k] - z[:-2 * k, k:-k]) / (2 * k * job["dy"])
+
+    classes, I_static, heading = hazard_kernel(
+        gx, gy, *job["cg"], job["wheelbase"], job["track_rear"],
+        stability_rules(load_profile(job["profile"])), job["headings"],
+    )
+
+    for key, values in (("classes", classes), ("I_static", I_static), ("heading", heading)):
+        out = np.load(job["outputs"][key], mmap_mode="r+")
+        out[r0:r1, c0:c1] = values
+        out.flush()
+        del out
+
+    return {CLASS_KEYS[code]: int((classes == code).sum()) for code in CLASS_KEYS}
+
+
+# -----------------------------------------------------------
+# CARTE DE DANGER
+# -----------------------------------------------------------
+
+def hazard_map(tractor, machine, loader, tires, options, source, output,
+               n_headings=72, tile_size=512, workers=None):
+    """
+    Entrées :
+        tractor, machine, loader, tires, options : comme solve()
+        source     : MNT (.npy + .json, ou GeoTIFF / VRT avec rasterio)
+        output     : chemin du raster de classes (.npy) ; les autres
+                     rasters sont écrits à côté (cf. en-tête du module)
+        n_headings : nombre de caps balayés sur 360°
+        tile_size  : côté des tuiles (cellules)
+        workers    : processus du pool (None → nombre de CPU ; 0 → pas
+                     de pool, traitement dans le processus courant)
+
+    Sortie :
+        {
+            "shape", "tiles", "n_headings", "halo_cells",
+            "outputs": {"classes", "I_static", "heading"},
+            "cells":   {"ok", "warning", "danger", "na"}
+        }
+
+    Lève ValueError si la configuration ou le MNT est invalide.
+    """
+    if int(n_headings) < 1:
+        raise ValueError(f"n_headings doit être ≥ 1 (reçu {n_headings!r})")
+    if int(tile_size) < 1:
+        raise ValueError(f"tile_size doit être ≥ 1 (reçu {tile_size!r})")
+
+    loader = resolve_loader(tractor, options)
+    cfg = compile_config(tractor, machine, loader, tires, options)
+    block = compute_local_CG(cfg)[MODE]
+    X, Y, Z = block["CG_local"]
+
+    shape, transform, nodata = raster_info(source)
+    cell = min(abs(transform["dx"]), abs(transform["dy"]))
+    halo = max(1, int(round((cfg.wheelbase + cfg.track_rear) / 4.0 / cell)))
+
+    # Un profil compilé à la volée ne se transmet pas aux processus
+    profile = options.get("rules_profile")
+    if isinstance(profile, RuleProfile):
+        workers = 0
+
+    output = Path(output).with_suffix(".npy")
+    outputs = {
+        "classes": output,
+        "I_static": output.with_name(f"{output.stem}_I_static.npy"),
+        "heading": output.with_name(f"{output.stem}_heading.npy"),
+    }
+    for key, dtype, fill in (("classes", np.int8, STATUS_NA),
+                             ("I_static", np.float32, np.nan),
+                             ("heading", np.float32, np.nan)):
+        out = np.lib.format.open_memmap(outputs[key], mode="w+", dtype=dtype, shape=shape)
+        out[:] = fill
+        out.flush()
+        del out
+        outputs[key].with_suffix(".json").write_text(json.dumps(transform), encoding="utf-8")
+
+    tile_size = int(tile_size)
+    base = {
+        "source": str(source), "nodata": nodata, "halo": halo,
+        "dx": transform["dx"], "dy": transform["dy"],
+        "cg": (float(X), float(Y), float(Z)),
+        "wheelbase": cfg.wheelbase, "track_rear": cfg.track_rear,
+        "profile": profile,
+        "headings": np.arange(int(n_headings)) * 360.0 / int(n_headings),
+        "outputs": {k: str(p) for k, p in outputs.items()},
+    }
+    jobs = [
+        {**base, "window": (r, min(r + tile_size, shape[0]), c, min(c + tile_size, shape[1]))}
+        for r in range(0, shape[0], tile_size)
+        for c in range(0, shape[1], tile_size)
+    ]
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            counts = list(pool.map(_hazard_tile, jobs))
+    else:
+        counts = [_hazard_tile(job) for job in jobs]
+
+    return {
+        "shape": list(shape),
+        "tiles": len(jobs),
+        "n_headings": int(n_headings),
+        "halo_cells": halo,
+        "outputs": {k: str(p) for k, p in outputs.items()},
+        "cells": {key: sum(c[key] for c in counts) for key in CLASS_KEYS.values()},
+    }
@@ -0,0 +1,127 @@
+"""
+lift.py — Courbe de levage du chargeur frontal
+----------------------------------------------
+
+loader_mode ne connaît que deux positions (low / high). Ici, le CG du
+chargeur est une fonction continue de la fraction de levage f ∈ [0, 1]
+(cf. loader.lift_coefficients : 0 = position basse, 1 = position haute),
+avec une charge optionnelle dans le godet (options["loader_payload"]).
+
+lift_curve() évalue toute la plage de levage en UNE passe vectorisée par
+mode (batch.evaluate_mode) : seul l'élément chargeur varie, les
+autres éléments (tracteur, machine, masses additionnelles) sont regroupés
+une fois pour toutes.
+
+Sortie, par fraction de levage : hauteur du CG de l'outil, indices,
+charges aux roues et statut ; plus le levage maximal compatible (aucun
+critère DANGER de f = 0 jusqu'à cette fraction).
+"""
+
+import numpy as np
+
+from .batch import evaluate_mode, ENV_KEYS
+from .cg import accumulate_CG_batch, loader_CG_batch
+from .compiled import compile_config, LOADER_ELEMENT, MODES
+from .loader import lift_coefficients
+from .rules import STATUS_DANGER, STATUS_LABELS
+from .solver import resolve_loader
+
+
+COLUMNS = ("I_static", "I_dynamic", "I_lat", "I_long", "FL", "FR", "RL", "RR")
+
+
+def _max_lift(compatible, lifts, heights):
+    """
+    Plus grande fraction f telle que la configuration soit compatible
+    de 0 à f, et hauteur correspondante ((None, None) si f = 0 échoue).
+    """
+    count = int(np.logical_and.accumulate(compatible).sum())
+    if count == 0:
+        return None, None
+    return float(lifts[count - 1]), float(heights[count - 1])
+
+
+# -----------------------------------------------------------
+# COURBE DE LEVAGE
+# -----------------------------------------------------------
+
+def lift_curve(tractor, machine, loader, tires, options, env=None,
+               lifts=None, n_lift=51):
+    """
+    Entrées :
+        tractor, machine, loader, tires, options, env : comme solve()
+                  (chargeur activé ; options["loader_payload"] = charge
+                  du godet en kg, loader_lift / loader_mode ignorés)
+        lifts   : fractions de levage (0 = bas, 1 = haut), croissantes ;
+                  défaut : n_lift valeurs de 0 à 1
+
+    Sortie :
+        {
+            "lift", "height" (CG de l'outil, m), "payload",
+            "transport" / "work": {I_static, I_dynamic, I_lat, I_long,
+                                   FL, FR, RL, RR, "status", "compatible",
+                                   "max_lift", "max_height"},
+            "max_lift", "max_height"   (les deux modes compatibles)
+        }
+
+    Lève ValueError si la configuration ou la plage de levage est invalide.
+    """
+    loader = resolve_loader(tractor, options)
+    if loader is None:
+        raise ValueError("Courbe de levage : chargeur frontal désactivé (loader_enabled)")
+
+    options = {**options, "loader_lift": None}
+    cfg = compile_config(tractor, machine, loader, tires, options)
+
+    if lifts is None:
+        lifts = np.linspace(0.0, 1.0, int(n_lift))
+    lifts = np.asarray(lifts, dtype=float)
+    if lifts.ndim != 1 or not lifts.size:
+        raise ValueError("Plage de levage vide")
+    if (lifts < 0).any() or (lifts > 1).any() or (np.diff(lifts) <= 0).any():
+        raise ValueError("Fractions de levage attendues dans [0, 1] et strictement croissantes")
+
+    # ----- Chargeur sur toute la plage de levage -----
+    rules_x, rules_z = loader["rules"]["x"], loader["rules"]["z"]
+    mass_loader = float(loader.get("mass_loader", 0.0))
+    kx, kz = lift_coefficients(rules_x, rules_z, {"loader_lift": lifts})
+    payload = float(options.get("loader_payload") or 0.0)
+
+    loader_el = loader_CG_batch(
+        mass_loader, float(loader.get("mass_arms", 0.0)),
+        rules_x["arms"], rules_z["arms"], kx, kz,
+        cfg.wheelbase, cfg.rear_radius, payload=payload,
+    )
+    heights = cfg.rear_radius + kz * mass_loader
+
+    env = {k: float((env or {}).get(k, 0.0)) for k in ENV_KEYS}
+    result = {
+        "lift": lifts.tolist(),
+        "height": heights.tolist(),
+        "payload": payload,
+    }
+    compatible_all = np.ones(lifts.shape, dtype=bool)
+
+    for mode in MODES:
+        # Éléments fixes (tout sauf le chargeur), regroupés
+        fixed = [el for i, el in enumerate(cfg.elements[mode]) if i != LOADER_ELEMENT]
+        M0 = sum(m for m, _ in fixed)
+        CG0 = sum(m * np.asarray(cg, dtype=float) for m, cg in fixed) / M0
+
+        MT, X, Y, Z = accumulate_CG_batch([(M0, *CG0), loader_el])
+        cols, codes = evaluate_mode(cfg, MT, X, Y, Z, env)
+        worst = np.broadcast_to(codes.max(axis=0), lifts.shape)
+        compatible = worst != STATUS_DANGER
+        compatible_all &= compatible
+
+        max_lift, max_height = _max_lift(compatible, lifts, heights)
+        result[mode] = {col: np.broadcast_to(cols[col], lifts.shape).tolist() for col in COLUMNS}
+        result[mode].update(
+            status=[STATUS_LABELS.get(int(code), "—") for code in worst],
+            compatible=compatible.tolist(),
+            max_lift=max_lift,
+            max_height=max_height,
+        )
+
+    result["max_lift"], result["max_height"] = _max_lift(compatible_all, lifts, heights)
+    return result
@@ -16,16 +16,40 @@ Méthode conforme à la documentation interne :
     Z_low  = RAR + kZ_low  * mass_loader
     Z_high = RAR + kZ_high * mass_loader
 
+Levage continu (options["loader_lift"] = f dans [0, 1], prioritaire sur
+loader_mode) : coefficients interpolés entre les deux positions
+
+    k_x(f) = k_low + f * (k_high - k_low)      (idem pour kZ)
+
+Charge dans le godet (options["loader_payload"], kg) : placée au CG du
+chargeur, elle s'ajoute à sa masse.
+
 Toutes les valeurs proviennent du PDF "méthode de réalisation du simulateur".
 """
 
 import numpy as np
 from .geometry import get_geometry
 
+
+def lift_coefficients(rules_x: dict, rules_z: dict, options: dict):
+    """
+    Coefficients (k_x, k_z) de la position du chargeur :
+    loader_lift (fraction de levage) si fourni, sinon loader_mode low / high.
+    """
+    lift = options.get("loader_lift")
+    if lift is not None:
+        return (rules_x["low"] + lift * (rules_x["high"] - rules_x["low"]),
+                rules_z["k_low"] + lift * (rules_z["k_high"] - rules_z["k_low"]))
+
+    if options.get("loader_mode", "low") == "high":
+        return rules_x["high"], rules_z["k_high"]
+    return rules_x["low"], rules_z["k_low"]
+
+
 def loader_CG(loader_json: dict, tractor: dict, tires: dict, options: dict):
     """
     Calcule le CG total du chargeur :
-    = bras + chargeur (LOW ou HIGH)
+    = bras + chargeur (LOW, HIGH ou levage continu) + charge du godet
 
     loader_json doit contenir :
       - mass_loader
@@ -67,25 +91,22 @@ def loader_CG(loader_json: dict, tractor: dict, tires: dict, options: dict):
     CG_arms = np.array([X_arms, 0.0, Z_arms])
 
     # ---------------------------------------------------------
-    # 5) CG du chargeur (LOW/HIGH)
+    # 5) CG du chargeur (LOW/HIGH ou levage continu)
     # ---------------------------------------------------------
-    mode = options.get("loader_mode", "low")  # default = low
+    kx, kz = lift_coefficients(rules_x, rules_z, options)
 
-    if mode == "high":
-        X_loader = rules_x["high"] * wheelbase
-        Z_loader = RAR + rules_z["k_high"] * mass_loader
-    else:
-        X_loader = rules_x["low"] * wheelbase
-        Z_loader = RAR + rules_z["k_low"] * mass_loader
+    X_loader = kx * wheelbase
+    Z_loader = RAR + kz * mass_loader
 
     CG_loader = np.array([X_loader, 0.0, Z_loader])
 
     # ---------------------------------------------------------
-    # 6) CG total (bras + chargeur)
+    # 6) CG total (bras + chargeur + charge du godet)
     # ---------------------------------------------------------
-    mass_total = mass_arms + mass_loader
+    payload = float(options.get("loader_payload") or 0.0)
+    mass_total = mass_arms + mass_loader + payload
 
-    CG_total = (mass_arms * CG_arms + mass_loader * CG_loader) / mass_total
+    CG_total = (mass_arms * CG_arms + (mass_loader + payload) * CG_loader) / mass_total
 
     return mass_total, CG_total
 
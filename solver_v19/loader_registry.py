@@ -0,0 +1,100 @@
+"""
+loader_registry.py — Registre des chargeurs frontaux
+----------------------------------------------------
+
+Charge UNE SEULE FOIS tous les fichiers loaders/*.json et les indexe
+par seuil de masse tracteur.
+
+Chaque JSON chargeur porte sa borne haute :
+
+    "tractor_mass_max": 5300     → tracteurs de masse < 5300 kg
+    "tractor_mass_max": null     → sans limite (plus gros chargeur)
+
+Un tracteur reçoit le premier chargeur (par seuil croissant) dont
+tractor_mass_max est strictement supérieur à sa masse. Les intervalles
+viennent donc des données, et non plus d'une cascade de if codée en dur.
+
+Le registre par défaut (default_registry()) est partagé par solve(),
+solve_batch(), le balayage catalogue, l'API et l'interface : après le
+premier appel, la sélection ne fait plus aucune lecture disque.
+"""
+
+import json
+import math
+import threading
+from bisect import bisect_right
+from pathlib import Path
+
+
+LOADERS_DIR = Path(__file__).resolve().parent.parent / "loaders"
+
+
+class LoaderRegistry:
+    """Chargeurs indexés par nom et par seuil de masse tracteur."""
+
+    def __init__(self, loaders: dict):
+        """
+        loaders : {nom: JSON chargeur}, chaque JSON ayant "tractor_mass_max"
+                  (nombre, ou None pour « sans limite »)
+        """
+        self.loaders = dict(loaders)
+
+        bounds = []
+        for name, loader in self.loaders.items():
+            if "tractor_mass_max" not in loader:
+                raise ValueError(f"Chargeur '{name}' : tractor_mass_max manquant")
+            limit = loader["tractor_mass_max"]
+            bounds.append((math.inf if limit is None else float(limit), name))
+        bounds.sort()
+
+        if len({b for b, _ in bounds}) != len(bounds):
+            raise ValueError("Chargeurs : seuils tractor_mass_max en double")
+
+        self.thresholds = [b for b, _ in bounds]
+        self.ordered_names = [name for _, name in bounds]
+
+    @classmethod
+    def from_directory(cls, directory=LOADERS_DIR):
+        """Lit tous les JSON d'un dossier (clé = nom de fichier sans extension)."""
+        loaders = {}
+        for path in sorted(Path(directory).glob("*.json")):
+            with open(path, encoding="utf-8") as f:
+                loaders[path.stem] = json.load(f)
+        return cls(loaders)
+
+    def names(self):
+        """Noms des chargeurs, par seuil croissant."""
+        return list(self.ordered_names)
+
+    def get(self, name):
+        """JSON du chargeur `name` (None si inconnu)."""
+        return self.loaders.get(name)
+
+    def select_name(self, tractor_mass):
+        """Nom du chargeur de série pour une masse tracteur (None si aucun)."""
+        i = bisect_right(self.thresholds, tractor_mass)
+        if i >= len(self.ordered_names):
+            return None
+        return self.ordered_names[i]
+
+    def select(self, tractor_mass):
+        """JSON du chargeur de série pour une masse tracteur (None si aucun)."""
+        return self.get(self.select_name(tractor_mass))
+
+
+# -----------------------------------------------------------
+# Registre par défaut (dossier loaders/ du dépôt)
+# -----------------------------------------------------------
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_registry():
+    """Registre des chargeurs du dépôt, chargé au premier appel."""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = LoaderRegistry.from_directory(LOADERS_DIR)
+    return _default
@@ -0,0 +1,403 @@
+"""
+montecarlo.py — Propagation d'incertitudes (Monte Carlo)
+--------------------------------------------------------
+
+Les valeurs du catalogue sont des approximations :
+
+    mass_front_pct           (50 % par défaut si absent)
+    Z tracteur = R_AR * 1.30 (facteur forfaitaire)
+    x_rel / y_rel / z_rel    (CG machine estimé)
+    masses et lests          (masses réelles ≠ masses nominales)
+
+monte_carlo() tire n_samples jeux de paramètres autour des valeurs
+nominales, les pousse dans la chaîne vectorisée
+
+    cg (éléments *_CG_batch) → rotation → static_pfs → dynamic_pfd → wheels
+
+puis applique le profil de règles (rules.py) à tous les tirages.
+
+Le résultat donne, pour chaque mode et chaque critère :
+
+    p_fail     : probabilité DANGER
+    p_warning  : probabilité WARNING
+    percentiles de la grandeur du critère
+
+ainsi que les percentiles des indices (I_static, I_dynamic, charges aux
+roues).
+
+Les tirages sont calculés par paquets (`chunk`) et seuls des cumuls sont
+conservés : la mémoire ne dépend pas de n_samples.
+
+    probabilités, moyennes   compteurs / sommes sur TOUS les tirages
+    percentiles              réservoir de PERCENTILE_SAMPLES tirages
+                             (exacts tant que n_samples ≤ PERCENTILE_SAMPLES,
+                             estimés sur un sous-échantillon uniforme au-delà)
+
+Chaque paramètre a son propre générateur NumPy dérivé de `seed`
+(SeedSequence.spawn), de même que les clés du réservoir : le résultat
+est reproductible et ne dépend pas de la taille des paquets (aux
+arrondis de sommation des moyennes près).
+
+NOTE : avec un pneu arrière valide, Z tracteur = R_AR * facteur ;
+l'incertitude sur la hauteur du CG tracteur (cg_height_nominal) est
+donc portée par le paramètre tractor_z_factor.
+"""
+
+import numpy as np
+
+from .batch import evaluate_mode_batch, ENV_KEYS
+from .cg import accumulate_CG_batch, local_elements_batch
+from .compatibility import metrics_from, STATUS_WARNING, STATUS_DANGER
+from .compiled import compile_config, MODES
+from .solver import resolve_loader
+
+
+# -----------------------------------------------------------
+# Lois par défaut
+# -----------------------------------------------------------
+#
+# Chaque paramètre : {"dist": "normal" | "uniform", "scale": s,
+#                     "relative": bool, "min": a, "max": b}
+#
+#   normal  : écart = s * N(0, 1)
+#   uniform : écart = s * U(-1, 1)   (s = demi-largeur)
+#   relative=True : valeur = nominal * (1 + écart), sinon nominal + écart
+#   min / max     : bornes physiques (écrêtage), facultatives
+#
+# machine_d*_rel sont des ÉCARTS (nominal 0) ajoutés aux poses
+# transport ET work de la machine (même erreur d'estimation).
+
+DEFAULT_UNCERTAINTY = {
+    "tractor_mass":         {"dist": "normal", "scale": 0.03, "relative": True, "min": 0.0},
+    "mass_front_pct":       {"dist": "normal", "scale": 3.0, "min": 0.0, "max": 100.0},
+    "tractor_z_factor":     {"dist": "normal", "scale": 0.08, "min": 0.0},
+    "machine_mass":         {"dist": "normal", "scale": 0.03, "relative": True, "min": 0.0},
+    "machine_dx_rel":       {"dist": "normal", "scale": 0.10},
+    "machine_dy_rel":       {"dist": "normal", "scale": 0.05},
+    "machine_dz_rel":       {"dist": "normal", "scale": 0.10},
+    "wheel_weight_ARG":     {"dist": "normal", "scale": 0.05, "relative": True, "min": 0.0},
+    "wheel_weight_ARD":     {"dist": "normal", "scale": 0.05, "relative": True, "min": 0.0},
+    "front_ballast_mass":   {"dist": "normal", "scale": 0.05, "relative": True, "min": 0.0},
+    "front_ballast_offset": {"dist": "normal", "scale": 0.05, "min": 0.0},
+    "rear_ballast_mass":    {"dist": "normal", "scale": 0.05, "relative": True, "min": 0.0},
+    "rear_ballast_offset":  {"dist": "normal", "scale": 0.05, "min": 0.0},
+}
+
+DISTRIBUTIONS = ("normal", "uniform")
+
+PERCENTILES = (1, 5, 50, 95, 99)
+
+INDEX_COLUMNS = ("I_static", "I_dynamic", "FL", "FR", "RL", "RR", "mass_total")
+
+MAX_SAMPLES = 2_000_000
+
+PERCENTILE_SAMPLES = 100_000
+
+
+# -----------------------------------------------------------
+# Tirages
+# -----------------------------------------------------------
+
+def nominal_parameters(cfg):
+    """Valeurs nominales des paramètres incertains (cf. DEFAULT_UNCERTAINTY)."""
+    options = cfg.options
+    return {
+        "tractor_mass":         cfg.tractor_mass,
+        "mass_front_pct":       float(cfg.tractor.get("mass_front_pct", 50)),
+        "tractor_z_factor":     1.30,
+        "machine_mass":         cfg.machine_mass,
+        "machine_dx_rel":       0.0,
+        "machine_dy_rel":       0.0,
+        "machine_dz_rel":       0.0,
+        "wheel_weight_ARG":     float(options.get("wheel_weight_ARG", 0) or 0),
+        "wheel_weight_ARD":     float(options.get("wheel_weight_ARD", 0) or 0),
+        "front_ballast_mass":   float(options.get("front_ballast_mass", 0) or 0),
+        "front_ballast_offset": float(options.get("front_ballast_offset", 0.0) or 0),
+        "rear_ballast_mass":    float(options.get("rear_ballast_mass", 0) or 0),
+        "rear_ballast_offset":  float(options.get("rear_ballast_offset", 0.0) or 0),
+    }
+
+
+def resolve_uncertainty(uncertainty=None):
+    """
+    Lois effectives : DEFAULT_UNCERTAINTY complété / remplacé par
+    `uncertainty` ({paramètre: loi, ou None pour figer le paramètre}).
+    Lève ValueError si un paramètre ou une loi est inconnu.
+    """
+    laws = dict(DEFAULT_UNCERTAINTY)
+    for name, law in (uncertainty or {}).items():
+        if name not in DEFAULT_UNCERTAINTY:
+            raise ValueError(f"Paramètre incertain inconnu : {name!r} "
+                             f"(attendu : {', '.join(DEFAULT_UNCERTAINTY)})")
+        if law is None:
+            laws[name] = None
+            continue
+        if not isinstance(law, dict):
+            raise ValueError(f"{name} : loi attendue sous forme de dict (reçu {law!r})")
+        law = {**(DEFAULT_UNCERTAINTY[name]), **law}
+        if law["dist"] not in DISTRIBUTIONS:
+            raise ValueError(f"{name} : loi {law['dist']!r} inconnue "
+                             f"(attendu : {', '.join(DISTRIBUTIONS)})")
+        if not isinstance(law["scale"], (int, float)) or not law["scale"] >= 0:
+            raise ValueError(f"{name} : scale doit être ≥ 0 (reçu {law['scale']!r})")
+        laws[name] = law
+    return laws
+
+
+def generators(seed, names):
+    """
+    Un générateur indépendant par nom, dérivé de `seed`.
+
+    Chaque flux est consommé dans l'ordre des tirages : tirer n valeurs
+    d'un coup ou par paquets donne les mêmes valeurs.
+    """
+    streams = np.random.SeedSequence(seed).spawn(len(names))
+    return {name: np.random.default_rng(stream) for name, stream in zip(names, streams)}
+
+
+def draw_samples(nominal, laws, n_samples, rngs):
+    """
+    Tire n_samples valeurs de chaque paramètre.
+
+    rngs : {paramètre: générateur} (cf. generators())
+
+    Retourne {paramètre: tableau (n_samples,)} ; un paramètre figé
+    (loi None ou scale nul) reste un scalaire.
+    """
+    samples = {}
+    for name, value in nominal.items():
+        law = laws.get(name)
+        if law is None or law["scale"] == 0:
+            samples[name] = value
+            continue
+
+        rng = rngs[name]
+
+        if law["dist"] == "normal":
+            delta = law["scale"] * rng.standard_normal(n_samples)
+        else:
+            delta = law["scale"] * rng.uniform(-1.0, 1.0, n_samples)
+
+        x = value * (1.0 + delta) if law.get("relative") else value + delta
+        if law.get("min") is not None or law.get("max") is not None:
+            x = np.clip(x, law.get("min"), law.get("max"))
+        samples[name] = x
+    return samples
+
+
+# -----------------------------------------------------------
+# Chaîne vectorisée (un paquet de tirages)
+# -----------------------------------------------------------
+
+def _mode_elements(cfg, s, mode):
+    """Éléments (m, x, y, z) d'un mode pour un paquet de tirages `s`."""
+    pose = cfg.machine[mode]
+
+    # Chargeur : nominal (pas d'incertitude catalogue sur ses règles)
+    loader = None
+    if cfg.loader is not None:
+        m, cg = cfg.base_elements[mode][2]
+        loader = (m, cg[0], cg[1], cg[2])
+
+    return local_elements_batch(
+        cfg.wheelbase, cfg.track_rear, cfg.rear_radius, cfg.rear_volume,
+        {"water_ballast": bool(cfg.options.get("water_ballast", False)), **s},
+        tractor={
+            "mass": s["tractor_mass"],
+            "pct_front": s["mass_front_pct"] / 100.0,
+            "cg_height_nominal": float(cfg.tractor.get("cg_height_nominal", 1.0)),
+            "z_factor": s["tractor_z_factor"],
+        },
+        machine={
+            "mass": s["machine_mass"],
+            "x_rel": float(pose["x_rel"]) + s["machine_dx_rel"],
+            "y_rel": float(pose["y_rel"]) + s["machine_dy_rel"],
+            "z_rel": float(pose["z_rel"]) + s["machine_dz_rel"],
+        },
+        loader=loader,
+    )
+
+
+class Reservoir:
+    """
+    Sous-échantillon uniforme de taille bornée.
+
+    Chaque tirage reçoit une clé U(0, 1) ; le réservoir garde les lignes
+    des `size` plus petites clés vues. Le résultat ne dépend pas de
+    l'ordre ni du découpage des ajouts ; tant que moins de `size` lignes
+    ont été ajoutées, il les contient toutes.
+    """
+
+    def __init__(self, size, width):
+        self.size = int(size)
+        self.keys = np.empty(0)
+        self.rows = np.empty((0, width))
+
+    def add(self, keys, rows):
+        """Ajoute des lignes (n, width) et leurs clés (n,)."""
+        keys = np.concatenate([self.keys, keys])
+        rows = np.concatenate([self.rows, rows])
+        if keys.size > self.size:
+            keep = np.argpartition(keys, self.size - 1)[:self.size]
+            keys, rows = keys[keep], rows[keep]
+        self.keys, self.rows = keys, rows
+
+
+def _percentiles(values, levels):
+    """{"p<niveau>": valeur} sur les valeurs finies ; None si aucune."""
+    values = values[np.isfinite(values)]
+    if values.size == 0:
+        return None
+    return {f"p{q:g}": float(v) for q, v in zip(levels, np.percentile(values, levels))}
+
+
+class _ModeTotals:
+    """Cumuls d'un mode : compteurs de statuts, sommes des indices, réservoir."""
+
+    def __init__(self, n_rules, reservoir_size):
+        self.fail = 0
+        self.warning = 0
+        self.rule_fail = np.zeros(n_rules, dtype=np.int64)
+        self.rule_warning = np.zeros(n_rules, dtype=np.int64)
+        self.sums = dict.fromkeys(INDEX_COLUMNS, 0.0)
+        self.counts = dict.fromkeys(INDEX_COLUMNS, 0)
+        # Colonnes du réservoir : valeurs des critères puis INDEX_COLUMNS
+        self.reservoir = Reservoir(reservoir_size, n_rules + len(INDEX_COLUMNS))
+
+    def add(self, status, value, cols, keys):
+        """status / value : (n_rules, n) ; cols : {colonne: (n,)} ; keys : (n,)."""
+        worst = status.max(axis=0)
+        self.fail += int(np.count_nonzero(worst == STATUS_DANGER))
+        self.warning += int(np.count_nonzero(worst == STATUS_WARNING))
+        self.rule_fail += np.count_nonzero(status == STATUS_DANGER, axis=1)
+        self.rule_warning += np.count_nonzero(status == STATUS_WARNING, axis=1)
+
+        for col in INDEX_COLUMNS:
+            finite = cols[col][np.isfinite(cols[col])]
+            self.sums[col] += float(finite.sum())
+            self.counts[col] += finite.size
+
+        self.reservoir.add(keys, np.column_stack([value.T, *(cols[c] for c in INDEX_COLUMNS)]))
+
+    def summary(self, profile, n_samples, levels):
+        rows = self.reservoir.rows
+        n_rules = len(profile.rules)
+        return {
+            "p_fail": self.fail / n_samples,
+            "p_warning": self.warning / n_samples,
+            "criteria": [
+                {
+                    "id": rule.id,
+                    "name": rule.name,
+                    "p_fail": float(self.rule_fail[i]) / n_samples,
+                    "p_warning": float(self.rule_warning[i]) / n_samples,
+                    "percentiles": _percentiles(rows[:, i], levels),
+                }
+                for i, rule in enumerate(profile.rules)
+            ],
+            "indices": {
+                col: {
+                    "mean": self.sums[col] / self.counts[col] if self.counts[col] else None,
+                    "percentiles": _percentiles(rows[:, n_rules + j], levels),
+                }
+                for j, col in enumerate(INDEX_COLUMNS)
+            },
+        }
+
+
+# -----------------------------------------------------------
+# MONTE CARLO
+# -----------------------------------------------------------
+
+def monte_carlo(tractor, machine, loader, tires, options, env,
+                n_samples=100_000, seed=0, uncertainty=None,
+                percentiles=PERCENTILES, chunk=50_000):
+    """
+    Entrées :
+        tractor, machine, loader, tires, options, env : comme solve()
+        n_samples   : nombre de tirages
+        seed        : graine du générateur (reproductibilité)
+        uncertainty : lois des paramètres, fusionnées avec
+                      DEFAULT_UNCERTAINTY (None = figer un paramètre)
+        percentiles : niveaux (en %) des percentiles retournés
+        chunk       : taille des paquets de calcul ; la mémoire est
+                      bornée par chunk + PERCENTILE_SAMPLES tirages
+
+    Sortie :
+        {
+            "n_samples", "seed", "profile",
+            "percentile_samples": tirages retenus pour les percentiles,
+            "parameters": {paramètre: {"nominal", "dist", "scale", ...}},
+            "transport" / "work": {
+                "p_fail":    probabilité qu'au moins un critère soit DANGER,
+                "p_warning": probabilité que le pire critère soit WARNING,
+                "criteria":  [{"id", "name", "p_fail", "p_warning",
+                               "percentiles"}, ...]   (ordre du profil),
+                "indices":   {colonne: {"mean", "percentiles"}}
+            }
+        }
+
+    Lève ValueError si la configuration ou les lois sont invalides.
+    """
+    n_samples = int(n_samples)
+    if not 0 < n_samples <= MAX_SAMPLES:
+        raise ValueError(f"n_samples doit être dans [1, {MAX_SAMPLES}] (reçu {n_samples})")
+    if not int(chunk) > 0:
+        raise ValueError(f"chunk doit être > 0 (reçu {chunk!r})")
+    levels = tuple(float(q) for q in percentiles)
+    if not all(0 <= q <= 100 for q in levels):
+        raise ValueError(f"Percentiles hors de [0, 100] : {percentiles!r}")
+
+    loader = resolve_loader(tractor, options)
+    cfg = compile_config(tractor, machine, loader, tires, options)
+    profile = cfg.profile
+    env = {k: float(env.get(k, 0.0)) for k in ENV_KEYS}
+
+    nominal = nominal_parameters(cfg)
+    laws = resolve_uncertainty(uncertainty)
+    rngs = generators(seed, [*nominal, "reservoir"])
+
+    n_rules = len(profile.rules)
+    totals = {mode: _ModeTotals(n_rules, PERCENTILE_SAMPLES) for mode in MODES}
+
+    for start in range(0, n_samples, int(chunk)):
+        size = min(int(chunk), n_samples - start)
+        s = draw_samples(nominal, laws, size, rngs)
+        keys = rngs["reservoir"].random(size)
+        shape = (size,)
+
+        for mode in MODES:
+            MT, X, Y, Z = accumulate_CG_batch(_mode_elements(cfg, s, mode))
+            cols = evaluate_mode_batch(MT, X, Y, Z, env,
+                                       cfg.wheelbase, cfg.track_front, cfg.track_rear)
+
+            evaluation = profile.evaluate(metrics_from(
+                cols, cols, cols["mass_total"],
+                s["machine_mass"], s["tractor_mass"], cfg.ptac,
+            ))
+
+            totals[mode].add(
+                np.array([np.broadcast_to(v, shape) for v in evaluation["status"]],
+                         dtype=np.int8).reshape(n_rules, size),
+                np.array([np.broadcast_to(v, shape) for v in evaluation["value"]],
+                         dtype=float).reshape(n_rules, size),
+                {col: np.broadcast_to(np.asarray(cols[col], dtype=float), shape)
+                 for col in INDEX_COLUMNS},
+                keys,
+            )
+
+    # ----- Synthèse -----
+    result = {
+        "n_samples": n_samples,
+        "seed": seed,
+        "profile": profile.name,
+        "percentile_samples": min(n_samples, PERCENTILE_SAMPLES),
+        "parameters": {
+            name: {"nominal": value, **(laws[name] or {"dist": None})}
+            for name, value in nominal.items()
+        },
+    }
+    for mode in MODES:
+        result[mode] = totals[mode].summary(profile, n_samples, levels)
+
+    return result
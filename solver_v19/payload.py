@@ -0,0 +1,195 @@
+"""
+payload.py — Charge maximale du godet sur tout le catalogue
+-----------------------------------------------------------
+
+Avec un chargeur frontal et une machine arrière : combien peut-on mettre
+dans le godet avant qu'un critère du profil passe en DANGER (roue avant
+au-delà de 40 % de la masse totale, PTAC, stabilité...) ?
+
+La charge du godet s'ajoute à la masse du chargeur, à son CG
+(cf. loader.loader_CG / cg.loader_CG_batch) ; les charges aux roues
+sont celles de wheels.wheel_loads_batch (version vectorisée de
+wheel_loads_one_mode).
+
+Recherche, pour TOUS les triplets (tracteur, machine, pneu) à la fois
+(mêmes tableaux broadcastés que sweep.py) :
+
+    1) balayage grossier de [0, payload_max] (n_grid charges) : premier
+       point compatible et fin de la plage compatible qui le suit
+    2) bissection vectorisée sur chaque bord, jusqu'à `tolerance` kg
+
+La borne basse n'est pas toujours nulle : une machine arrière lourde peut
+délester l'essieu avant à vide, la charge du godet le recharge.
+
+Le résultat est une table en colonnes (comme sweep.sweep_catalog) :
+
+    tractor, machine, tire            : indices dans catalog["*_keys"]
+    min_payload_<mode>                : charge minimale compatible (kg)
+    max_payload_<mode>                : charge maximale compatible (kg)
+    capped_<mode>                     : encore compatible à payload_max
+    limit_<mode>                      : critère qui borne max_payload
+    min_payload / max_payload         : les deux modes (NaN : aucune
+                                        charge compatible)
+"""
+
+import numpy as np
+
+from .batch import evaluate_mode_batch, ENV_KEYS, MODES
+from .cg import accumulate_CG_batch
+from .compatibility import metrics_from
+from .rules import load_profile, STATUS_DANGER
+from .sweep import catalog_elements
+
+
+# -----------------------------------------------------------
+# Prédicat vectorisé : configuration compatible pour une charge
+# -----------------------------------------------------------
+
+def _payload_status(catalog, t_slice, mode, options, env, profile, payload):
+    """
+    Codes de statut (n_règles, *forme) pour des charges de godet
+    broadcastables avec tracteurs (k,1,1) × machines (1,M,1) × pneus (1,1,P).
+    """
+    elements = catalog_elements(catalog, t_slice, mode, options, payload=payload)
+    MT, X, Y, Z = accumulate_CG_batch(elements)
+
+    tr = lambda name: catalog[name][t_slice][:, None, None]
+    cols = evaluate_mode_batch(MT, X, Y, Z, env, tr("tractor_wheelbase"),
+                               tr("tractor_track_front"), tr("tractor_track_rear"))
+
+    return profile.status_codes(metrics_from(
+        cols, cols, cols["mass_total"],
+        catalog["machine_mass"][None, :, None],
+        tr("tractor_mass"),
+        tr("tractor_ptac"),
+    ))
+
+
+def _bisect(ok_at, good, bad, tolerance):
+    """
+    Bissection vectorisée : `good` compatible, `bad` non compatible
+    (tableaux) ; retourne (good, bad) resserrés à moins de `tolerance`.
+    """
+    while np.nanmax(np.abs(bad - good), initial=0.0) > tolerance:
+        mid = 0.5 * (good + bad)
+        ok = ok_at(mid)
+        good = np.where(ok, mid, good)
+        bad = np.where(ok, bad, mid)
+    return good, bad
+
+
+# -----------------------------------------------------------
+# CHARGE MAXIMALE (catalogue)
+# -----------------------------------------------------------
+
+def max_payload_catalog(catalog, options: dict = None, env: dict = None,
+                        payload_max=5000.0, n_grid=33, tolerance=1.0,
+                        tractor_chunk=8):
+    """
+    Entrées :
+        catalog     : cf. sweep.compile_catalog
+        options     : comme sweep.sweep_catalog (chargeur de série de
+                      chaque tracteur, position loader_mode / loader_lift)
+        env         : slope_lat, slope_long, speed, turn_radius, accel_long
+        payload_max : borne haute de la recherche (kg)
+        n_grid      : points du balayage grossier
+        tolerance   : précision de la bissection (kg)
+
+    Sortie : table en colonnes (voir l'en-tête du module), ordonnée
+             tracteur → machine → pneu.
+
+    Lève ValueError si un tracteur n'a pas de chargeur de série.
+    """
+    if not payload_max > 0:
+        raise ValueError(f"payload_max doit être > 0 (reçu {payload_max!r})")
+    if int(n_grid) < 2:
+        raise ValueError(f"n_grid doit être ≥ 2 (reçu {n_grid!r})")
+    if not tolerance > 0:
+        raise ValueError(f"tolerance doit être > 0 (reçu {tolerance!r})")
+
+    options = {**(options or {}), "loader_enabled": True}
+    env = {k: float((env or {}).get(k, 0.0)) for k in ENV_KEYS}
+    profile = load_profile(options.get("rules_profile"))
+    rule_ids = np.array([rule.id for rule in profile.rules] + [None], dtype=object)
+
+    n_t = len(catalog["tractor_keys"])
+    n_m = len(catalog["machine_keys"])
+    n_p = len(catalog["tire_keys"])
+
+    table = {
+        "tractor": np.repeat(np.arange(n_t, dtype=np.int32), n_m * n_p),
+        "machine": np.tile(np.repeat(np.arange(n_m, dtype=np.int32), n_p), n_t),
+        "tire":    np.tile(np.arange(n_p, dtype=np.int32), n_t * n_m),
+    }
+    size = n_t * n_m * n_p
+    for mode in MODES:
+        table[f"min_payload_{mode}"] = np.empty(size)
+        table[f"max_payload_{mode}"] = np.empty(size)
+        table[f"capped_{mode}"] = np.empty(size, dtype=bool)
+        table[f"limit_{mode}"] = np.empty(size, dtype=object)
+
+    grid = np.linspace(0.0, float(payload_max), int(n_grid))
+    last = len(grid) - 1
+
+    for start in range(0, n_t, tractor_chunk):
+        t_slice = slice(start, min(start + tractor_chunk, n_t))
+        shape = (t_slice.stop - t_slice.start, n_m, n_p)
+        rows = slice(start * n_m * n_p, t_slice.stop * n_m * n_p)
+
+        for mode in MODES:
+            def status(payload):
+                return np.broadcast_to(
+                    _payload_status(catalog, t_slice, mode, options, env, profile, payload),
+                    (len(profile.rules),) + np.broadcast_shapes(np.shape(payload), shape),
+                )
+
+            def ok_at(payload):
+                return (status(payload) < STATUS_DANGER).all(axis=0)
+
+            # ----- 1) Balayage grossier : (n_grid, k, M, P) -----
+            ok = ok_at(grid[:, None, None, None])
+            feasible = ok.any(axis=0)
+            first = np.argmax(ok, axis=0)
+
+            # Fin de la plage compatible qui commence à `first`
+            breaks = ~ok & (np.arange(len(grid))[:, None, None, None] >= first)
+            upper_open = feasible & breaks.any(axis=0)
+            end = np.where(upper_open, np.argmax(breaks, axis=0) - 1, last)
+
+            # ----- 2) Bissection sur les deux bords -----
+            good, bad = _bisect(
+                ok_at,
+                grid[end],
+                np.where(upper_open, grid[np.minimum(end + 1, last)], grid[end]),
+                tolerance,
+            )
+            max_payload = np.where(feasible, good, np.nan)
+
+            lower_open = feasible & (first > 0)
+            min_good, _ = _bisect(
+                ok_at,
+                grid[first],
+                np.where(lower_open, grid[np.maximum(first - 1, 0)], grid[first]),
+                tolerance,
+            )
+            min_payload = np.where(feasible, min_good, np.nan)
+
+            # Critère qui passe en DANGER juste au-dessus de max_payload
+            danger = status(bad) >= STATUS_DANGER
+            limit = np.where(upper_open & danger.any(axis=0),
+                             np.argmax(danger, axis=0), len(profile.rules))
+
+            table[f"min_payload_{mode}"][rows] = min_payload.ravel()
+            table[f"max_payload_{mode}"][rows] = max_payload.ravel()
+            table[f"capped_{mode}"][rows] = (feasible & ~upper_open).ravel()
+            table[f"limit_{mode}"][rows] = rule_ids[limit].ravel()
+
+    # ----- Les deux modes -----
+    low = np.fmax.reduce([table[f"min_payload_{mode}"] for mode in MODES])
+    high = np.fmin.reduce([table[f"max_payload_{mode}"] for mode in MODES])
+    both = ~np.isnan(np.stack([table[f"max_payload_{mode}"] for mode in MODES])).any(axis=0)
+    both &= low <= high
+    table["min_payload"] = np.where(both, low, np.nan)
+    table["max_payload"] = np.where(both, high, np.nan)
+
+    return table
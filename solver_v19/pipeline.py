@@ -0,0 +1,341 @@
+"""
+pipeline.py — Pipeline du solver en étapes mémoïsées
+----------------------------------------------------
+
+solve() est un graphe de dépendances entre étapes :
+
+    compile        (tracteur, machine, chargeur, pneu, options)
+      └─ cg_local        CG sol plat
+           └─ rotation        + slope_lat, slope_long
+                ├─ static          (PFS)
+                │    └─ dynamic        + speed, turn_radius, accel_long
+                ├─ wheels          (charges aux roues)
+                └─ compatibility   (critères, à partir de static + wheels)
+
+Chaque étape garde un petit cache LRU indexé par SES entrées : bouger
+une pente ne recalcule que rotation → static → dynamic → wheels →
+compatibility ; bouger la vitesse ne recalcule que dynamic. La
+configuration compilée (validation comprise) n'est recalculée que si le
+tracteur, la machine, le chargeur, le pneu ou les options changent.
+
+Deux noyaux pour les étapes :
+    "scalar" : flottants Python (scalar.py) — pipeline par défaut de
+               solve(), utilisé par l'interface et par /simulate
+    "numpy"  : tous les cas de charge en un calcul tableau (stacked.py)
+
+Clé de configuration (config_key) : empreintes des JSON mémorisées par
+IDENTITÉ (Digests, un seul json.dumps par objet tant qu'il reste en
+cache) + tuple trié des options simples. Les catalogues de l'API et de
+l'interface sont chargés une fois : la clé coûte quelques µs.
+
+Les compteurs hits / misses de chaque étape sont disponibles via
+Pipeline.stats() (et solver.pipeline_stats() pour le pipeline par défaut).
+
+NOTE : les blocs retournés sont partagés entre appels (cache) ;
+ils ne doivent pas être modifiés par l'appelant. Les JSON passés au
+pipeline ne doivent pas non plus être modifiés en place (leurs
+empreintes sont mémorisées par identité).
+"""
+
+import hashlib
+import itertools
+import json
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .compatibility import compute_compatibility
+from .compiled import compile_config, KERNELS
+from .dynamic_pfd import compute_dynamic_stability
+from .scalar import compute_local_CG_scalar, rotate_CG_scalar, compute_static_stability_scalar
+from .wheels import compute_wheel_loads
+from .stacked import (
+    compute_local_CG_stacked, rotate_CG_stacked,
+    compute_static_stability_stacked, compute_wheel_loads_stacked,
+    compute_dynamic_stability_stacked, compute_compatibility_stacked,
+    unstack_CG, unstack_static, unstack_dynamic, unstack_wheels,
+)
+
+
+log = logging.getLogger(__name__)
+
+STAGES = ("compile", "cg_local", "rotation", "static", "dynamic", "wheels", "compatibility")
+
+
+# -----------------------------------------------------------
+# Clés canoniques
+# -----------------------------------------------------------
+
+def _json_default(obj):
+    """Sérialisation des types NumPy dans les clés."""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Type non sérialisable dans une clé : {type(obj).__name__}")
+
+
+def fingerprint(*parts):
+    """Empreinte courte et stable d'objets JSON (dicts, listes, nombres)."""
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"),
+                         default=_json_default)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class Digests:
+    """
+    Empreintes (fingerprint) de JSON mémorisées par identité : un objet
+    déjà vu (et toujours en cache) ne coûte qu'une recherche.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()     # {id: (objet, empreinte)}
+        self.lock = threading.Lock()
+
+    def __call__(self, obj):
+        if obj is None:
+            return None
+        with self.lock:
+            entry = self.entries.get(id(obj))
+            if entry is not None and entry[0] is obj:
+                self.entries.move_to_end(id(obj))
+                return entry[1]
+
+        digest = fingerprint(obj)
+
+        with self.lock:
+            self.entries[id(obj)] = (obj, digest)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return digest
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+_ATOMS = (str, int, float, bool, type(None))
+
+
+def options_key(options):
+    """
+    Clé des options hors chargeur : tuple trié si toutes les valeurs sont
+    des nombres / chaînes / booléens (cas courant), sinon fingerprint().
+    """
+    values = {k: v for k, v in options.items() if k != "loader"}
+    if all(type(v) in _ATOMS for v in values.values()):
+        return tuple(sorted(values.items()))
+    return fingerprint(values)
+
+
+# -----------------------------------------------------------
+# Cache d'une étape
+# -----------------------------------------------------------
+
+_MISSING = object()
+
+
+class StageCache:
+    """Cache LRU d'une étape, avec compteurs hits / misses."""
+
+    __slots__ = ("name", "maxsize", "entries", "hits", "misses", "lock")
+
+    def __init__(self, name, maxsize=256):
+        self.name = name
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key, compute):
+        """Retourne la valeur en cache, ou la calcule via compute()."""
+        with self.lock:
+            value = self.entries.get(key, _MISSING)
+            if value is not _MISSING:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+
+        value = compute()
+
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.entries)}
+
+
+# -----------------------------------------------------------
+# Critères de sécurité
+# -----------------------------------------------------------
+
+def attach_compatibility(result, compute):
+    """
+    Ajoute au résultat les critères retournés par compute()
+    (cf. compatibility.compute_compatibility) ; listes vides en cas d'erreur.
+    """
+    try:
+        result.update(compute())
+    except Exception as e:
+        log.warning("Erreur de compatibilité : %s", e)
+        for case in result.get("cases", ("work", "transport")):
+            result[f"compatibility_{case}"] = []
+        result["compatibility"] = []
+    return result
+
+
+# -----------------------------------------------------------
+# Pipeline
+# -----------------------------------------------------------
+
+class Pipeline:
+    """Enchaînement mémoïsé des étapes du solver."""
+
+    def __init__(self, maxsize=256, kernel="scalar"):
+        if kernel not in KERNELS:
+            raise ValueError(f"Noyau inconnu : {kernel!r} (attendu : {', '.join(KERNELS)})")
+        self.kernel = kernel
+        self.stages = {name: StageCache(name, maxsize) for name in STAGES}
+        self.digests = Digests(4 * maxsize)
+        self.tokens = itertools.count()
+
+    def config_key(self, tractor, machine, loader, tires, options):
+        """Clé de la configuration compilée (cf. en-tête du module)."""
+        rear_tire = options.get("rear_tire")
+        digest = self.digests
+        return (
+            digest(tractor), digest(machine), digest(loader),
+            rear_tire, digest(tires.get(rear_tire)),
+            options_key(options),
+        )
+
+    def run(self, tractor, machine, loader, tires, options, env):
+        """
+        Même contrat que solve(), `loader` étant le chargeur EFFECTIF
+        (cf. solver.resolve_loader).
+        """
+        # Chaque configuration compilée reçoit un jeton entier unique :
+        # les clés des étapes en aval restent courtes à hacher
+        cfg_key = self.config_key(tractor, machine, loader, tires, options)
+        token, cfg = self.stages["compile"].get(cfg_key, lambda: (
+            next(self.tokens),
+            compile_config(tractor, machine, loader, tires, options, kernel=self.kernel),
+        ))
+
+        slope_lat = env.get("slope_lat", 0)
+        slope_long = env.get("slope_long", 0)
+        rot_key = (token, slope_lat, slope_long)
+        dyn_key = rot_key + (env.get("speed", 0), env.get("turn_radius", 0),
+                             env.get("accel_long", 0))
+
+        if self.kernel == "scalar":
+            return self._run_scalar(cfg, token, rot_key, dyn_key, env)
+        return self._run_numpy(cfg, token, rot_key, dyn_key, env)
+
+    def _run_scalar(self, cfg, token, rot_key, dyn_key, env):
+        """Étapes du noyau scalaire (scalar.run_scalar découpé)."""
+        st = self.stages
+        _, slope_lat, slope_long = rot_key
+
+        local = st["cg_local"].get(token, lambda: compute_local_CG_scalar(cfg))
+
+        # ----- Pente -----
+        CG_data = st["rotation"].get(
+            rot_key, lambda: rotate_CG_scalar(local, slope_lat, slope_long))
+        static = st["static"].get(
+            rot_key, lambda: compute_static_stability_scalar(cfg, CG_data, slope_lat, slope_long))
+        wheels = st["wheels"].get(rot_key, lambda: compute_wheel_loads(cfg, CG_data))
+
+        # ----- Dynamique -----
+        dynamic = st["dynamic"].get(dyn_key, lambda: compute_dynamic_stability(
+            cfg, CG_data, static,
+            speed=env.get("speed", 0),
+            turn_radius=env.get("turn_radius", 0),
+            accel_long=env.get("accel_long", 0),
+        ))
+
+        result = {
+            "cases": list(cfg.cases),
+            "CG": CG_data,
+            "static": static,
+            "dynamic": dynamic,
+            "wheels": wheels
+        }
+
+        # ----- Critères de sécurité -----
+        return attach_compatibility(result, lambda: st["compatibility"].get(
+            rot_key, lambda: compute_compatibility(cfg, CG_data, static, wheels)
+        ))
+
+    def _run_numpy(self, cfg, token, rot_key, dyn_key, env):
+        """Étapes du noyau NumPy : tous les cas de charge empilés (stacked.py)."""
+        st = self.stages
+        _, slope_lat, slope_long = rot_key
+
+        local = st["cg_local"].get(token, lambda: compute_local_CG_stacked(cfg))
+        cases = cfg.cases
+
+        # ----- Pente -----
+        # Chaque étape met en cache (colonnes empilées, blocs par cas)
+        def rotation():
+            CG_cols = rotate_CG_stacked(local, slope_lat, slope_long)
+            return CG_cols, unstack_CG(CG_cols)
+
+        def static_stage():
+            cols = compute_static_stability_stacked(cfg, CG_cols, slope_lat, slope_long)
+            return cols, unstack_static(cases, cols)
+
+        def wheels_stage():
+            cols = compute_wheel_loads_stacked(cfg, CG_cols)
+            return cols, unstack_wheels(cases, cols)
+
+        CG_cols, CG_data = st["rotation"].get(rot_key, rotation)
+        static_cols, static = st["static"].get(rot_key, static_stage)
+        wheels_cols, wheels = st["wheels"].get(rot_key, wheels_stage)
+
+        # ----- Dynamique -----
+        def dynamic_stage():
+            cols = compute_dynamic_stability_stacked(CG_cols, static_cols,
+                                                     speed=env.get("speed", 0),
+                                                     turn_radius=env.get("turn_radius", 0),
+                                                     accel_long=env.get("accel_long", 0))
+            return unstack_dynamic(cases, cols)
+
+        dynamic = st["dynamic"].get(dyn_key, dynamic_stage)
+
+        result = {
+            "cases": list(cases),
+            "CG": CG_data,
+            "static": static,
+            "dynamic": dynamic,
+            "wheels": wheels
+        }
+
+        # ----- Critères de sécurité -----
+        return attach_compatibility(result, lambda: st["compatibility"].get(
+            rot_key, lambda: compute_compatibility_stacked(cfg, CG_cols, static_cols, wheels_cols)
+        ))
+
+    def stats(self):
+        """Compteurs par étape : {étape: {"hits", "misses", "size"}}."""
+        return {name: cache.stats() for name, cache in self.stages.items()}
+
+    def clear(self):
+        for cache in self.stages.values():
+            cache.clear()
+        self.digests.clear()
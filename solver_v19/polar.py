@@ -0,0 +1,118 @@
+"""
+polar.py — Carte polaire : stabilité selon le cap sur un versant
+----------------------------------------------------------------
+
+Sur un versant réel, slope_lat et slope_long ne sont pas indépendants :
+ils découlent d'UNE pente terrain θ et du cap φ du tracteur
+(cf. geometry.slopes_from_heading ; 0° = face à l'amont).
+
+polar_map() balaie les caps de 0 à 360° et évalue TOUS les caps en un
+seul appel de la chaîne vectorisée (batch.evaluate_mode : la
+rotation est geometry.rotate_by_slopes_batch, forme fermée sans matrice
+3×3 par cap).
+
+Sortie par cap et par mode : I_lat, I_long, I_static, I_dynamic,
+charges aux roues et statut de compatibilité ; plus les secteurs de
+caps sans critère DANGER (les deux modes), à montrer à l'opérateur.
+"""
+
+import numpy as np
+
+from .batch import evaluate_mode, ENV_KEYS
+from .cg import compute_local_CG
+from .compiled import compile_config, MODES
+from .geometry import slopes_from_heading
+from .rules import STATUS_DANGER, STATUS_LABELS
+from .solver import resolve_loader
+
+
+COLUMNS = ("I_lat", "I_long", "I_static", "I_dynamic", "FL", "FR", "RL", "RR")
+
+
+def safe_sectors(headings, safe):
+    """
+    Secteurs [début, fin] (degrés) de caps consécutifs sûrs ; un secteur
+    qui traverse 0° est fusionné (fin < début dans ce cas).
+    """
+    safe = np.asarray(safe, dtype=bool)
+    if safe.all():
+        return [[0.0, 360.0]]
+    if not safe.any():
+        return []
+
+    # Départ juste après un cap non sûr : aucun secteur coupé en deux
+    shift = int(np.flatnonzero(~safe)[0]) + 1
+    order = np.roll(np.arange(len(safe)), -shift)
+
+    sectors, start = [], None
+    for i in order:
+        if safe[i] and start is None:
+            start = i
+        elif not safe[i] and start is not None:
+            sectors.append([float(headings[start]), float(headings[previous])])
+            start = None
+        previous = i
+    if start is not None:
+        sectors.append([float(headings[start]), float(headings[previous])])
+    return sectors
+
+
+def polar_map(tractor, machine, loader, tires, options, terrain_slope,
+              env=None, resolution=1.0):
+    """
+    Entrées :
+        tractor, machine, loader, tires, options : comme solve()
+        terrain_slope : pente du versant (degrés)
+        env           : speed, turn_radius, accel_long (slope_lat et
+                        slope_long sont ignorés : ils dépendent du cap)
+        resolution    : pas du balayage des caps (degrés)
+
+    Sortie :
+        {
+            "terrain_slope", "headings", "slope_lat", "slope_long",
+            "transport" / "work": {I_lat, I_long, I_static, I_dynamic,
+                                   FL, FR, RL, RR, "status"},
+            "critical_heading": {mode: cap de I_dynamic minimal},
+            "safe_sectors":     [[début, fin], ...] (cf. safe_sectors)
+        }
+
+    Lève ValueError si la configuration est invalide.
+    """
+    if not 0 < resolution <= 90:
+        raise ValueError(f"resolution doit être dans ]0, 90] degrés (reçu {resolution!r})")
+    if not 0 <= terrain_slope < 90:
+        raise ValueError(f"terrain_slope doit être dans [0, 90[ degrés (reçu {terrain_slope!r})")
+
+    loader = resolve_loader(tractor, options)
+    cfg = compile_config(tractor, machine, loader, tires, options)
+    local = compute_local_CG(cfg)
+
+    headings = np.arange(0.0, 360.0, resolution)
+    slope_lat, slope_long = slopes_from_heading(terrain_slope, headings)
+
+    env = {k: float((env or {}).get(k, 0.0)) for k in ENV_KEYS}
+    env.update(slope_lat=slope_lat, slope_long=slope_long)
+
+    result = {
+        "terrain_slope": float(terrain_slope),
+        "headings": headings.tolist(),
+        "slope_lat": slope_lat.tolist(),
+        "slope_long": slope_long.tolist(),
+        "critical_heading": {},
+    }
+    danger = np.zeros(headings.shape, dtype=bool)
+
+    for mode in MODES:
+        block = local[mode]
+        X, Y, Z = block["CG_local"]
+        cols, codes = evaluate_mode(cfg, block["mass_total"], X, Y, Z, env)
+        worst = np.broadcast_to(codes.max(axis=0), headings.shape)
+        danger |= worst == STATUS_DANGER
+
+        columns = {col: np.broadcast_to(cols[col], headings.shape) for col in COLUMNS}
+        result[mode] = {col: values.tolist() for col, values in columns.items()}
+        result[mode]["status"] = [STATUS_LABELS.get(int(code), "—") for code in worst]
+        result["critical_heading"][mode] = float(headings[np.argmin(columns["I_dynamic"])])
+
+    result["safe_sectors"] = safe_sectors(headings, ~danger)
+    return result
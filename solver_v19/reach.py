@@ -0,0 +1,176 @@
+"""
+reach.py — Enveloppe de portée du bras (CG machine continu)
+-----------------------------------------------------------
+
+Le JSON machine ne donne que deux poses (transport, work) alors que le
+bras parcourt un continuum de positions, borné par portee_horizontale
+et portee_verticale.
+
+Modèle (calé sur les deux poses du catalogue) : une fraction k de la
+masse machine suit la tête de coupe, le reste est fixe sur le relevage.
+
+    pose de référence (r_ref, h_ref) = pose "work"
+        r_ref = machine["reach_reference"]["horizontal"]
+                (défaut : portee_horizontale — pose work = bras déployé)
+        h_ref = machine["reach_reference"]["vertical"] (défaut : 0, sol)
+
+    k     = |y_work - y_transport| / r_ref
+    x_rel = x_work
+    y_rel = y_transport + côté · k · r        (côté : droite -1, gauche +1)
+    z_rel = z_work + k · (h - h_ref)
+
+Au point (r_ref, h_ref) du côté de travail, on retrouve exactement la
+pose "work". La grille (côtés × portées × hauteurs) est évaluée en UNE
+passe vectorisée (mode work) ; chaque critère du profil donne la zone de
+la grille où il est respecté (pas de DANGER) et, par hauteur, la portée
+maximale atteignable en restant dans cette zone depuis r = 0.
+"""
+
+import numpy as np
+
+from .batch import evaluate_mode, ENV_KEYS
+from .cg import accumulate_CG_batch, machine_CG_batch
+from .compiled import compile_config, MACHINE_ELEMENT
+from .rules import STATUS_DANGER
+from .solver import resolve_loader
+
+
+MODE = "work"
+
+SIDES = {"right": -1.0, "left": 1.0}
+
+
+# -----------------------------------------------------------
+# Modèle de pose du bras
+# -----------------------------------------------------------
+
+def reach_reference(machine):
+    """(r_ref, h_ref) : pose du bras correspondant à la pose "work"."""
+    ref = machine.get("reach_reference", {})
+    r_ref = float(ref.get("horizontal", machine.get("portee_horizontale", 0.0)) or 0.0)
+    h_ref = float(ref.get("vertical", 0.0) or 0.0)
+    if not r_ref > 0:
+        raise ValueError(f"Machine '{machine.get('model', '?')}' : portee_horizontale "
+                         f"(ou reach_reference.horizontal) > 0 requise")
+    return r_ref, h_ref
+
+
+def arm_pose_offsets(machine, reach, height, side):
+    """
+    Offsets (x_rel, y_rel, z_rel) de la machine pour une pose du bras
+    (tableaux broadcastables ; side = -1 droite, +1 gauche).
+    """
+    transport, work = machine["transport"], machine["work"]
+    r_ref, h_ref = reach_reference(machine)
+
+    k = abs(float(work["y_rel"]) - float(transport["y_rel"])) / r_ref
+
+    x_rel = np.full(np.broadcast(reach, height, side).shape, float(work["x_rel"]))
+    y_rel = float(transport["y_rel"]) + side * k * reach
+    z_rel = float(work["z_rel"]) + k * (height - h_ref)
+    return x_rel, y_rel, z_rel
+
+
+def _max_reach(holds, reaches):
+    """
+    Par hauteur : plus grande portée r telle que le critère soit
+    respecté pour toutes les portées de 0 à r (None s'il échoue à r = 0).
+
+    holds : booléens (portées, hauteurs)
+    """
+    prefix = np.logical_and.accumulate(holds, axis=0)
+    count = prefix.sum(axis=0)
+    return [float(reaches[c - 1]) if c else None for c in count]
+
+
+# -----------------------------------------------------------
+# ENVELOPPE DE PORTÉE
+# -----------------------------------------------------------
+
+def reach_envelope(tractor, machine, loader, tires, options, env=None,
+                   reaches=None, heights=None, sides=("right", "left"),
+                   n_reach=50, n_height=50):
+    """
+    Entrées :
+        tractor, machine, loader, tires, options, env : comme solve()
+        reaches : portées horizontales (m) ; défaut : n_reach valeurs
+                  de 0 à portee_horizontale
+        heights : hauteurs de tête (m) ; défaut : n_height valeurs de 0
+                  à portee_verticale
+        sides   : côtés évalués ("right", "left")
+
+    Sortie :
+        {
+            "reach", "height", "reference": {"reach", "height", "side"},
+            "sides": {côté: {
+                "I_static", "I_dynamic": grilles [portée][hauteur],
+                "compatible":  grille de booléens (aucun DANGER),
+                "max_reach":   par hauteur, tous critères (cf. _max_reach),
+                "criteria": [{"id", "name", "holds", "max_reach"}]
+            }}
+        }
+
+    Lève ValueError si la configuration ou la grille est invalide.
+    """
+    unknown = [s for s in sides if s not in SIDES]
+    if unknown or not sides:
+        raise ValueError(f"Côtés attendus parmi {', '.join(SIDES)} (reçu {list(sides)!r})")
+
+    loader = resolve_loader(tractor, options)
+    cfg = compile_config(tractor, machine, loader, tires, options)
+    r_ref, h_ref = reach_reference(machine)
+
+    if reaches is None:
+        reaches = np.linspace(0.0, float(machine.get("portee_horizontale", r_ref)), int(n_reach))
+    if heights is None:
+        heights = np.linspace(0.0, float(machine.get("portee_verticale", 0.0) or 0.0), int(n_height))
+    reaches = np.asarray(reaches, dtype=float)
+    heights = np.asarray(heights, dtype=float)
+    if reaches.ndim != 1 or heights.ndim != 1 or not reaches.size or not heights.size:
+        raise ValueError("Grille de portées / hauteurs vide")
+    if (reaches < 0).any() or (np.diff(reaches) <= 0).any():
+        raise ValueError("Portées attendues positives et strictement croissantes")
+
+    # ----- Éléments fixes (tout sauf la machine), regroupés -----
+    fixed = [el for i, el in enumerate(cfg.elements[MODE]) if i != MACHINE_ELEMENT]
+    M0 = sum(m for m, _ in fixed)
+    CG0 = sum(m * np.asarray(cg, dtype=float) for m, cg in fixed) / M0
+
+    # ----- Grille (côtés, portées, hauteurs) -----
+    side = np.array([SIDES[s] for s in sides])[:, None, None]
+    x_rel, y_rel, z_rel = arm_pose_offsets(machine, reaches[None, :, None],
+                                           heights[None, None, :], side)
+    MT, X, Y, Z = accumulate_CG_batch([
+        (M0, *CG0),
+        machine_CG_batch(cfg.machine_mass, x_rel, y_rel, z_rel, cfg.wheelbase, cfg.rear_radius),
+    ])
+
+    env = {k: float((env or {}).get(k, 0.0)) for k in ENV_KEYS}
+    cols, statuses = evaluate_mode(cfg, MT, X, Y, Z, env)
+    shape = x_rel.shape
+
+    statuses = np.broadcast_to(statuses, (len(cfg.profile.rules),) + shape)
+    holds = statuses != STATUS_DANGER
+
+    work_side = "right" if float(machine["work"]["y_rel"]) < float(machine["transport"]["y_rel"]) else "left"
+    result = {
+        "reach": reaches.tolist(),
+        "height": heights.tolist(),
+        "reference": {"reach": r_ref, "height": h_ref, "side": work_side},
+        "sides": {},
+    }
+    for s, name in enumerate(sides):
+        compatible = holds[:, s].all(axis=0)
+        result["sides"][name] = {
+            "I_static": np.broadcast_to(cols["I_static"], shape)[s].tolist(),
+            "I_dynamic": np.broadcast_to(cols["I_dynamic"], shape)[s].tolist(),
+            "compatible": compatible.tolist(),
+            "max_reach": _max_reach(compatible, reaches),
+            "criteria": [
+                {"id": rule.id, "name": rule.name,
+                 "holds": holds[r, s].tolist(),
+                 "max_reach": _max_reach(holds[r, s], reaches)}
+                for r, rule in enumerate(cfg.profile.rules)
+            ],
+        }
+    return result
@@ -0,0 +1,253 @@
+"""
+result_cache.py — Cache de résultats adressé par contenu devant solve()
+-----------------------------------------------------------------------
+
+L'API répond sans cesse aux mêmes configurations (pneus de série, lestage
+nul, pentes courantes). ResultCache.solve() sert le résultat de solve()
+déjà calculé pour des entrées identiques.
+
+Clé canonique (pipeline.fingerprint) :
+
+    version du catalogue   tractors/, machines/, loaders/, rules/,
+                           data/tires.json et sources du solver : un JSON
+                           ou un module modifié invalide les entrées
+    empreintes des données tracteur, machine, chargeur (options["loader"]),
+                           pneu arrière utilisé
+    options et env         normalisés : flottants arrondis à `decimals`
+                           décimales (1.4000001 m/s → 1.4), entiers et
+                           flottants confondus, clés triées
+
+Le calcul se fait sur les entrées ARRONDIES : deux requêtes de même clé
+reçoivent exactement le même résultat, quel que soit celle qui a rempli
+le cache.
+
+Deux niveaux :
+    mémoire  LRU borné (maxsize résultats)
+    disque   SQLite optionnel (path), conservé entre deux redémarrages ;
+             les entrées d'une autre version du catalogue sont purgées
+             à l'ouverture
+
+Les compteurs (hits mémoire / disque, misses, taux de succès) sont
+disponibles via ResultCache.stats().
+
+NOTE : comme pour pipeline.py, les résultats sont partagés entre appels ;
+ils ne doivent pas être modifiés par l'appelant. Les JSON passés à
+solve() ne doivent pas non plus être modifiés en place (leurs empreintes
+sont mémorisées par identité).
+"""
+
+import hashlib
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from .pipeline import fingerprint, Digests
+from .solver import solve
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CATALOG_SOURCES = ("tractors/*.json", "machines/*.json", "loaders/*.json",
+                   "rules/*.json", "data/tires.json", "solver_v19/*.py")
+
+
+# -----------------------------------------------------------
+# Version du catalogue
+# -----------------------------------------------------------
+
+def catalog_version(root=ROOT, patterns=CATALOG_SOURCES):
+    """Empreinte du contenu des fichiers du catalogue et du solver."""
+    root = Path(root)
+    h = hashlib.blake2b(digest_size=16)
+    for pattern in patterns:
+        for path in sorted(root.glob(pattern)):
+            h.update(path.relative_to(root).as_posix().encode("utf-8"))
+            h.update(b"\0")
+            h.update(path.read_bytes())
+            h.update(b"\0")
+    return h.hexdigest()
+
+
+# -----------------------------------------------------------
+# Normalisation des entrées
+# -----------------------------------------------------------
+
+def quantize(value, decimals=6):
+    """
+    Arrondit récursivement les flottants (dicts, listes, scalaires NumPy).
+    Les booléens, entiers, chaînes et None sont conservés.
+    """
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float):
+        return round(value, decimals) + 0.0       # -0.0 → 0.0
+    if isinstance(value, dict):
+        return {k: quantize(v, decimals) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [quantize(v, decimals) for v in value]
+    return value
+
+
+def _key_form(value):
+    """Forme de clé : entiers et flottants confondus (1 == 1.0)."""
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, int):
+        return float(value)
+    if isinstance(value, dict):
+        return {str(k): _key_form(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_key_form(v) for v in value]
+    return value
+
+
+# -----------------------------------------------------------
+# Cache
+# -----------------------------------------------------------
+
+class ResultCache:
+    """Résultats de solve() : LRU mémoire + SQLite optionnel."""
+
+    def __init__(self, maxsize=1024, path=None, decimals=6, version=None):
+        """
+        maxsize  : nombre de résultats gardés en mémoire
+        path     : base SQLite (None : pas de niveau disque)
+        decimals : arrondi des flottants d'options / env
+        version  : version du catalogue (défaut : catalog_version())
+        """
+        self.maxsize = int(maxsize)
+        self.decimals = int(decimals)
+        self.version = catalog_version() if version is None else str(version)
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+        # Empreintes des JSON mémorisées par identité
+        self._digest = Digests(4 * self.maxsize)
+
+        self.path = path
+        self.db = None
+        if path is not None:
+            self.db = sqlite3.connect(str(path), check_same_thread=False)
+            with self.db:
+                self.db.execute(
+                    "CREATE TABLE IF NOT EXISTS results ("
+                    " key TEXT PRIMARY KEY, version TEXT NOT NULL,"
+                    " value BLOB NOT NULL, created REAL NOT NULL)"
+                )
+                self.db.execute("DELETE FROM results WHERE version != ?", (self.version,))
+
+    # -------------------------------------------------------
+    # Clés
+    # -------------------------------------------------------
+
+    def key(self, tractor, machine, tires, options, env, kernel="auto"):
+        """Clé canonique d'un appel à solve() (options / env déjà arrondis)."""
+        rear_tire = options.get("rear_tire")
+        return fingerprint(
+            self.version, kernel,
+            self._digest(tractor), self._digest(machine),
+            self._digest(options.get("loader")),
+            rear_tire, self._digest(tires.get(rear_tire) if rear_tire in tires else None),
+            _key_form({k: v for k, v in options.items() if k != "loader"}),
+            _key_form(env),
+        )
+
+    # -------------------------------------------------------
+    # Niveau disque
+    # -------------------------------------------------------
+
+    def _disk_get(self, key):
+        if self.db is None:
+            return None
+        with self.lock:
+            row = self.db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+        return None if row is None else pickle.loads(row[0])
+
+    def _disk_put(self, key, value):
+        if self.db is None:
+            return
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self.lock, self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO results (key, version, value, created) VALUES (?, ?, ?, ?)",
+                (key, self.version, blob, time.time()),
+            )
+
+    def _remember(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    # -------------------------------------------------------
+    # solve() mis en cache
+    # -------------------------------------------------------
+
+    def solve(self, tractor, machine, loader, tires, options, env, kernel="auto"):
+        """Comme solver.solve(), servi depuis le cache si possible."""
+        options = {**quantize({k: v for k, v in options.items() if k != "loader"}, self.decimals),
+                   "loader": options.get("loader")}
+        env = quantize(dict(env), self.decimals)
+        key = self.key(tractor, machine, tires, options, env, kernel)
+
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+
+        result = self._disk_get(key)
+        if result is not None:
+            with self.lock:
+                self.disk_hits += 1
+            self._remember(key, result)
+            return result
+
+        with self.lock:
+            self.misses += 1
+        result = solve(tractor, machine, loader, tires, options, env, kernel=kernel)
+        self._remember(key, result)
+        self._disk_put(key, result)
+        return result
+
+    def clear(self, disk=False):
+        """Vide le niveau mémoire (et le niveau disque si disk=True)."""
+        with self.lock:
+            self.entries.clear()
+            self._digest.clear()
+            self.hits = self.disk_hits = self.misses = 0
+            if disk and self.db is not None:
+                with self.db:
+                    self.db.execute("DELETE FROM results")
+
+    def stats(self):
+        """Compteurs et taux de succès (mémoire + disque)."""
+        with self.lock:
+            calls = self.hits + self.disk_hits + self.misses
+            disk_size = None
+            if self.db is not None:
+                disk_size = self.db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            return {
+                "version": self.version,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / calls if calls else 0.0,
+                "size": len(self.entries),
+                "maxsize": self.maxsize,
+                "disk_size": disk_size,
+            }
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
@@ -0,0 +1,362 @@
+"""
+route.py — Analyse d'un itinéraire GPS sur modèle numérique de terrain
+---------------------------------------------------------------------
+
+Un itinéraire de débroussaillage (fossés, talus) est une polyligne GPS
+dans le système de coordonnées PROJETÉ (mètres) d'un MNT :
+
+    - raster .npy     : np.load(mmap_mode="r") — seules les pages touchées
+                        sont lues ; géoréférencement dans le fichier .json
+                        voisin {"x0", "y0", "dx", "dy", "nodata"}
+    - GeoTIFF         : rasterio (optionnel) — seule la fenêtre couvrant
+                        l'itinéraire est lue
+
+En chaque point de l'itinéraire (rééchantillonné tous les `step` m) :
+
+    cap         = direction de la tangente
+    pentes      = altitudes sous l'empreinte du tracteur :
+                  avant / arrière (empattement), gauche / droite (voie)
+    turn_radius = rayon du cercle passant par les points voisins
+                  (0 = ligne droite, convention de dynamic_forces)
+    accel_long  = v · dv/ds
+
+Les pentes suivent la convention de geometry.rotation_matrix (R appliqué
+au repère tracteur, +X avant, +Y gauche) :
+
+    slope_long > 0 : avant plus bas que l'arrière
+    slope_lat  > 0 : côté gauche plus haut
+
+Pour un plan de pentes s_u (avant) et s_l (gauche) :
+
+    slope_long = -atan(s_u)
+    slope_lat  =  asin(s_l / sqrt(1 + s_u² + s_l²))
+
+L'ensemble des points passe en une fois dans la chaîne vectorisée
+(batch.evaluate_mode : rotation → statique → dynamique → roues → règles),
+puis le profil de risque est agrégé par tronçons de `segment_length` m.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from .batch import evaluate_mode
+from .cg import compute_local_CG
+from .compiled import compile_config, MODES
+from .rules import STATUS_NA, STATUS_DANGER, STATUS_LABELS
+from .solver import resolve_loader
+
+
+# -----------------------------------------------------------
+# Modèle numérique de terrain
+# -----------------------------------------------------------
+
+class Dem:
+    """
+    Raster d'altitude nord-haut : le pixel (ligne i, colonne j) couvre
+    [x0 + j*dx, x0 + (j+1)*dx] × [y0 + i*dy, y0 + (i+1)*dy]
+    (dy < 0 pour un raster nord-haut, comme une transformation GDAL).
+    """
+
+    def __init__(self, z, x0=0.0, y0=0.0, dx=1.0, dy=1.0, nodata=None):
+        z = z if isinstance(z, np.ndarray) else np.asarray(z, dtype=float)
+        if z.ndim != 2 or min(z.shape) < 2:
+            raise ValueError(f"MNT : raster 2D d'au moins 2×2 attendu (reçu {z.shape})")
+        if not (dx and dy) or not np.isfinite([x0, y0, dx, dy]).all():
+            raise ValueError("MNT : géoréférencement invalide (dx, dy non nuls)")
+        self.z = z
+        self.x0, self.y0 = float(x0), float(y0)
+        self.dx, self.dy = float(dx), float(dy)
+        self.nodata = nodata
+
+    @property
+    def cell(self):
+        return min(abs(self.dx), abs(self.dy))
+
+    def elevation(self, x, y):
+        """Altitude interpolée (bilinéaire entre centres de pixels) ; NaN hors raster."""
+        col = (np.asarray(x, dtype=float) - self.x0) / self.dx - 0.5
+        row = (np.asarray(y, dtype=float) - self.y0) / self.dy - 0.5
+        rows, cols = self.z.shape
+        inside = (col >= 0) & (col <= cols - 1) & (row >= 0) & (row <= rows - 1)
+
+        j = np.clip(np.floor(np.where(inside, col, 0)).astype(np.int64), 0, cols - 2)
+        i = np.clip(np.floor(np.where(inside, row, 0)).astype(np.int64), 0, rows - 2)
+        fx, fy = np.where(inside, col - j, 0.0), np.where(inside, row - i, 0.0)
+
+        # Lecture ponctuelle : sur un memmap, seules les pages touchées sont chargées
+        z00 = self._read(i, j)
+        z01 = self._read(i, j + 1)
+        z10 = self._read(i + 1, j)
+        z11 = self._read(i + 1, j + 1)
+
+        z = (z00 * (1 - fx) * (1 - fy) + z01 * fx * (1 - fy)
+             + z10 * (1 - fx) * fy + z11 * fx * fy)
+        return np.where(inside, z, np.nan)
+
+    def _read(self, i, j):
+        z = np.asarray(self.z[i, j], dtype=float)
+        if self.nodata is not None:
+            z = np.where(z == self.nodata, np.nan, z)
+        return z
+
+
+def open_dem(path, transform=None, bounds=None):
+    """
+    Ouvre un MNT sans le charger en mémoire.
+
+    path      : .npy (memmap) ou .tif / .tiff (rasterio)
+    transform : {"x0", "y0", "dx", "dy", "nodata"} pour un .npy
+                (défaut : fichier .json voisin, sinon grille en pixels)
+    bounds    : (xmin, ymin, xmax, ymax) — GeoTIFF : fenêtre lue
+
+    Lève ValueError si le fichier est illisible, ImportError si rasterio
+    est absent pour un GeoTIFF.
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+
+    if suffix == ".npy":
+        if transform is None:
+            sidecar = path.with_suffix(".json")
+            transform = json.loads(sidecar.read_text(encoding="utf-8")) if sidecar.exists() else {}
+        try:
+            z = np.load(path, mmap_mode="r")
+        except (OSError, ValueError) as e:
+            raise ValueError(f"MNT illisible ({path.name}) : {e}")
+        return Dem(z, **{k: transform[k] for k in ("x0", "y0", "dx", "dy", "nodata") if k in transform})
+
+    if suffix in (".tif", ".tiff"):
+        try:
+            import rasterio
+            from rasterio.windows import from_bounds
+        except ImportError:
+            raise ImportError("Lecture des GeoTIFF : installer rasterio (ou convertir le MNT en .npy)")
+
+        with rasterio.open(path) as ds:
+            window = None
+            if bounds is not None:
+                window = from_bounds(*bounds, transform=ds.transform)
+                window = window.round_offsets().round_lengths().intersection(
+                    rasterio.windows.Window(0, 0, ds.width, ds.height))
+            t = ds.window_transform(window) if window is not None else ds.transform
+            if t.b or t.d:
+                raise ValueError(f"MNT {path.name} : raster tourné non pris en charge")
+            z = ds.read(1, window=window, masked=False)
+            return Dem(z, x0=t.c, y0=t.f, dx=t.a, dy=t.e, nodata=ds.nodata)
+
+    raise ValueError(f"Format de MNT non pris en charge : {path.name} (.npy, .tif)")
+
+
+# -----------------------------------------------------------
+# Géométrie de l'itinéraire
+# -----------------------------------------------------------
+
+def resample_route(points, speed=0.0, step=2.0):
+    """
+    Rééchantillonne la polyligne tous les `step` m (abscisse curviligne).
+
+    points : (N, 2) coordonnées projetées (m)
+    speed  : scalaire ou (N,) vitesse aux sommets (m/s)
+
+    Retourne (s, x, y, v).
+    """
+    points = np.asarray(points, dtype=float)
+    if points.ndim != 2 or points.shape[1] < 2 or len(points) < 2:
+        raise ValueError("Itinéraire : au moins 2 points (x, y) attendus")
+    if not np.isfinite(points[:, :2]).all():
+        raise ValueError("Itinéraire : coordonnées non finies")
+    if not step > 0:
+        raise ValueError(f"step doit être > 0 (reçu {step!r})")
+
+    xy = points[:, :2]
+    seg = np.hypot(*np.diff(xy, axis=0).T)
+    keep = np.r_[True, seg > 0]                     # points répétés (GPS à l'arrêt)
+    xy, seg = xy[keep], seg[seg > 0]
+    if len(xy) < 2:
+        raise ValueError("Itinéraire de longueur nulle")
+
+    speed = np.broadcast_to(np.asarray(speed, dtype=float), (len(points),))[keep]
+    vertex_s = np.r_[0.0, np.cumsum(seg)]
+    s = np.r_[np.arange(0.0, vertex_s[-1], step), vertex_s[-1]]
+
+    return (s, np.interp(s, vertex_s, xy[:, 0]), np.interp(s, vertex_s, xy[:, 1]),
+            np.interp(s, vertex_s, speed))
+
+
+def turn_radii(x, y, span=1):
+    """
+    Rayon du cercle passant par les points i - span, i, i + span :
+
+        R = a·b·c / (2 |(B - A) × (C - A)|)
+
+    0 en ligne droite (et aux extrémités, faute de voisins).
+    """
+    n = len(x)
+    radius = np.zeros(n)
+    if n < 2 * span + 1:
+        return radius
+
+    ax, ay = x[:-2 * span], y[:-2 * span]
+    bx, by = x[span:-span], y[span:-span]
+    cx, cy = x[2 * span:], y[2 * span:]
+
+    a = np.hypot(bx - ax, by - ay)
+    b = np.hypot(cx - bx, cy - by)
+    c = np.hypot(cx - ax, cy - ay)
+    cross = np.abs((bx - ax) * (cy - ay) - (by - ay) * (cx - ax))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = np.where(cross > 1e-9 * a * c, a * b * c / (2.0 * cross), 0.0)
+    radius[span:-span] = r
+    return radius
+
+
+def route_environment(dem, s, x, y, v, wheelbase, track, radius_span=1):
+    """
+    Environnement en chaque point : pentes sous l'empreinte du tracteur
+    (empattement × voie), rayon de virage et accélération.
+
+    Retourne un dict de tableaux (ENV_KEYS + "z", "heading").
+    """
+    ux, uy = np.gradient(x, s), np.gradient(y, s)
+    norm = np.hypot(ux, uy)
+    ux, uy = ux / norm, uy / norm
+    lx, ly = -uy, ux                                # +Y = gauche
+
+    half_l, half_t = wheelbase / 2.0, track / 2.0
+    s_u = (dem.elevation(x + half_l * ux, y + half_l * uy)
+           - dem.elevation(x - half_l * ux, y - half_l * uy)) / wheelbase
+    s_l = (dem.elevation(x + half_t * lx, y + half_t * ly)
+           - dem.elevation(x - half_t * lx, y - half_t * ly)) / track
+
+    slope_long = -np.degrees(np.arctan(s_u))
+    slope_lat = np.degrees(np.arcsin(s_l / np.sqrt(1.0 + s_u ** 2 + s_l ** 2)))
+
+    return {
+        "z": dem.elevation(x, y),
+        "heading": np.degrees(np.arctan2(uy, ux)),
+        "slope_lat": slope_lat,
+        "slope_long": slope_long,
+        "speed": v,
+        "turn_radius": turn_radii(x, y, radius_span),
+        "accel_long": v * np.gradient(v, s) if len(s) > 1 else np.zeros_like(v),
+    }
+
+
+# -----------------------------------------------------------
+# ANALYSE D'ITINÉRAIRE
+# -----------------------------------------------------------
+
+def analyze_route(tractor, machine, loader, tires, options, points, dem,
+                  speed=0.0, step=2.0, segment_length=50.0, turn_span=5.0):
+    """
+    Entrées :
+        tractor, machine, loader, tires, options : comme solve()
+        points         : polyligne (N, 2), coordonnées du MNT (m)
+        dem            : Dem, ou chemin (.npy / .tif) ouvert par open_dem
+        speed          : vitesse (m/s), scalaire ou par sommet
+        step           : pas de rééchantillonnage (m)
+        segment_length : longueur des tronçons du profil de risque (m)
+        turn_span      : demi-corde du calcul du rayon de virage (m)
+
+    Sortie :
+        {
+            "length_m", "n_points",
+            "outside_dem": nombre de points hors MNT (statut non applicable),
+            "points":   colonnes par point (s, x, y, z, heading, ENV_KEYS,
+                        I_static_<mode>, I_dynamic_<mode>, status),
+            "segments": [{ "start_m", "end_m", "x", "y",
+                           "max_slope_lat", "max_slope_long",
+                           "min_turn_radius",
+                           "I_static_<mode>", "I_dynamic_<mode>",
+                           "critical_m", "status", "failed" }]
+        }
+
+    Lève ValueError si la configuration ou l'itinéraire est invalide.
+    """
+    if not segment_length > 0:
+        raise ValueError(f"segment_length doit être > 0 (reçu {segment_length!r})")
+
+    loader = resolve_loader(tractor, options)
+    cfg = compile_config(tractor, machine, loader, tires, options)
+    local = compute_local_CG(cfg)
+
+    s, x, y, v = resample_route(points, speed, step)
+    if not isinstance(dem, Dem):
+        margin = cfg.wheelbase + cfg.track_rear
+        dem = open_dem(dem, bounds=(x.min() - margin, y.min() - margin,
+                                    x.max() + margin, y.max() + margin))
+
+    env = route_environment(
+        dem, s, x, y, v, cfg.wheelbase, (cfg.track_front + cfg.track_rear) / 2.0,
+        radius_span=max(1, int(round(turn_span / step))),
+    )
+    valid = np.isfinite(env["slope_lat"]) & np.isfinite(env["slope_long"])
+    env_valid = {k: env[k][valid] for k in ("slope_lat", "slope_long", "speed",
+                                            "turn_radius", "accel_long")}
+
+    n, n_rules = len(s), len(cfg.profile.rules)
+    columns = {}
+    statuses = np.full((n_rules, n), STATUS_NA, dtype=np.int8)
+    failed = np.zeros((n_rules, n), dtype=bool)
+
+    for mode in MODES:
+        block = local[mode]
+        X, Y, Z = block["CG_local"]
+        cols, codes = evaluate_mode(cfg, block["mass_total"], X, Y, Z, env_valid)
+        statuses[:, valid] = np.maximum(statuses[:, valid], codes)
+        failed[:, valid] |= codes == STATUS_DANGER
+
+        for col in ("I_static", "I_dynamic"):
+            values = np.full(n, np.nan)
+            values[valid] = np.broadcast_to(cols[col], valid.sum())
+            columns[f"{col}_{mode}"] = values
+
+    worst = statuses.max(axis=0)
+    I_dynamic = np.fmin(columns["I_dynamic_transport"], columns["I_dynamic_work"])
+
+    # ----- Profil de risque par tronçons -----
+    seg_id = np.minimum(np.floor(s / segment_length), np.ceil(s[-1] / segment_length) - 1)
+    starts = np.flatnonzero(np.r_[True, seg_id[1:] != seg_id[:-1]])
+    ends = np.r_[starts[1:], n]
+
+    segments = []
+    for a, b in zip(starts, ends):
+        part = slice(a, b)
+        radius = env["turn_radius"][part]
+        critical = I_dynamic[part]
+        segments.append({
+            "start_m": float(s[a]),
+            "end_m": float(s[min(b, n - 1)]),
+            "x": float(x[a]),
+            "y": float(y[a]),
+            "max_slope_lat": _nan_stat(np.abs(env["slope_lat"][part]), np.max),
+            "max_slope_long": _nan_stat(np.abs(env["slope_long"][part]), np.max),
+            "min_turn_radius": float(radius[radius > 0].min()) if (radius > 0).any() else 0.0,
+            **{col: _nan_stat(values[part], np.min) for col, values in columns.items()},
+            "critical_m": float(s[a + np.nanargmin(critical)]) if np.isfinite(critical).any() else None,
+            "status": STATUS_LABELS.get(int(worst[part].max()), "—"),
+            "failed": [rule.name for r, rule in enumerate(cfg.profile.rules) if failed[r, part].any()],
+        })
+
+    return {
+        "length_m": float(s[-1]),
+        "n_points": n,
+        "outside_dem": int((~valid).sum()),
+        "points": {
+            "s": s.tolist(), "x": x.tolist(), "y": y.tolist(),
+            **{k: [None if not np.isfinite(val) else float(val) for val in env[k]] for k in env},
+            **{col: [None if not np.isfinite(val) else float(val) for val in values]
+               for col, values in columns.items()},
+            "status": [STATUS_LABELS.get(int(code), "—") for code in worst],
+        },
+        "segments": segments,
+    }
+
+
+def _nan_stat(values, func):
+    """func() sur les valeurs finies ; None si aucune."""
+    values = values[np.isfinite(values)]
+    return float(func(values)) if values.size else None
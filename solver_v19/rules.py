@@ -0,0 +1,443 @@
+"""
+rules.py — Moteur de règles de compatibilité (profils réglementaires)
+---------------------------------------------------------------------
+
+Les critères de compatibilité sont décrits par une TABLE de règles,
+chargée depuis un profil JSON (dossier rules/ du dépôt) :
+
+    {
+        "name": "maneko",
+        "description": "...",
+        "rules": [
+            {
+                "id":      "front_wheel_left_max",
+                "name":    "Charge roue avant gauche ≤ 40% charge total",
+                "metric":  "FL",                  (expression)
+                "limit":   "0.40 * total_mass",   (nombre ou expression)
+                "type":    "max",                 ("min" : valeur ≥ limite
+                                                   "max" : valeur ≤ limite)
+                "strict":  false,                 (true : l'égalité est un danger)
+                "warning": 0.90,                  (bande d'avertissement :
+                                                   limite × facteur ; null = aucune)
+                "source":  "..."                  (référence, documentaire)
+            },
+            ...
+        ]
+    }
+
+Expressions : nombres, grandeurs de METRICS, + - * /, abs(), min(), max().
+Elles sont analysées UNE fois (module ast, liste blanche de constructions)
+puis compilées :
+    - en fonctions qui acceptent des tableaux NumPy (evaluate, balayages)
+    - en UNE fonction Python pour tout le profil (check, un scénario :
+      c'est le chemin de solve(), appelé deux fois par simulation)
+
+Statuts : codes entiers compacts (STATUS_*). Une règle dont la valeur
+ou la limite est NaN (ex. PTAC inconnu) est "non applicable" (STATUS_NA).
+Le texte lisible (libellés ✅ / ⚠️ / ⛔) n'est produit qu'à la fin, par
+RuleProfile.render().
+"""
+
+import ast
+import json
+import operator
+import threading
+from pathlib import Path
+
+import numpy as np
+
+
+RULES_DIR = Path(__file__).resolve().parent.parent / "rules"
+DEFAULT_PROFILE = "maneko"
+
+STATUS_NA = -1
+STATUS_OK = 0
+STATUS_WARNING = 1
+STATUS_DANGER = 2
+
+STATUS_LABELS = {
+    STATUS_OK: "✅ OK",
+    STATUS_WARNING: "⚠️ Avertissement",
+    STATUS_DANGER: "⛔ Danger",
+}
+
+# Grandeurs disponibles dans les expressions
+METRICS = (
+    "FL", "FR", "RL", "RR",
+    "I_lat", "I_long", "I_static",
+    "total_mass", "machine_mass", "tractor_mass", "ptac",
+)
+
+# Facteurs d'avertissement par défaut (cf. Rule._classify())
+DEFAULT_WARNING = {"min": 1.1, "max": 0.90}
+
+
+# -----------------------------------------------------------
+# Expressions
+# -----------------------------------------------------------
+
+def _has_array(args):
+    for a in args:
+        if isinstance(a, np.ndarray):
+            return True
+    return False
+
+
+def _minimum(*args):
+    if _has_array(args):
+        return np.minimum.reduce(np.broadcast_arrays(*args))
+    return min(args)
+
+
+def _maximum(*args):
+    if _has_array(args):
+        return np.maximum.reduce(np.broadcast_arrays(*args))
+    return max(args)
+
+
+def _abs(x):
+    return np.abs(x) if isinstance(x, np.ndarray) else abs(x)
+
+
+_BINARY = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+}
+
+_UNARY = {
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+
+_FUNCTIONS = {
+    "abs": _abs,
+    "min": _minimum,
+    "max": _maximum,
+}
+
+
+def compile_expression(source, names=METRICS):
+    """
+    Compile une expression de règle en fonction f(metrics).
+
+    source : chaîne (ex. "(FL + FR) / total_mass") ou nombre
+    Lève ValueError pour toute construction non autorisée.
+    """
+    if isinstance(source, (int, float)) and not isinstance(source, bool):
+        return lambda metrics: source
+
+    if not isinstance(source, str):
+        raise ValueError(f"Expression invalide : {source!r}")
+
+    try:
+        tree = ast.parse(source, mode="eval")
+    except SyntaxError:
+        raise ValueError(f"Expression invalide : {source!r}")
+
+    def build(node):
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) \
+                and not isinstance(node.value, bool):
+            value = node.value
+            return lambda metrics: value
+
+        if isinstance(node, ast.Name):
+            if node.id not in names:
+                raise ValueError(f"Grandeur inconnue '{node.id}' dans {source!r}")
+            return operator.itemgetter(node.id)
+
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+            op, left, right = _BINARY[type(node.op)], build(node.left), build(node.right)
+            if isinstance(node.left, ast.Constant):
+                value = node.left.value
+                return lambda metrics: op(value, right(metrics))
+            if isinstance(node.right, ast.Constant):
+                value = node.right.value
+                return lambda metrics: op(left(metrics), value)
+            return lambda metrics: op(left(metrics), right(metrics))
+
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY:
+            op, operand = _UNARY[type(node.op)], build(node.operand)
+            return lambda metrics: op(operand(metrics))
+
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) \
+                and node.func.id in _FUNCTIONS and node.args and not node.keywords:
+            func, args = _FUNCTIONS[node.func.id], [build(a) for a in node.args]
+            return lambda metrics: func(*(a(metrics) for a in args))
+
+        raise ValueError(f"Construction non autorisée dans {source!r}")
+
+    return build(tree.body)
+
+
+def expression_source(source):
+    """Source Python normalisée d'une expression (validée par compile_expression)."""
+    compile_expression(source)
+    if isinstance(source, str):
+        return ast.unparse(ast.parse(source, mode="eval"))
+    return repr(source)
+
+
+def _compile_scalar_check(name, rules):
+    """
+    Génère la fonction check(metrics) -> [(valeur, limite, statut), ...]
+    d'un profil, pour des grandeurs scalaires. Les expressions ont été
+    validées par compile_expression() (liste blanche).
+    """
+    used = set()
+    for rule in rules:
+        for source in (rule.metric, rule.limit):
+            if isinstance(source, str):
+                used.update(n.id for n in ast.walk(ast.parse(source, mode="eval"))
+                            if isinstance(n, ast.Name) and n.id in METRICS)
+
+    lines = ["def check(metrics):", "    out = []"]
+    lines += [f"    {n} = metrics[{n!r}]" for n in sorted(used)]
+
+    for rule in rules:
+        below = rule.type == "min"
+        danger = ("<=" if rule.strict else "<") if below else (">=" if rule.strict else ">")
+        lines += [
+            f"    v = {expression_source(rule.metric)}",
+            f"    l = {expression_source(rule.limit)}",
+            f"    if v != v or l != l:",
+            f"        s = {STATUS_NA}",
+            f"    elif v {danger} l:",
+            f"        s = {STATUS_DANGER}",
+        ]
+        if rule.warning is not None:
+            lines += [
+                f"    elif v {'<' if below else '>'} l * {float(rule.warning)!r}:",
+                f"        s = {STATUS_WARNING}",
+            ]
+        lines += [
+            f"    else:",
+            f"        s = {STATUS_OK}",
+            f"    out.append((v, l, s))",
+        ]
+    lines.append("    return out")
+
+    namespace = {"__builtins__": {}, "min": min, "max": max, "abs": abs}
+    exec(compile("\n".join(lines), f"<profil {name}>", "exec"), namespace)
+    return namespace["check"]
+
+
+# -----------------------------------------------------------
+# Règle
+# -----------------------------------------------------------
+
+class Rule:
+    """Une ligne de la table : grandeur, limite, sens, bande d'avertissement."""
+
+    __slots__ = ("id", "name", "metric", "limit", "type", "strict", "warning",
+                 "_value", "_limit")
+
+    def __init__(self, spec: dict):
+        try:
+            self.id = spec["id"]
+            self.name = spec.get("name", spec["id"])
+            self.metric = spec["metric"]
+            self.limit = spec["limit"]
+            self.type = spec.get("type", "min")
+        except (KeyError, TypeError):
+            raise ValueError(f"Règle incomplète : {spec!r}")
+
+        if self.type not in DEFAULT_WARNING:
+            raise ValueError(f"Règle '{self.id}' : type 'min' ou 'max' attendu")
+
+        self.strict = bool(spec.get("strict", False))
+        self.warning = spec.get("warning", DEFAULT_WARNING[self.type])
+        self._value = compile_expression(self.metric)
+        self._limit = compile_expression(self.limit)
+
+    def evaluate(self, metrics):
+        """Retourne (valeur, limite, statut) — scalaires ou tableaux."""
+        value = self._value(metrics)
+        limit = self._limit(metrics)
+
+        if isinstance(value, np.ndarray) or isinstance(limit, np.ndarray):
+            return value, limit, self._classify_array(value, limit)
+        return value, limit, self._classify(value, limit)
+
+    def _classify(self, value, limit):
+        """Version scalaire (cf. DEFAULT_WARNING)."""
+        if value != value or limit != limit:
+            return STATUS_NA
+
+        if self.type == "min":
+            if value < limit or (self.strict and value == limit):
+                return STATUS_DANGER
+            if self.warning is not None and value < limit * self.warning:
+                return STATUS_WARNING
+            return STATUS_OK
+
+        if value > limit or (self.strict and value == limit):
+            return STATUS_DANGER
+        if self.warning is not None and value > limit * self.warning:
+            return STATUS_WARNING
+        return STATUS_OK
+
+    def _classify_array(self, value, limit):
+        """Version vectorisée : tableau int8 de codes STATUS_*."""
+        value = np.asarray(value, dtype=float)
+        limit = np.asarray(limit, dtype=float)
+
+        if self.type == "min":
+            danger = value <= limit if self.strict else value < limit
+            warn = value < limit * self.warning if self.warning is not None else False
+        else:
+            danger = value >= limit if self.strict else value > limit
+            warn = value > limit * self.warning if self.warning is not None else False
+
+        status = np.where(danger, STATUS_DANGER, np.where(warn, STATUS_WARNING, STATUS_OK))
+        status = np.where(np.isnan(value) | np.isnan(limit), STATUS_NA, status)
+        return status.astype(np.int8)
+
+    def margin(self, value, limit):
+        """Marge avant la limite (> 0 : critère respecté), dans l'unité de la grandeur."""
+        return value - limit if self.type == "min" else limit - value
+
+    def __repr__(self):
+        return f"Rule({self.id!r}: {self.metric} {self.type} {self.limit})"
+
+
+# -----------------------------------------------------------
+# Profil (table de règles)
+# -----------------------------------------------------------
+
+class RuleProfile:
+    """Table de règles compilée (cf. en-tête du module)."""
+
+    def __init__(self, spec: dict):
+        self.name = spec.get("name", "?")
+        self.description = spec.get("description", "")
+        rules = spec.get("rules")
+        if not isinstance(rules, list) or not rules:
+            raise ValueError(f"Profil '{self.name}' : liste 'rules' vide ou absente")
+        self.rules = tuple(Rule(r) for r in rules)
+        self.ids = tuple(r.id for r in self.rules)
+        if len(set(self.ids)) != len(self.ids):
+            raise ValueError(f"Profil '{self.name}' : identifiants de règles en double")
+        self._check = _compile_scalar_check(self.name, self.rules)
+
+    def evaluate(self, metrics):
+        """
+        Évalue toutes les règles.
+
+        metrics : {grandeur: scalaire ou tableau} (cf. METRICS ;
+                  ptac = NaN si inconnu)
+
+        Retourne, une entrée par règle (ordre du profil) :
+            {"value": [...], "limit": [...], "margin": [...], "status": [...]}
+        """
+        out = {"value": [], "limit": [], "margin": [], "status": []}
+        for rule in self.rules:
+            value, limit, status = rule.evaluate(metrics)
+            out["value"].append(value)
+            out["limit"].append(limit)
+            out["margin"].append(rule.margin(value, limit))
+            out["status"].append(status)
+        return out
+
+    def status_codes(self, metrics):
+        """Codes de statut empilés : tableau int8 (n_règles, *forme)."""
+        statuses = self.evaluate(metrics)["status"]
+        return np.stack(np.broadcast_arrays(*statuses)).astype(np.int8)
+
+    def worst_status(self, metrics):
+        """Pire statut (règles non applicables ignorées) : tableau int8."""
+        return self.status_codes(metrics).max(axis=0)
+
+    def render(self, evaluation):
+        """
+        Rendu lisible d'une évaluation SCALAIRE (bord de la chaîne) :
+        liste de {"name", "value", "limit", "status"} ; les règles non
+        applicables sont omises.
+        """
+        results = []
+        for rule, value, limit, status in zip(self.rules, evaluation["value"],
+                                              evaluation["limit"], evaluation["status"]):
+            if status == STATUS_NA:
+                continue
+            results.append({
+                "name": rule.name,
+                "value": value,
+                "limit": limit,
+                "status": STATUS_LABELS[int(status)],
+            })
+        return results
+
+    def check(self, metrics):
+        """
+        evaluate() + render() pour UN scénario (grandeurs scalaires),
+        via la fonction compilée du profil.
+        """
+        results = []
+        for rule, (value, limit, status) in zip(self.rules, self._check(metrics)):
+            if status == STATUS_NA:
+                continue
+            results.append({
+                "name": rule.name,
+                "value": value,
+                "limit": limit,
+                "status": STATUS_LABELS[status],
+            })
+        return results
+
+    def __repr__(self):
+        return f"RuleProfile({self.name!r}, {len(self.rules)} règles)"
+
+
+# -----------------------------------------------------------
+# Chargement des profils (mis en cache)
+# -----------------------------------------------------------
+
+# Profils de rules/ uniquement : le cache est borné par le contenu du
+# dossier (les fichiers désignés par un chemin ne sont pas mis en cache)
+_profiles = {}
+_profiles_lock = threading.Lock()
+
+
+def available_profiles():
+    """Noms des profils du dossier rules/."""
+    return sorted(p.stem for p in RULES_DIR.glob("*.json"))
+
+
+def _read_profile(path):
+    with open(path, encoding="utf-8") as f:
+        return RuleProfile(json.load(f))
+
+
+def load_profile(name=None):
+    """
+    Profil compilé.
+
+    name : nom d'un profil de rules/ (défaut : DEFAULT_PROFILE, mis en
+           cache), RuleProfile déjà compilé, ou — pour les appels en
+           bibliothèque uniquement — chemin vers un fichier JSON (relu à
+           chaque appel). L'API n'accepte que les noms de
+           available_profiles().
+    """
+    if isinstance(name, RuleProfile):
+        return name
+    name = name or DEFAULT_PROFILE
+
+    profile = _profiles.get(name)
+    if profile is not None:
+        return profile
+
+    if str(name).endswith(".json"):
+        path = Path(name)
+        if not path.is_file():
+            raise ValueError(f"Profil de règles introuvable : {name!r}")
+        return _read_profile(path)
+
+    if name not in available_profiles():
+        raise ValueError(f"Profil de règles inconnu : {name!r} "
+                         f"(disponibles : {', '.join(available_profiles())})")
+    profile = _read_profile(RULES_DIR / f"{name}.json")
+
+    with _profiles_lock:
+        _profiles[name] = profile
+    return profile
@@ -0,0 +1,296 @@
+"""
+scalar.py — Noyau scalaire (flottants Python) pour un scénario unique
+---------------------------------------------------------------------
+
+Pour UN seul scénario (rerun Streamlit, requête /simulate), le coût de
+NumPy (création d'un np.array par élément de masse, produit matriciel
+R_long @ R_lat, opérations sur des np.float64) dépasse largement celui
+de l'arithmétique elle-même.
+
+Ce module calcule les MÊMES grandeurs avec des flottants Python :
+
+    éléments de masse     → tractor_element, machine_element,
+                            loader_element, extra_element
+    CG local              → compute_local_CG_scalar
+    rotation (pente)      → rotate_CG_scalar (matrice en forme close)
+    stabilité statique    → compute_static_stability_scalar
+
+Les étapes dynamique, roues et compatibilité travaillent déjà sur des
+flottants : elles sont réutilisées telles quelles.
+
+Chaque formule reprend EXACTEMENT l'ordre des opérations du chemin NumPy
+(cg.py, loader.py, geometry.py, static_pfs.py) : les résultats sont
+identiques au bit près. Les vecteurs (CG_local, CG_rotated, CG_ground)
+sont des tuples au lieu de tableaux NumPy.
+"""
+
+import math
+
+from .cg import machine_pose
+from .dynamic_pfd import compute_dynamic_stability
+from .loader import lift_coefficients
+from .static_pfs import distances_pure, static_indices, risk_direction
+from .wheels import compute_wheel_loads
+
+
+g = 9.81
+
+
+# -----------------------------------------------------------
+# Éléments de masse (m, (x, y, z))
+# -----------------------------------------------------------
+
+def tractor_element(tractor: dict, tires: dict, options: dict):
+    """Version scalaire de cg.tractor_CG()."""
+    m = float(tractor["mass"])
+    pct_front = tractor.get("mass_front_pct", 50) / 100.0
+    wheelbase = tractor["geometry"]["wheelbase"]
+
+    X = (pct_front * wheelbase) - (wheelbase / 2.0)
+
+    Z = 1.0
+    rear_tire_name = options.get("rear_tire")
+    if rear_tire_name and rear_tire_name in tires:
+        diam_mm = tires[rear_tire_name].get("diameter_mm", 0)
+        if diam_mm > 0:
+            Z = (diam_mm / 2000.0) * 1.30
+    if Z == 1.0 and "cg_height_nominal" in tractor:
+        Z = float(tractor["cg_height_nominal"])
+
+    return m, (float(X), 0.0, float(Z))
+
+
+def machine_element(machine: dict, tractor: dict, tires: dict, options: dict, mode: str):
+    """Version scalaire de cg.machine_CG() : x = -L/2 - R - x_rel."""
+    cg_rel = machine_pose(machine, mode)
+    wheelbase = tractor["geometry"]["wheelbase"]
+    R = tires[options["rear_tire"]]["diameter_mm"] / 2000.0
+
+    x = -wheelbase / 2.0 - R - float(cg_rel["x_rel"])
+    return float(machine["mass"]), (float(x), float(cg_rel["y_rel"]), float(cg_rel["z_rel"]))
+
+
+def loader_element(loader_json: dict, tractor: dict, tires: dict, options: dict):
+    """Version scalaire de loader.loader_CG() (bras + chargeur)."""
+    mass_loader = float(loader_json.get("mass_loader", 0.0))
+    mass_arms = float(loader_json.get("mass_arms", 0.0))
+    rules_x = loader_json["rules"]["x"]
+    rules_z = loader_json["rules"]["z"]
+
+    RAR = (tires[options.get("rear_tire")]["diameter_mm"] / 1000.0) / 2.0
+    wheelbase = float(tractor["geometry"]["wheelbase"])
+
+    X_arms = rules_x["arms"] * wheelbase
+    Z_arms = RAR + rules_z["arms"]
+
+    kx, kz = lift_coefficients(rules_x, rules_z, options)
+    X_loader = kx * wheelbase
+    Z_loader = RAR + kz * mass_loader
+
+    payload = float(options.get("loader_payload") or 0.0)
+    mass_front = mass_loader + payload
+    mass_total = mass_arms + mass_loader + payload
+    return mass_total, (
+        (mass_arms * X_arms + mass_front * X_loader) / mass_total,
+        (mass_arms * 0.0 + mass_front * 0.0) / mass_total,
+        (mass_arms * Z_arms + mass_front * Z_loader) / mass_total,
+    )
+
+
+def extra_element(options: dict, tractor: dict, tires: dict):
+    """
+    Version scalaire de cg.extra_masses_CG(), masses regroupées :
+    retourne (m_extra, CG) ou None si aucune masse additionnelle.
+    """
+    geometry = tractor["geometry"]
+    wheelbase = float(geometry["wheelbase"])
+    track_rear = float(geometry["track_rear"])
+    R = (tires[options["rear_tire"]]["diameter_mm"] / 1000.0) / 2.0
+
+    masses = []
+
+    m_ARG = options.get("wheel_weight_ARG", 0)
+    if m_ARG is not None and m_ARG > 0:
+        masses.append((m_ARG, -wheelbase / 2.0, +track_rear / 2.0, R))
+
+    m_ARD = options.get("wheel_weight_ARD", 0)
+    if m_ARD is not None and m_ARD > 0:
+        masses.append((m_ARD, -wheelbase / 2.0, -track_rear / 2.0, R))
+
+    if options.get("water_ballast", False):
+        M_one = 0.754875 * tires[options["rear_tire"]]["volume_l"]
+        masses.append((M_one, -wheelbase / 2.0, +track_rear / 2.0, R * 0.3))
+        masses.append((M_one, -wheelbase / 2.0, -track_rear / 2.0, R * 0.3))
+
+    rear_mass = options.get("rear_ballast_mass", 0)
+    if rear_mass > 0:
+        rear_offset = options.get("rear_ballast_offset", 0.0)
+        masses.append((rear_mass, -wheelbase / 2.0 - rear_offset, 0.0, 0.8))
+
+    front_mass = options.get("front_ballast_mass", 0)
+    if front_mass > 0:
+        front_offset = options.get("front_ballast_offset", 0.0)
+        masses.append((front_mass, +wheelbase / 2.0 + front_offset, 0.0, 0.8))
+
+    MT = 0.0
+    SX = SY = SZ = 0.0
+    for m, x, y, z in masses:
+        MT += m
+        SX += m * x
+        SY += m * y
+        SZ += m * z
+
+    if not MT > 0:
+        return None
+    return float(MT), (SX / MT, SY / MT, SZ / MT)
+
+
+# -----------------------------------------------------------
+# CG local et rotation
+# -----------------------------------------------------------
+
+def compute_local_CG_scalar(cfg):
+    """Version scalaire de cg.compute_local_CG()."""
+    results = {}
+
+    for mode in cfg.cases:
+        MT = 0.0
+        SX = SY = SZ = 0.0
+
+        for m, (x, y, z) in cfg.elements[mode]:
+            if m > 0:
+                MT += m
+                SX += m * x
+                SY += m * y
+                SZ += m * z
+
+        results[mode] = {
+            "mass_total": MT,
+            "CG_local": (SX / MT, SY / MT, SZ / MT)
+        }
+
+    return results
+
+
+def rotation_entries(slope_lat_deg, slope_long_deg):
+    """
+    Coefficients de geometry.rotation_matrix() en forme close
+    (R = R_long @ R_lat), ligne par ligne.
+    """
+    th_lat = slope_lat_deg * math.pi / 180.0
+    th_long = slope_long_deg * math.pi / 180.0
+
+    c_la, s_la = math.cos(th_lat), math.sin(th_lat)
+    c_lo, s_lo = math.cos(th_long), math.sin(th_long)
+
+    return (
+        (c_lo,  s_lo * s_la, s_lo * c_la),
+        (0.0,   c_la,        -s_la),
+        (-s_lo, c_lo * s_la, c_lo * c_la),
+    )
+
+
+def rotate_CG_scalar(local_data, slope_lat, slope_long):
+    """Version scalaire de cg.rotate_CG() (rotation + projection au sol)."""
+    (r00, r01, r02), (r10, r11, r12), (r20, r21, r22) = rotation_entries(slope_lat, slope_long)
+
+    results = {}
+
+    for mode, block in local_data.items():
+        x, y, z = block["CG_local"]
+        CG_rot = (
+            r00 * x + r01 * y + r02 * z,
+            r10 * x + r11 * y + r12 * z,
+            r20 * x + r21 * y + r22 * z,
+        )
+
+        results[mode] = {
+            "mass_total": block["mass_total"],
+            "CG_local": block["CG_local"],
+            "CG_rotated": CG_rot,
+            "CG_ground": CG_rot[:2]
+        }
+
+    return results
+
+
+# -----------------------------------------------------------
+# Stabilité statique
+# -----------------------------------------------------------
+
+def compute_static_stability_scalar(cfg, CG_data, slope_lat, slope_long):
+    """Version scalaire de static_pfs.compute_static_stability()."""
+    track_rear, wheelbase = cfg.track_rear, cfg.wheelbase
+
+    # np.radians(x) = x * (π / 180)
+    th_lat = slope_lat * (math.pi / 180.0)
+    th_long = slope_long * (math.pi / 180.0)
+    sin_lat, cos_lat = math.sin(th_lat), math.cos(th_lat)
+    sin_long, cos_long = math.sin(th_long), math.cos(th_long)
+
+    results = {}
+
+    for mode, block in CG_data.items():
+        MT = block["mass_total"]
+        CG_ground = block["CG_ground"]
+        XG_ground, YG_ground = CG_ground
+        ZG = block["CG_rotated"][2]
+
+        d_lat, d_long = distances_pure(CG_ground, track_rear, wheelbase)
+        I_lat, I_long, I_static = static_indices(
+            XG_ground, YG_ground, ZG, track_rear, wheelbase
+        )
+
+        results[mode] = {
+            "I_lat":    I_lat,
+            "I_long":   I_long,
+            "I_static": I_static,
+
+            "distances": {
+                "lat_pure":  d_lat,
+                "long_pure": d_long,
+            },
+
+            "moments": {
+                "M_roll":       MT * g * ZG * sin_lat,
+                "M_rest_roll":  MT * g * (track_rear / 2.0) * cos_lat,
+                "M_pitch":      MT * g * ZG * sin_long,
+                "M_rest_pitch": MT * g * (wheelbase / 2.0) * cos_long
+            },
+
+            "risk_direction": risk_direction(CG_ground)
+        }
+
+    return results
+
+
+# -----------------------------------------------------------
+# Chaîne complète (un scénario)
+# -----------------------------------------------------------
+
+def run_scalar(cfg, env):
+    """
+    Enchaîne toutes les étapes pour une configuration compilée avec
+    kernel="scalar" (cf. compiled.compile_config).
+
+    Retourne les blocs CG, static, dynamic, wheels (même structure que
+    solve() ; les critères de compatibilité sont ajoutés par l'appelant).
+    """
+    slope_lat = env.get("slope_lat", 0)
+    slope_long = env.get("slope_long", 0)
+
+    CG_data = rotate_CG_scalar(compute_local_CG_scalar(cfg), slope_lat, slope_long)
+    static = compute_static_stability_scalar(cfg, CG_data, slope_lat, slope_long)
+    wheels = compute_wheel_loads(cfg, CG_data)
+    dynamic = compute_dynamic_stability(cfg, CG_data, static,
+                                        speed=env.get("speed", 0),
+                                        turn_radius=env.get("turn_radius", 0),
+                                        accel_long=env.get("accel_long", 0))
+
+    return {
+        "cases": list(cfg.cases),
+        "CG": CG_data,
+        "static": static,
+        "dynamic": dynamic,
+        "wheels": wheels
+    }
@@ -0,0 +1,307 @@
+"""
+snapshot.py — Instantané binaire du catalogue (démarrage rapide)
+----------------------------------------------------------------
+
+L'API et l'interface relisaient tous les JSON du catalogue (tractors/,
+machines/, data/tires.json) à chaque démarrage / rafraîchissement.
+write_snapshot() compile le catalogue en UN fichier versionné, lisible
+par projection mémoire (np.memmap) :
+
+    MAGIC (8 octets) | longueur de l'en-tête (uint64) | en-tête JSON
+    | blocs de données alignés sur ALIGN octets
+
+En-tête :
+    format    FORMAT (un changement de format rend l'instantané périmé)
+    sources   {chemin relatif: [taille, mtime_ns]} des fichiers sources,
+              + "code" : empreinte du code qui compile l'instantané
+    index     clés (noms de fichier) des tracteurs, machines, pneus
+    labels    noms affichés (tracteur "name", machine "model")
+    lists     listes de sweep.compile_catalog (clés, chargeur de série)
+    arrays    {nom: {dtype, shape, offset}} : tableaux en colonnes de
+              sweep.compile_catalog + documents JSON (octets + offsets)
+
+load_catalog() renvoie un Catalog lu depuis l'instantané s'il est à jour
+(mêmes sources, même code, même format), sinon relu depuis les JSON — et
+l'instantané est alors réécrit. Les documents JSON ne sont décodés qu'à
+la première lecture de chaque entrée.
+
+Compilation manuelle :
+    python -m solver_v19.snapshot
+"""
+
+import hashlib
+import json
+import os
+import struct
+import warnings
+from collections.abc import Mapping
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from .loader_registry import LoaderRegistry
+from .sweep import compile_catalog
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SNAPSHOT_PATH = ROOT / "data" / "catalog.snapshot"
+
+MAGIC = b"MKCATSNP"
+FORMAT = 1
+ALIGN = 64
+
+SOURCE_DIRS = ("tractors", "machines", "loaders")
+SOURCE_FILES = ("data/tires.json",)
+
+# Modules dont dépend le contenu de l'instantané (compile_catalog et
+# sélection du chargeur de série)
+CODE_SOURCES = ("solver_v19/snapshot.py", "solver_v19/sweep.py",
+                "solver_v19/solver.py", "solver_v19/loader_registry.py")
+
+GROUPS = ("tractors", "machines", "tires")
+
+
+@lru_cache(maxsize=1)
+def code_version():
+    """Empreinte des CODE_SOURCES (calculée une fois par processus)."""
+    h = hashlib.blake2b(digest_size=16)
+    for name in CODE_SOURCES:
+        h.update(name.encode("utf-8"))
+        h.update(b"\0")
+        h.update((ROOT / name).read_bytes())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def source_signature(root=ROOT):
+    """
+    {chemin relatif: [taille, mtime_ns]} des fichiers sources du catalogue
+    (os.scandir : ~1 ms pour tout le catalogue, bien moins que Path.glob),
+    + "code" : code_version().
+    """
+    root = Path(root)
+    signature = {"code": code_version()}
+    for directory in SOURCE_DIRS:
+        with os.scandir(root / directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(".json") and entry.is_file():
+                    stat = entry.stat()
+                    signature[f"{directory}/{entry.name}"] = [stat.st_size, stat.st_mtime_ns]
+    for name in SOURCE_FILES:
+        stat = (root / name).stat()
+        signature[name] = [stat.st_size, stat.st_mtime_ns]
+    return dict(sorted(signature.items()))
+
+
+# -----------------------------------------------------------
+# Documents JSON décodés à la demande
+# -----------------------------------------------------------
+
+class _Documents(Mapping):
+    """{clé: JSON} décodé à la première lecture depuis un bloc d'octets."""
+
+    def __init__(self, keys, blob, offsets):
+        self._position = {k: i for i, k in enumerate(keys)}
+        self._blob = blob
+        self._offsets = offsets
+        self._decoded = {}
+
+    def __getitem__(self, key):
+        if key not in self._decoded:
+            i = self._position[key]
+            raw = self._blob[self._offsets[i]:self._offsets[i + 1]]
+            self._decoded[key] = json.loads(raw.tobytes())
+        return self._decoded[key]
+
+    def __iter__(self):
+        return iter(self._position)
+
+    def __len__(self):
+        return len(self._position)
+
+    def __contains__(self, key):
+        return key in self._position
+
+
+# -----------------------------------------------------------
+# Catalogue
+# -----------------------------------------------------------
+
+class Catalog:
+    """
+    Catalogue chargé depuis l'instantané ou les JSON.
+
+    tractors, machines, tires : {clé: JSON} (lecture seule)
+    labels   : {"tractors": {clé: nom}, "machines": {clé: modèle}}
+    compiled : tableaux de sweep.compile_catalog (calculés à la demande
+               pour une lecture JSON)
+    source   : "snapshot" ou "json"
+    """
+
+    def __init__(self, tractors, machines, tires, labels, sources, source,
+                 compiled=None, loaders=None):
+        self.tractors = tractors
+        self.machines = machines
+        self.tires = tires
+        self.labels = labels
+        self.sources = sources
+        self.source = source
+        self._compiled = compiled
+        self._loaders = loaders
+
+    @property
+    def compiled(self):
+        if self._compiled is None:
+            self._compiled = compile_catalog(dict(self.tractors), dict(self.machines),
+                                             dict(self.tires), self._loaders)
+        return self._compiled
+
+    @classmethod
+    def from_json(cls, root=ROOT):
+        """Lecture directe des fichiers JSON du dépôt."""
+        root = Path(root)
+        sources = source_signature(root)
+
+        def load(path):
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+
+        tractors = {p.stem: load(p) for p in sorted((root / "tractors").glob("*.json"))}
+        machines = {p.stem: load(p) for p in sorted((root / "machines").glob("*.json"))}
+        tires = load(root / "data" / "tires.json")
+        return cls(tractors, machines, tires, _labels(tractors, machines), sources, "json",
+                   loaders=LoaderRegistry.from_directory(root / "loaders").loaders)
+
+
+def _labels(tractors, machines):
+    return {
+        "tractors": {k: t.get("name", k) for k, t in tractors.items()},
+        "machines": {k: m.get("model", k) for k, m in machines.items()},
+    }
+
+
+# -----------------------------------------------------------
+# Écriture / lecture
+# -----------------------------------------------------------
+
+def _pad(n):
+    return (-n) % ALIGN
+
+
+def write_snapshot(catalog, path=SNAPSHOT_PATH):
+    """Écrit l'instantané de `catalog` (écriture atomique)."""
+    path = Path(path)
+    blocks = {}
+    for group in GROUPS:
+        docs = [json.dumps(doc, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                for doc in getattr(catalog, group).values()]
+        blocks[f"doc_{group}"] = np.frombuffer(b"".join(docs), dtype=np.uint8)
+        blocks[f"doc_{group}_offsets"] = np.concatenate(
+            [[0], np.cumsum([len(d) for d in docs])]).astype(np.int64)
+
+    lists = {}
+    for name, values in catalog.compiled.items():
+        if isinstance(values, np.ndarray):
+            blocks[f"compiled_{name}"] = np.ascontiguousarray(values)
+        else:
+            lists[name] = list(values)
+
+    arrays = {}
+    offset = 0
+    for name, values in blocks.items():
+        arrays[name] = {"dtype": values.dtype.str, "shape": list(values.shape), "offset": offset}
+        offset += values.nbytes + _pad(values.nbytes)
+
+    header = json.dumps({
+        "format": FORMAT,
+        "sources": catalog.sources,
+        "index": {group: list(getattr(catalog, group)) for group in GROUPS},
+        "labels": catalog.labels,
+        "lists": lists,
+        "arrays": arrays,
+    }, ensure_ascii=False).encode("utf-8")
+    start = len(MAGIC) + 8 + len(header)
+    header += b" " * _pad(start)
+
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        for values in blocks.values():
+            f.write(values.tobytes())
+            f.write(b"\0" * _pad(values.nbytes))
+    os.replace(tmp, path)
+    return path
+
+
+def read_snapshot(path=SNAPSHOT_PATH):
+    """
+    Catalog projeté en mémoire depuis l'instantané.
+    Lève ValueError si le fichier n'est pas un instantané de ce format.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} : pas un instantané de catalogue")
+        (size,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(size))
+    if header.get("format") != FORMAT:
+        raise ValueError(f"{path} : format {header.get('format')!r} (attendu {FORMAT})")
+
+    data = len(MAGIC) + 8 + size
+    buffer = np.memmap(path, dtype=np.uint8, mode="r")
+
+    def array(name):
+        spec = header["arrays"][name]
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        start = data + spec["offset"]
+        return buffer[start:start + count * dtype.itemsize].view(dtype).reshape(spec["shape"])
+
+    documents = {
+        group: _Documents(header["index"][group], array(f"doc_{group}"),
+                          array(f"doc_{group}_offsets"))
+        for group in GROUPS
+    }
+    compiled = dict(header["lists"])
+    for name in header["arrays"]:
+        if name.startswith("compiled_"):
+            compiled[name[len("compiled_"):]] = array(name)
+
+    return Catalog(documents["tractors"], documents["machines"], documents["tires"],
+                   header["labels"], header["sources"], "snapshot", compiled=compiled)
+
+
+def load_catalog(root=ROOT, path=None, write=True):
+    """
+    Catalogue depuis l'instantané s'il est à jour, sinon depuis les JSON
+    (instantané réécrit si write=True ; une erreur d'écriture donne un
+    avertissement).
+    """
+    root = Path(root)
+    path = Path(path) if path is not None else root / SNAPSHOT_PATH.relative_to(ROOT)
+
+    try:
+        catalog = read_snapshot(path)
+        if catalog.sources == source_signature(root):
+            return catalog
+    except (OSError, ValueError, KeyError):
+        pass
+
+    catalog = Catalog.from_json(root)
+    if write:
+        try:
+            write_snapshot(catalog, path)
+        except OSError as e:
+            warnings.warn(f"Instantané du catalogue non écrit ({path}) : {e}",
+                          RuntimeWarning, stacklevel=2)
+    return catalog
+
+
+if __name__ == "__main__":
+    catalog = Catalog.from_json()
+    print(f"Instantané écrit : {write_snapshot(catalog)} "
+          f"({len(catalog.tractors)} tracteurs, {len(catalog.machines)} machines, "
+          f"{len(catalog.tires)} pneus)")
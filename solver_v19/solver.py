@@ -4,193 +4,154 @@ solver.py — Orchestration complète du solver V12
 
 Pipeline de calcul :
 
-    CG_data = compute_global_CG(...)
+    cfg     = compile_config(...)
+    CG_data = compute_local_CG(...) + rotate_CG(...)
     static  = compute_static_stability(...)
     dynamic = compute_dynamic_stability(...)
     wheels  = compute_wheel_loads(...)
 
 Retourne une structure finale compacte et complète.
 
+Deux noyaux de calcul, mêmes résultats au bit près :
+    "scalar" : flottants Python (scalar.py), un scénario
+    "numpy"  : étapes NumPy, cas de charge empilés (stacked.py)
+Par défaut (kernel="auto"), solve() passe par le pipeline mémoïsé du
+noyau scalaire (pipeline.py) : un rerun qui ne change que la pente ou
+la vitesse ne recalcule que les étapes en aval.
+Pour de nombreux scénarios à la fois : batch.solve_batch().
+
+La configuration (tracteur, machine, chargeur, pneu, options) est
+d'abord compilée une fois (compiled.compile_config) puis consommée
+par toutes les étapes.
+
 Tout est séparé dans des modules propres :
+    pipeline.py
+    scalar.py
+    compiled.py
     cg.py
     static_pfs.py
     dynamic_pfd.py
     wheels.py
 """
-import json
-import numpy as np
+import logging
+
+from .compiled import compile_config
+from .compatibility import compute_compatibility
+from .pipeline import Pipeline, attach_compatibility
+from .loader_registry import default_registry
+from .scalar import run_scalar
+
+log = logging.getLogger(__name__)
 
-from .cg import compute_global_CG
-from .static_pfs import compute_static_stability
-from .dynamic_pfd import compute_dynamic_stability
-from .wheels import compute_wheel_loads
-from solver_v19.compatibility import check_compatibility
+# Pipelines partagés par tous les appels à solve() (caches par étape)
+DEFAULT_PIPELINE = Pipeline(kernel="scalar")
+NUMPY_PIPELINE = Pipeline(kernel="numpy")
 
 # ---------------------------------------------------------------------
 # Sélection automatique du chargeur selon la masse du tracteur
 # ---------------------------------------------------------------------
 
 def select_loader_name(tractor_mass):
-    if tractor_mass < 4300:
-        return "FL3817"
-    elif tractor_mass < 5300:
-        return "FL4121"
-    elif tractor_mass < 7000:
-        return "FL4220"
-    elif tractor_mass < 9000:
-        return "FL4621"
-    elif tractor_mass < 11000:
-        return "FL4722"
-    else:
-        return "FL5033"
+    """
+    Chargeur de série selon la masse du tracteur.
+    Seuils lus dans loaders/*.json ("tractor_mass_max"), cf. loader_registry.
+    """
+    return default_registry().select_name(tractor_mass)
+
+
+def resolve_loader(tractor, options):
+    """
+    Détermine le chargeur effectivement utilisé :
+        - chargeur désactivé        → None
+        - chargeur choisi (options) → options["loader"]
+        - "Auto"                    → select_loader_name(masse tracteur)
+
+    Les chargeurs viennent du registre partagé (loader_registry) :
+    aucune lecture de fichier à chaque appel.
+    """
+
+    # Si le chargeur est désactivé → aucun chargeur
+    if not options.get("loader_enabled", False):
+        log.debug("Chargeur désactivé.")
+        return None
+
+    # loader vient de l’interface
+    loader = options.get("loader", None)
+
+    # Si l’interface a choisi "Auto"
+    if loader is None:
+        tractor_mass = tractor.get("mass", 0)
+        loader_name = select_loader_name(tractor_mass)
+        log.debug("Chargeur AUTO sélectionné : %s", loader_name)
+
+        loader = default_registry().get(loader_name)
+        if loader is None:
+            log.warning("Chargeur '%s' introuvable dans loaders/", loader_name)
+
+    return loader
 
 
 # -----------------------------------------------------------
 # SOLVER PRINCIPAL
 # -----------------------------------------------------------
 
-def solve(tractor, machine, loader, tires, options, env):
+def solve(tractor, machine, loader, tires, options, env, kernel="auto"):
     """
     Entrées :
         tractor : JSON tracteur
         machine : JSON machine arrière
         loader  : JSON chargeur frontal
         tires   : dictionnaire pneus (global)
-        options : masses etc. + loader_mode ("low"/"high")
+        options : masses etc. + loader_mode ("low"/"high"),
+                  loader_lift (levage continu, 0..1), loader_payload (kg)
         env     : paramètres environnementaux :
                     - slope_lat
                     - slope_long
                     - speed           (m/s)
                     - turn_radius     (m)
                     - accel_long      (m/s²)
+        kernel  : "auto"   → pipeline mémoïsé, noyau scalaire (défaut)
+                  "scalar" → noyau scalaire, sans cache
+                  "numpy"  → pipeline mémoïsé, noyau NumPy
 
-    Sortie : dictionnaire complet :
+    Sortie : dictionnaire complet, un bloc par cas de charge
+    (transport, work + poses nommées, cf. compiled.load_cases) :
         {
-            "CG": {transport, work},
+            "cases": ["transport", "work", ...],
+            "CG": {transport, work, ...},
             "static": {...},
             "dynamic": {...},
-            "wheels": {...}
+            "wheels": {...},
+            "compatibility_<cas>": [...], "compatibility": [...] (= work)
         }
     """
 
     # ------------------------------------------
     # CHARGEUR AUTOMATIQUE (obligatoire si activé)
     # ------------------------------------------
+    loader = resolve_loader(tractor, options)
 
+    # ------------------------------------------
+    # PIPELINE MÉMOÏSÉ
+    # compile → CG local → rotation → statique / roues
+    #         → dynamique → critères de sécurité (V19)
+    # ------------------------------------------
+    if kernel == "auto":
+        return DEFAULT_PIPELINE.run(tractor, machine, loader, tires, options, env)
+    if kernel == "numpy":
+        return NUMPY_PIPELINE.run(tractor, machine, loader, tires, options, env)
 
-    # Si le chargeur est désactivé → aucun chargeur
-    if not options.get("loader_enabled", False):
-        loader = None
-        print("Chargeur désactivé.")
-
-    else:
-        # loader vient de l’interface
-        loader = options.get("loader", None)
+    # ------------------------------------------
+    # NOYAU SCALAIRE SANS CACHE (référence)
+    # ------------------------------------------
+    cfg = compile_config(tractor, machine, loader, tires, options, kernel=kernel)
+    result = run_scalar(cfg, env)
+    return attach_compatibility(result, lambda: compute_compatibility(
+        cfg, result["CG"], result["static"], result["wheels"]
+    ))
 
-        # Si l’interface a choisi "Auto"
-        if loader is None:
-            tractor_mass = tractor.get("mass", 0)
-            loader_name = select_loader_name(tractor_mass)
-            print(f"Chargeur AUTO sélectionné : {loader_name}")
-
-            loader_path = f"loaders/{loader_name}.json"
-            try:
-                with open(loader_path, "r") as f:
-                    loader = json.load(f)
-            except FileNotFoundError:
-                print(f"⚠ ERREUR : fichier '{loader_path}' introuvable !")
-                loader = None
-     
-    # -----------------------------
-    # 1) CG global (transport + work)
-    # -----------------------------
-    CG_data = compute_global_CG(
-        tractor,
-        machine,
-        loader,
-        tires,
-        options,
-        slope_lat=env.get("slope_lat", 0),
-        slope_long=env.get("slope_long", 0)
-    )
-
-    # -----------------------------
-    # 2) Stabilité statique (PFS)
-    # -----------------------------
-    static = compute_static_stability(
-        tractor,
-        CG_data,
-        slope_lat=env.get("slope_lat", 0),
-        slope_long=env.get("slope_long", 0)
-    )
-
-    # -----------------------------
-    # 3) Stabilité dynamique (PFD)
-    # -----------------------------
-    dynamic = compute_dynamic_stability(
-        tractor,
-        CG_data,
-        static,
-        speed=env.get("speed", 0),
-        turn_radius=env.get("turn_radius", 0),
-        accel_long=env.get("accel_long", 0)
-    )
-
-    # -----------------------------
-    # 4) Charges aux roues
-    # -----------------------------
-    wheels = compute_wheel_loads(
-        tractor,
-        CG_data
-    )
-
-    # -----------------------------
-    # 5) Regroupement final
-    # -----------------------------
-    result = {
-        "CG": CG_data,
-        "static": static,
-        "dynamic": dynamic,
-        "wheels": wheels
-    }
-
-    # ============================================================
-    # 6) Analyse des critères de sécurité (V19)
-    # ============================================================
-    try:
-        from solver_v19.compatibility import check_compatibility
-
-        common = {
-            "machine_mass": machine.get("mass", 0),
-            "tractor_mass": tractor.get("mass", 0),
-            "ptac": tractor.get("ptac", None)
-        }
 
-        compat_work = check_compatibility({
-            **common,
-            "wheels": wheels["work"],
-            "I_lat": static["work"]["I_lat"],
-            "I_long": static["work"]["I_long"],
-            "total_mass": CG_data["work"]["mass_total"],
-        })
-
-        compat_transport = check_compatibility({
-            **common,
-            "wheels": wheels["transport"],
-            "I_lat": static["transport"]["I_lat"],
-            "I_long": static["transport"]["I_long"],
-            "total_mass": CG_data["transport"]["mass_total"],
-        })
-
-        result["compatibility_work"] = compat_work
-        result["compatibility_transport"] = compat_transport
-        result["compatibility"] = compat_work  # rétrocompatibilité
-
-    except Exception as e:
-        print("\n[ERREUR COMPATIBILITE] :", e)
-        result["compatibility_work"] = []
-        result["compatibility_transport"] = []
-        result["compatibility"] = []
-
-    return result
+def pipeline_stats():
+    """Compteurs hits / misses de chaque étape du pipeline par défaut (solve(), kernel="auto")."""
+    return DEFAULT_PIPELINE.stats()
 
@@ -0,0 +1,217 @@
+"""
+stacked.py — Cas de charge empilés (N poses en un seul calcul tableau)
+----------------------------------------------------------------------
+
+Un scénario comporte N cas de charge (transport, work et les poses
+nommées des JSON machine / chargeur, cf. compiled.load_cases). Au lieu
+de N passes sur des dictionnaires, chaque étape traite les N cas en un
+seul calcul sur des tableaux de forme (N,) / (N, 3) :
+
+    CG local              → compute_local_CG_stacked
+    rotation (pente)      → rotate_CG_stacked
+    stabilité statique    → compute_static_stability_stacked
+    charges aux roues     → compute_wheel_loads_stacked
+    stabilité dynamique   → compute_dynamic_stability_stacked
+    critères de sécurité  → compute_compatibility_stacked
+
+Les formules sont celles des versions batch (static_pfs, dynamic_pfd,
+wheels), dans le même ordre d'opérations que cg.compute_local_CG /
+cg.rotate_CG : les résultats sont identiques au bit près à ceux du
+chemin par dictionnaires.
+
+unstack() redonne la structure habituelle de solve() :
+{"CG": {cas: {...}}, "static": {...}, "dynamic": {...}, "wheels": {...}}.
+"""
+
+import numpy as np
+
+from .compatibility import metrics_from
+from .dynamic_pfd import compute_dynamic_stability_batch
+from .geometry import rotation_matrix
+from .rules import STATUS_NA, STATUS_LABELS
+from .static_pfs import compute_static_stability_batch
+from .wheels import wheel_loads_batch
+
+
+# -----------------------------------------------------------
+# CG local et rotation
+# -----------------------------------------------------------
+
+def compute_local_CG_stacked(cfg):
+    """
+    CG local de tous les cas de charge (cfg.cases).
+
+    Retourne {"cases", "mass_total": (N,), "CG_local": (N, 3)}.
+    """
+    masses = np.array([[m for m, _ in cfg.elements[case]] for case in cfg.cases])
+    cgs = np.array([[cg for _, cg in cfg.elements[case]] for case in cfg.cases])
+
+    MT = np.zeros(len(cfg.cases))
+    CG = np.zeros((len(cfg.cases), 3))
+
+    # Élément par élément, comme cg.accumulate_CG (masse ≤ 0 ignorée)
+    for e in range(masses.shape[1]):
+        m = np.where(masses[:, e] > 0, masses[:, e], 0.0)
+        MT = MT + m
+        CG = CG + m[:, None] * cgs[:, e]
+
+    return {"cases": cfg.cases, "mass_total": MT, "CG_local": CG / MT[:, None]}
+
+
+def rotate_CG_stacked(local, slope_lat, slope_long):
+    """Applique la pente aux CG locaux empilés : ajoute "CG_rotated" (N, 3)."""
+    R = rotation_matrix(slope_lat, slope_long)
+    CG = local["CG_local"]
+
+    # Même somme colonne par colonne que cg.rotate_CG
+    CG_rot = R[:, 0] * CG[:, 0:1] + R[:, 1] * CG[:, 1:2] + R[:, 2] * CG[:, 2:3]
+    return {**local, "CG_rotated": CG_rot}
+
+
+# -----------------------------------------------------------
+# Stabilité statique, roues, dynamique
+# -----------------------------------------------------------
+
+def compute_static_stability_stacked(cfg, CG_data, slope_lat, slope_long):
+    """Colonnes de static_pfs.compute_static_stability_batch + risk_direction."""
+    X, Y, Z = CG_data["CG_rotated"].T
+    cols = compute_static_stability_batch(
+        CG_data["mass_total"], X, Y, Z, slope_lat, slope_long,
+        cfg.track_rear, cfg.wheelbase,
+    )
+
+    # Même règle que static_pfs.risk_direction
+    cols["risk_direction"] = np.where(
+        np.abs(Y) > np.abs(X),
+        np.where(Y > 0, "lateral_left", "lateral_right"),
+        np.where(X > 0, "front", "rear"),
+    )
+    return cols
+
+
+def compute_wheel_loads_stacked(cfg, CG_data):
+    """Colonnes FL, FR, RL, RR (kg) de tous les cas."""
+    X, Y, _ = CG_data["CG_rotated"].T
+    return wheel_loads_batch(CG_data["mass_total"], X, Y,
+                             cfg.wheelbase, cfg.track_front, cfg.track_rear)
+
+
+def compute_dynamic_stability_stacked(CG_data, static, speed, turn_radius, accel_long):
+    """Colonnes de dynamic_pfd.compute_dynamic_stability_batch + risk_direction."""
+    cols = compute_dynamic_stability_batch(
+        CG_data["mass_total"], CG_data["CG_rotated"][:, 2], static,
+        speed, turn_radius, accel_long,
+    )
+
+    # Même règle que dynamic_pfd.dynamic_risk_direction
+    cols["risk_direction"] = np.where(
+        np.abs(cols["M_dyn_lat"]) > np.abs(cols["M_dyn_long"]), "lateral", "longitudinal",
+    )
+    return cols
+
+
+# -----------------------------------------------------------
+# Critères de sécurité
+# -----------------------------------------------------------
+
+def compute_compatibility_stacked(cfg, CG_data, static, wheels):
+    """
+    Règles du profil évaluées sur les N cas en un appel, puis rendues
+    par cas (cf. rules.RuleProfile.render).
+
+    Retourne {"compatibility_<cas>": [...], ..., "compatibility": [...] (= work)}.
+    """
+    n = len(CG_data["cases"])
+    evaluation = cfg.profile.evaluate(metrics_from(
+        wheels, static, CG_data["mass_total"],
+        cfg.machine_mass, cfg.tractor_mass, cfg.ptac,
+    ))
+    columns = {key: [np.broadcast_to(v, (n,)) for v in values]
+               for key, values in evaluation.items()}
+
+    result = {}
+    for i, case in enumerate(CG_data["cases"]):
+        criteria = []
+        for r, rule in enumerate(cfg.profile.rules):
+            status = int(columns["status"][r][i])
+            if status == STATUS_NA:
+                continue
+            criteria.append({
+                "name": rule.name,
+                "value": float(columns["value"][r][i]),
+                "limit": float(columns["limit"][r][i]),
+                "status": STATUS_LABELS[status],
+            })
+        result[f"compatibility_{case}"] = criteria
+
+    result["compatibility"] = result["compatibility_work"]
+    return result
+
+
+# -----------------------------------------------------------
+# Retour à la structure par cas de solve()
+# -----------------------------------------------------------
+
+def unstack_CG(CG_data):
+    """{cas: {"mass_total", "CG_local", "CG_rotated", "CG_ground"}}."""
+    return {
+        case: {
+            "mass_total": float(CG_data["mass_total"][i]),
+            "CG_local": CG_data["CG_local"][i],
+            "CG_rotated": CG_data["CG_rotated"][i],
+            "CG_ground": CG_data["CG_rotated"][i, :2].copy(),
+        }
+        for i, case in enumerate(CG_data["cases"])
+    }
+
+
+def unstack_static(cases, cols):
+    """{cas: bloc de static_pfs.compute_static_stability}."""
+    return {
+        case: {
+            "I_lat": cols["I_lat"][i],
+            "I_long": cols["I_long"][i],
+            "I_static": cols["I_static"][i],
+            "distances": {
+                "lat_pure": cols["d_lat"][i],
+                "long_pure": cols["d_long"][i],
+            },
+            "moments": {
+                "M_roll": cols["M_roll"][i],
+                "M_rest_roll": cols["M_rest_roll"][i],
+                "M_pitch": cols["M_pitch"][i],
+                "M_rest_pitch": cols["M_rest_pitch"][i],
+            },
+            "risk_direction": str(cols["risk_direction"][i]),
+        }
+        for i, case in enumerate(cases)
+    }
+
+
+def unstack_dynamic(cases, cols):
+    """{cas: bloc de dynamic_pfd.compute_dynamic_stability}."""
+    n = len(cases)
+    cols = {k: np.broadcast_to(v, (n,)) for k, v in cols.items()}
+    return {
+        case: {
+            "I_lat_dyn": cols["I_lat_dyn"][i],
+            "I_long_dyn": cols["I_long_dyn"][i],
+            "I_dynamic": cols["I_dynamic"][i],
+            "moments_dyn": {
+                "F_lat": cols["F_lat"][i],
+                "F_long": cols["F_long"][i],
+                "M_dyn_lat": cols["M_dyn_lat"][i],
+                "M_dyn_long": cols["M_dyn_long"][i],
+            },
+            "risk_direction": str(cols["risk_direction"][i]),
+        }
+        for i, case in enumerate(cases)
+    }
+
+
+def unstack_wheels(cases, cols):
+    """{cas: {"FL", "FR", "RL", "RR"}}."""
+    return {
+        case: {wheel: cols[wheel][i] for wheel in ("FL", "FR", "RL", "RR")}
+        for i, case in enumerate(cases)
+    }
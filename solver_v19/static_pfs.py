@@ -12,7 +12,6 @@ Calcule pour chaque mode (transport, work) :
 """
 
 import numpy as np
-from .geometry import get_geometry
 
 
 # -----------------------------------------------------------
@@ -114,21 +113,21 @@ def risk_direction(CG_ground):
 # FONCTION PRINCIPALE : STABILITÉ STATIQUE
 # -----------------------------------------------------------
 
-def compute_static_stability(tractor, CG_data, slope_lat, slope_long):
+def compute_static_stability(cfg, CG_data, slope_lat, slope_long):
     """
     Entrée :
-        CG_data = { "transport": {...}, "work": {...} }
+        cfg     = CompiledConfig (géométrie)
+        CG_data = { "transport": {...}, "work": {...}, ... }
 
     Sortie :
-        { "transport": {...}, "work": {...} }
+        { "transport": {...}, "work": {...}, ... }   (un bloc par cas de charge)
     """
 
     results = {}
-    track_rear, wheelbase = get_geometry(tractor)
+    track_rear, wheelbase = cfg.track_rear, cfg.wheelbase
 
-    for mode in ["transport", "work"]:
+    for mode, block in CG_data.items():
 
-        block      = CG_data[mode]
         MT         = block["mass_total"]
         CG_rot     = block["CG_rotated"]
         CG_ground  = block["CG_ground"]
@@ -173,3 +172,47 @@ def compute_static_stability(tractor, CG_data, slope_lat, slope_long):
         }
 
     return results
+
+
+# -----------------------------------------------------------
+# VERSION VECTORISÉE (batch)
+# -----------------------------------------------------------
+
+def static_indices_batch(XG, YG, ZG, track_rear, wheelbase):
+    """Version vectorisée de static_indices()."""
+    I_lat  = 1.0 - (np.abs(YG) / (track_rear / 2.0)) * ZG
+    I_long = 1.0 - (np.abs(XG) / (wheelbase  / 2.0)) * ZG
+    return I_lat, I_long, np.minimum(I_lat, I_long)
+
+
+def compute_static_stability_batch(MT, XG, YG, ZG, slope_lat, slope_long,
+                                   track_rear, wheelbase):
+    """
+    Version vectorisée de compute_static_stability() pour UN mode.
+
+    Entrées : tableaux broadcastables
+        MT         : masse totale
+        XG, YG, ZG : CG après rotation (XG, YG = projection au sol)
+
+    Sortie : dictionnaire de tableaux (indices, distances, moments).
+    """
+    d_lat = (track_rear / 2.0) - np.abs(YG)
+    d_long = np.minimum((wheelbase / 2.0) - XG, XG + (wheelbase / 2.0))
+
+    M_roll, M_rest_roll, M_pitch, M_rest_pitch = static_moments(
+        MT, ZG, slope_lat, slope_long, track_rear, wheelbase
+    )
+
+    I_lat, I_long, I_static = static_indices_batch(XG, YG, ZG, track_rear, wheelbase)
+
+    return {
+        "I_lat":        I_lat,
+        "I_long":       I_long,
+        "I_static":     I_static,
+        "d_lat":        d_lat,
+        "d_long":       d_long,
+        "M_roll":       M_roll,
+        "M_rest_roll":  M_rest_roll,
+        "M_pitch":      M_pitch,
+        "M_rest_pitch": M_rest_pitch,
+    }
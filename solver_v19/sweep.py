@@ -0,0 +1,275 @@
+"""
+sweep.py — Balayage complet du catalogue (tracteurs × machines × pneus)
+-----------------------------------------------------------------------
+
+Deux étapes :
+
+1) compile_catalog()
+   Transforme les dictionnaires JSON (tracteurs, machines, pneus,
+   chargeurs) en tableaux NumPy, UNE SEULE FOIS.
+
+2) sweep_catalog()
+   Évalue le produit croisé complet par broadcasting :
+
+        tracteurs (T, 1, 1)  ×  machines (1, M, 1)  ×  pneus (1, 1, P)
+
+   avec les noyaux vectorisés du solver (cg / static_pfs / dynamic_pfd /
+   wheels / compatibility). Le calcul est découpé par paquets de
+   tracteurs pour borner la mémoire.
+
+Le résultat est une table en colonnes (dict de tableaux 1D, directement
+convertible en DataFrame pandas) :
+
+    tractor, machine, tire          : indices dans catalog["*_keys"]
+    <grandeur>_transport / _work    : I_static, I_dynamic, FL, FR, RL, RR,
+                                      mass_total, status, compatible
+"""
+
+import numpy as np
+
+from .cg import accumulate_CG_batch, local_elements_batch, loader_CG_batch
+from .batch import evaluate_mode_batch, ENV_KEYS, MODES
+from .compatibility import metrics_from, worst_status_batch, STATUS_DANGER
+from .loader import lift_coefficients
+from .loader_registry import default_registry
+from .solver import select_loader_name
+
+
+TABLE_COLUMNS = ("I_static", "I_dynamic", "FL", "FR", "RL", "RR", "mass_total")
+
+
+# -----------------------------------------------------------
+# 1) Compilation du catalogue en tableaux
+# -----------------------------------------------------------
+
+def compile_catalog(tractors: dict, machines: dict, tires: dict, loaders: dict = None):
+    """
+    Entrées :
+        tractors, machines : {clé: JSON}
+        tires              : dictionnaire pneus (data/tires.json)
+        loaders            : {nom: JSON chargeur} (défaut : registre
+                             loader_registry.default_registry())
+
+    Sortie : dict de tableaux
+        tractor_keys / machine_keys / tire_keys : listes de clés
+        tractor_* : une valeur par tracteur
+        machine_* : une valeur par machine (et par mode pour x/y/z_rel)
+        tire_*    : une valeur par pneu
+        loader_*  : chargeur de série de chaque tracteur (NaN si absent)
+    """
+    if loaders is None:
+        loaders = default_registry().loaders
+
+    tractor_keys = list(tractors)
+    machine_keys = list(machines)
+    tire_keys = list(tires)
+
+    T = [tractors[k] for k in tractor_keys]
+    M = [machines[k] for k in machine_keys]
+
+    catalog = {
+        "tractor_keys": tractor_keys,
+        "machine_keys": machine_keys,
+        "tire_keys": tire_keys,
+
+        "tractor_mass":        np.array([float(t["mass"]) for t in T]),
+        "tractor_pct_front":   np.array([t.get("mass_front_pct", 50) / 100.0 for t in T]),
+        "tractor_wheelbase":   np.array([float(t["geometry"]["wheelbase"]) for t in T]),
+        "tractor_track_front": np.array([float(t["geometry"]["track_front"]) for t in T]),
+        "tractor_track_rear":  np.array([float(t["geometry"]["track_rear"]) for t in T]),
+        "tractor_cg_height":   np.array([float(t.get("cg_height_nominal", 1.0)) for t in T]),
+        "tractor_ptac":        np.array([np.nan if t.get("ptac") is None else float(t["ptac"])
+                                         for t in T]),
+        "tractor_default_tire": np.array([
+            tire_keys.index(t["tire_defaults"]["rear"])
+            if t.get("tire_defaults", {}).get("rear") in tires else -1
+            for t in T
+        ]),
+
+        "machine_mass": np.array([float(m["mass"]) for m in M]),
+
+        "tire_radius": np.array([tires[k]["diameter_mm"] / 2000.0 for k in tire_keys]),
+        "tire_volume": np.array([float(tires[k].get("volume_l", 0.0)) for k in tire_keys]),
+    }
+
+    for mode in MODES:
+        for axis in ("x_rel", "y_rel", "z_rel"):
+            catalog[f"machine_{axis}_{mode}"] = np.array([float(m[mode][axis]) for m in M])
+
+    # Chargeur de série de chaque tracteur
+    loader_fields = {
+        "mass_loader": lambda l: float(l.get("mass_loader", 0.0)),
+        "mass_arms":   lambda l: float(l.get("mass_arms", 0.0)),
+        "kx_arms":     lambda l: l["rules"]["x"]["arms"],
+        "z_arms":      lambda l: l["rules"]["z"]["arms"],
+        "kx_low":      lambda l: l["rules"]["x"]["low"],
+        "kx_high":     lambda l: l["rules"]["x"]["high"],
+        "kz_low":      lambda l: l["rules"]["z"]["k_low"],
+        "kz_high":     lambda l: l["rules"]["z"]["k_high"],
+    }
+    tractor_loaders = [
+        loaders.get(select_loader_name(t.get("mass", 0))) for t in T
+    ]
+    catalog["tractor_loader"] = [
+        select_loader_name(t.get("mass", 0)) if l is not None else None
+        for t, l in zip(T, tractor_loaders)
+    ]
+    for field, get in loader_fields.items():
+        catalog[f"loader_{field}"] = np.array([
+            np.nan if l is None else get(l) for l in tractor_loaders
+        ])
+
+    return catalog
+
+
+def subset_catalog(catalog, tractors=None, machines=None):
+    """
+    Sous-catalogue restreint à des tracteurs / machines (indices dans
+    catalog["tractor_keys"] / ["machine_keys"] ; None = tous). Les pneus
+    sont conservés : les indices de pneu restent valables.
+    """
+    def pick(values, idx):
+        if idx is None:
+            return values
+        if isinstance(values, list):
+            return [values[i] for i in idx]
+        return values[idx]
+
+    tractors = None if tractors is None else np.asarray(tractors, dtype=np.intp)
+    machines = None if machines is None else np.asarray(machines, dtype=np.intp)
+
+    subset = {}
+    for name, values in catalog.items():
+        if name.startswith(("tractor_", "loader_")):
+            subset[name] = pick(values, tractors)
+        elif name.startswith("machine_"):
+            subset[name] = pick(values, machines)
+        else:
+            subset[name] = values
+    return subset
+
+
+# -----------------------------------------------------------
+# 2) Éléments de masse pour un paquet de tracteurs
+# -----------------------------------------------------------
+
+def catalog_elements(catalog, t_slice, mode, options, default_tire=False,
+                     payload=None):
+    """
+    Construit les éléments (m, x, y, z) broadcastables :
+    tracteurs (k,1,1) × machines (1,M,1) × pneus (1,1,P).
+
+    default_tire=True : un seul pneu par tracteur (son pneu arrière de
+    série) → le dernier axe est de taille 1.
+    payload : charge du godet (tableau broadcastable) ; défaut :
+              options["loader_payload"]
+    """
+    def tr(name):
+        return catalog[name][t_slice][:, None, None]
+
+    def ma(name):
+        return catalog[name][None, :, None]
+
+    def ti(name):
+        if default_tire:
+            # Pneu de série absent de tires.json → NaN (résultats NaN)
+            idx = catalog["tractor_default_tire"][t_slice]
+            values = np.where(idx >= 0, catalog[name][idx], np.nan)
+            return values[:, None, None]
+        return catalog[name][None, None, :]
+
+    wheelbase = tr("tractor_wheelbase")
+    track_rear = tr("tractor_track_rear")
+    R_AR = ti("tire_radius")
+
+    loader_el = None
+    if options.get("loader_enabled", False):
+        if np.isnan(catalog["loader_mass_loader"][t_slice]).any():
+            raise ValueError("Chargeur de série introuvable pour au moins un tracteur")
+        rules_x = {"low": tr("loader_kx_low"), "high": tr("loader_kx_high")}
+        rules_z = {"k_low": tr("loader_kz_low"), "k_high": tr("loader_kz_high")}
+        loader_el = loader_CG_batch(
+            tr("loader_mass_loader"), tr("loader_mass_arms"),
+            tr("loader_kx_arms"), tr("loader_z_arms"),
+            *lift_coefficients(rules_x, rules_z, options),
+            wheelbase, R_AR,
+            payload=float(options.get("loader_payload") or 0.0) if payload is None else payload,
+        )
+
+    return local_elements_batch(
+        wheelbase, track_rear, R_AR, ti("tire_volume"), options,
+        tractor={"mass": tr("tractor_mass"), "pct_front": tr("tractor_pct_front"),
+                 "cg_height_nominal": tr("tractor_cg_height")},
+        machine={"mass": ma("machine_mass"),
+                 **{k: ma(f"machine_{k}_{mode}") for k in ("x_rel", "y_rel", "z_rel")}},
+        loader=loader_el,
+    )
+
+
+# -----------------------------------------------------------
+# 3) Balayage du produit croisé
+# -----------------------------------------------------------
+
+def sweep_catalog(catalog, options: dict = None, env: dict = None,
+                  tractor_chunk: int = 8):
+    """
+    Évalue tous les triplets (tracteur, machine, pneu) du catalogue.
+
+    options : masses additionnelles + loader_enabled / loader_mode
+              + rules_profile (mêmes clés que solve(), hors rear_tire —
+              tous les pneus du catalogue sont balayés)
+    env     : slope_lat, slope_long, speed, turn_radius, accel_long
+              (scalaires, communs à toute la table)
+
+    Sortie : table en colonnes (voir l'en-tête du module), ordonnée
+             tracteur → machine → pneu.
+    """
+    options = options or {}
+    env = {k: float((env or {}).get(k, 0.0)) for k in ENV_KEYS}
+
+    n_t = len(catalog["tractor_keys"])
+    n_m = len(catalog["machine_keys"])
+    n_p = len(catalog["tire_keys"])
+
+    table = {
+        "tractor": np.repeat(np.arange(n_t, dtype=np.int32), n_m * n_p),
+        "machine": np.tile(np.repeat(np.arange(n_m, dtype=np.int32), n_p), n_t),
+        "tire":    np.tile(np.arange(n_p, dtype=np.int32), n_t * n_m),
+    }
+    size = n_t * n_m * n_p
+    for mode in MODES:
+        for col in TABLE_COLUMNS:
+            table[f"{col}_{mode}"] = np.empty(size)
+        table[f"status_{mode}"] = np.empty(size, dtype=np.int8)
+        table[f"compatible_{mode}"] = np.empty(size, dtype=bool)
+
+    for start in range(0, n_t, tractor_chunk):
+        t_slice = slice(start, min(start + tractor_chunk, n_t))
+        k = t_slice.stop - t_slice.start
+        shape = (k, n_m, n_p)
+        rows = slice(start * n_m * n_p, t_slice.stop * n_m * n_p)
+
+        wheelbase = catalog["tractor_wheelbase"][t_slice][:, None, None]
+        track_front = catalog["tractor_track_front"][t_slice][:, None, None]
+        track_rear = catalog["tractor_track_rear"][t_slice][:, None, None]
+
+        for mode in MODES:
+            elements = catalog_elements(catalog, t_slice, mode, options)
+            MT, X, Y, Z = accumulate_CG_batch(elements)
+            cols = evaluate_mode_batch(MT, X, Y, Z, env,
+                                       wheelbase, track_front, track_rear)
+
+            status = worst_status_batch(metrics_from(
+                cols, cols, cols["mass_total"],
+                catalog["machine_mass"][None, :, None],
+                catalog["tractor_mass"][t_slice][:, None, None],
+                catalog["tractor_ptac"][t_slice][:, None, None],
+            ), options.get("rules_profile"))
+
+            for col in TABLE_COLUMNS:
+                table[f"{col}_{mode}"][rows] = np.broadcast_to(cols[col], shape).ravel()
+            status = np.broadcast_to(status, shape).ravel()
+            table[f"status_{mode}"][rows] = status
+            table[f"compatible_{mode}"][rows] = status < STATUS_DANGER
+
+    return table
@@ -0,0 +1,190 @@
+"""
+tire_search.py — Choix du pneu arrière (recherche dans data/tires.json)
+-----------------------------------------------------------------------
+
+Le pneu arrière intervient partout :
+
+    - Z tracteur       = R_AR * 1.30           (tractor_CG)
+    - X machine        = -L/2 - R_AR - x_rel   (machine_CG)
+    - Z chargeur       = R_AR + ...            (loader_CG)
+    - lestage à l'eau  = 0.754875 * volume_l   (extra_masses_CG)
+
+search_tires() évalue, pour un couple tracteur + machine, TOUS les pneus
+du catalogue, avec ET sans lestage à l'eau, en une seule passe
+vectorisée :
+
+    pneus (P, 1)  ×  lestage à l'eau (1, 2)
+
+puis classe les résultats :
+
+    1) pire statut de compatibilité (les deux modes) croissant
+    2) marge de stabilité décroissante : I_static minimal des deux modes
+
+Par défaut, seuls les pneus de la même famille de jante que le pneu
+arrière de série du tracteur (tire_defaults.rear) sont retenus : même
+diamètre de jante, en pouces (« 520/85R38 » → 38).
+"""
+
+import re
+
+import numpy as np
+
+from .batch import evaluate_mode, ENV_KEYS
+from .cg import accumulate_CG_batch, local_elements_batch, loader_CG_batch
+from .compatibility import STATUS_DANGER
+from .compiled import compile_config, MODES
+from .loader import lift_coefficients
+from .rules import STATUS_NA, STATUS_LABELS
+from .solver import resolve_loader
+
+
+WATER_STATES = (False, True)
+
+_RIM = re.compile(r"[R\-]\s*(\d+(?:[.,]\d+)?)\s*$")
+
+
+def rim_diameter(reference):
+    """Diamètre de jante (pouces) d'une référence « 520/85R38 » ; None si illisible."""
+    match = _RIM.search(str(reference))
+    if match is None:
+        return None
+    return float(match.group(1).replace(",", "."))
+
+
+def rim_family(tractor, tires):
+    """
+    Pneus du catalogue de même diamètre de jante que le pneu arrière
+    de série du tracteur (liste vide si ce pneu est inconnu).
+    """
+    rim = rim_diameter(tractor.get("tire_defaults", {}).get("rear"))
+    if rim is None:
+        return []
+    return [ref for ref in tires if rim_diameter(ref) == rim]
+
+
+# -----------------------------------------------------------
+# Recherche
+# -----------------------------------------------------------
+
+def search_tires(tractor, machine, loader, tires, options, env,
+                 same_rim=True, candidates=None):
+    """
+    Entrées :
+        tractor, machine, loader, tires, options, env : comme solve()
+                     (options["rear_tire"] et options["water_ballast"]
+                     sont ignorés : ils sont balayés)
+        same_rim   : True → famille de jante du pneu de série (cf.
+                     rim_family ; tous les pneus si le pneu de série est
+                     inconnu)
+        candidates : liste explicite de références (prioritaire)
+
+    Sortie : liste triée (meilleur pneu en tête) de
+        {
+            "tire", "rim", "diameter_mm", "volume_l", "water_ballast",
+            "default":    pneu de série du tracteur,
+            "compatible": aucun critère DANGER (deux modes),
+            "status":     libellé du pire critère,
+            "stability_margin": I_static minimal (transport, work),
+            "I_static_transport", "I_static_work",
+            "I_dynamic_transport", "I_dynamic_work",
+            "failed":     noms des critères DANGER (tous modes)
+        }
+
+    Lève ValueError si la configuration est invalide ou si aucun pneu
+    ne correspond.
+    """
+    if candidates is not None:
+        refs = [ref for ref in candidates if ref in tires]
+        unknown = [ref for ref in candidates if ref not in tires]
+        if unknown:
+            raise ValueError(f"Pneus inconnus : {', '.join(map(str, unknown))}")
+    elif same_rim:
+        refs = rim_family(tractor, tires) or list(tires)
+    else:
+        refs = list(tires)
+    if not refs:
+        raise ValueError("Aucun pneu à évaluer")
+
+    default_rear = tractor.get("tire_defaults", {}).get("rear")
+
+    # Validation + profil + géométrie (le pneu n'est qu'un représentant)
+    base_options = {**options, "rear_tire": refs[0], "water_ballast": False}
+    loader = resolve_loader(tractor, base_options)
+    cfg = compile_config(tractor, machine, loader, tires, base_options)
+    for ref in refs:
+        if not tires[ref].get("diameter_mm", 0) > 0:
+            raise ValueError(f"Pneu '{ref}' : diameter_mm doit être > 0")
+
+    env = {k: float(env.get(k, 0.0)) for k in ENV_KEYS}
+
+    R_AR = np.array([tires[ref]["diameter_mm"] / 2000.0 for ref in refs])[:, None]
+    volume = np.array([float(tires[ref].get("volume_l", 0.0) or 0.0) for ref in refs])[:, None]
+    water = np.array(WATER_STATES)[None, :]
+    shape = (len(refs), len(WATER_STATES))
+
+    wheelbase, track_rear = cfg.wheelbase, cfg.track_rear
+    profile = cfg.profile
+
+    columns = {}
+    worst = np.full(shape, STATUS_NA, dtype=np.int8)
+    failed = np.zeros((len(profile.rules),) + shape, dtype=bool)
+
+    tractor_params = {
+        "mass": cfg.tractor_mass,
+        "pct_front": tractor.get("mass_front_pct", 50) / 100.0,
+        "cg_height_nominal": float(tractor.get("cg_height_nominal", 1.0)),
+    }
+    extras = {**options, "water_ballast": water}
+
+    loader_el = None
+    if cfg.loader is not None:
+        rules_x, rules_z = cfg.loader["rules"]["x"], cfg.loader["rules"]["z"]
+        loader_el = loader_CG_batch(
+            float(cfg.loader.get("mass_loader", 0.0)),
+            float(cfg.loader.get("mass_arms", 0.0)),
+            rules_x["arms"], rules_z["arms"],
+            *lift_coefficients(rules_x, rules_z, options),
+            wheelbase, R_AR,
+            payload=float(options.get("loader_payload") or 0.0),
+        )
+
+    for mode in MODES:
+        pose = machine[mode]
+        machine_params = {
+            "mass": cfg.machine_mass,
+            **{k: float(pose[k]) for k in ("x_rel", "y_rel", "z_rel")},
+        }
+        MT, X, Y, Z = accumulate_CG_batch(local_elements_batch(
+            wheelbase, track_rear, R_AR, volume, extras,
+            tractor_params, machine_params, loader_el,
+        ))
+        cols, statuses = evaluate_mode(cfg, MT, X, Y, Z, env)
+        statuses = np.broadcast_to(statuses, (len(profile.rules),) + shape)
+        worst = np.maximum(worst, statuses.max(axis=0))
+        failed |= statuses == STATUS_DANGER
+
+        for col in ("I_static", "I_dynamic"):
+            columns[f"{col}_{mode}"] = np.broadcast_to(cols[col], shape)
+
+    margin = np.minimum(columns["I_static_transport"], columns["I_static_work"])
+
+    # ----- Résultats triés -----
+    order = sorted(np.ndindex(*shape), key=lambda ij: (worst[ij], -margin[ij]))
+
+    results = []
+    for i, j in order:
+        ref = refs[i]
+        results.append({
+            "tire": ref,
+            "rim": rim_diameter(ref),
+            "diameter_mm": tires[ref]["diameter_mm"],
+            "volume_l": tires[ref].get("volume_l"),
+            "water_ballast": WATER_STATES[j],
+            "default": ref == default_rear,
+            "compatible": bool(worst[i, j] < STATUS_DANGER),
+            "status": STATUS_LABELS.get(int(worst[i, j]), "—"),
+            "stability_margin": float(margin[i, j]),
+            **{col: float(values[i, j]) for col, values in columns.items()},
+            "failed": [rule.name for r, rule in enumerate(profile.rules) if failed[r, i, j]],
+        })
+    return results
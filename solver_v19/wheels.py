@@ -29,7 +29,6 @@ Toutes les charges finales sont retournées en kilogrammes.
 """
 
 import numpy as np
-from .geometry import get_geometry
 
 
 g = 9.81  # gravité
@@ -39,12 +38,12 @@ g = 9.81  # gravité
 # CALCUL POUR UN MODE (transport ou work)
 # -----------------------------------------------------------
 
-def wheel_loads_one_mode(tractor, CG_block):
+def wheel_loads_one_mode(cfg, CG_block):
     """
     Calcule les charges sur les 4 roues pour UN mode.
     Entrée :
-        tractor   : json tracteur (géométrie)
-        CG_block  : données CG du mode ("transport" ou "work")
+        cfg       : CompiledConfig (géométrie)
+        CG_block  : données CG du mode ("transport", "work", ...)
     Sortie :
         dict {"FL", "FR", "RL", "RR"} en kg
     """
@@ -55,8 +54,8 @@ def wheel_loads_one_mode(tractor, CG_block):
     XG, YG = CGg
 
     # ----- Géométrie tracteur -----
-    track_rear, wheelbase = get_geometry(tractor)
-    track_front = tractor["geometry"]["track_front"]
+    track_rear, wheelbase = cfg.track_rear, cfg.wheelbase
+    track_front = cfg.track_front
 
     # ----- Répartition avant/arrière -----
     L = wheelbase
@@ -95,21 +94,45 @@ def wheel_loads_one_mode(tractor, CG_block):
 # CALCUL GLOBAL : TRANSPORT + WORK
 # -----------------------------------------------------------
 
-def compute_wheel_loads(tractor, CG_data):
+def compute_wheel_loads(cfg, CG_data):
     """
-    Calcule les charges aux roues pour les deux modes.
+    Calcule les charges aux roues pour chaque cas de charge.
 
     Entrée :
-        CG_data = { "transport": {...}, "work": {...} }
+        cfg     = CompiledConfig (géométrie)
+        CG_data = { "transport": {...}, "work": {...}, ... }
 
     Sortie :
         {
             "transport": {"FL", "FR", "RL", "RR"},
-            "work":      {"FL", "FR", "RL", "RR"}
+            "work":      {"FL", "FR", "RL", "RR"},
+            ...
         }
     """
 
+    return {mode: wheel_loads_one_mode(cfg, block) for mode, block in CG_data.items()}
+
+
+# -----------------------------------------------------------
+# VERSION VECTORISÉE (batch)
+# -----------------------------------------------------------
+
+def wheel_loads_batch(MT, XG, YG, wheelbase, track_front, track_rear):
+    """
+    Version vectorisée de wheel_loads_one_mode().
+
+    Entrées : tableaux broadcastables (XG, YG = projection au sol)
+    Sortie  : dict {"FL", "FR", "RL", "RR"} de tableaux, en kg
+    """
+    L = wheelbase
+    d_AR = XG + (L / 2)
+
+    R_AV = MT * g * (d_AR / L)
+    R_AR = MT * g - R_AV
+
     return {
-        "transport": wheel_loads_one_mode(tractor, CG_data["transport"]),
-        "work":      wheel_loads_one_mode(tractor, CG_data["work"])
+        "FL": R_AV * (0.5 + YG / track_front) / g,
+        "FR": R_AV * (0.5 - YG / track_front) / g,
+        "RL": R_AR * (0.5 + YG / track_rear) / g,
+        "RR": R_AR * (0.5 - YG / track_rear) / g,
     }
@@ -0,0 +1,158 @@
+"""
+test_route.py — Analyse d'itinéraire sur un MNT synthétique
+-----------------------------------------------------------
+
+MNT écrit dans un dossier temporaire au format `.npy` + sidecar `.json`
+(cf. route.open_dem) : plan incliné montant de 20 % vers le nord,
+z = 0.2·y, orienté nord en haut (dy < 0).
+
+    vers l'est    flanc gauche au nord → slope_lat  = +atan(0.2) ≈ +11.31°,
+                  slope_long = 0
+    vers le nord  avant plus haut      → slope_long = −atan(0.2) ≈ −11.31°,
+                  slope_lat = 0
+    hors raster   statut NA ("—"), grandeurs None
+    arc de cercle rayon de braquage ≈ rayon de l'arc
+
+Lancement :
+    python -m unittest discover -s tests
+"""
+
+import contextlib
+import io
+import json
+import math
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from solver_v19.route import analyze_route, open_dem, turn_radii
+
+
+GRADE = 0.2
+SLOPE = math.degrees(math.atan(GRADE))      # ≈ 11.31°
+
+# Raster 400 × 400 m, pixels de 1 m, coin nord-ouest en (0, 400)
+X0, Y0, SIZE = 0.0, 400.0, 400
+
+
+def _load(directory):
+    return {p.stem: json.loads(p.read_text(encoding="utf-8"))
+            for p in sorted((ROOT / directory).glob("*.json"))}
+
+
+TRACTORS = _load("tractors")
+MACHINES = _load("machines")
+TIRES = json.loads((ROOT / "data" / "tires.json").read_text(encoding="utf-8"))
+
+
+def write_plane(directory):
+    """Plan z = 0.2·y en `.npy` + sidecar `.json` ; chemin du `.npy`."""
+    y = Y0 - (np.arange(SIZE) + 0.5)                 # centres des lignes (nord → sud)
+    z = np.repeat((GRADE * y)[:, None], SIZE, axis=1)
+    path = Path(directory) / "plane.npy"
+    np.save(path, z)
+    path.with_suffix(".json").write_text(json.dumps(
+        {"x0": X0, "y0": Y0, "dx": 1.0, "dy": -1.0, "nodata": -9999.0}))
+    return path
+
+
+class RouteTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.dem_path = write_plane(cls.tmp.name)
+        cls.dem = open_dem(cls.dem_path)
+        cls.tractor = TRACTORS[sorted(TRACTORS)[0]]
+        cls.machine = MACHINES[sorted(MACHINES)[0]]
+        cls.options = {"rear_tire": cls.tractor["tire_defaults"]["rear"]}
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls.dem                                  # libère le memmap avant suppression
+        cls.tmp.cleanup()
+
+    def analyze(self, points, dem=None, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return analyze_route(self.tractor, self.machine, None, TIRES, self.options,
+                                 points, self.dem if dem is None else dem, **kwargs)
+
+    def assertAllClose(self, values, expected, tol=1e-6):
+        values = np.asarray(values, dtype=float)
+        self.assertTrue(np.all(np.isfinite(values)), values)
+        np.testing.assert_allclose(values, expected, atol=tol)
+
+    def test_sidecar(self):
+        self.assertEqual((self.dem.x0, self.dem.y0, self.dem.dx, self.dem.dy),
+                         (X0, Y0, 1.0, -1.0))
+        self.assertAlmostEqual(float(self.dem.elevation([123.4], [234.5])[0]),
+                               GRADE * 234.5, places=3)
+
+    def test_driving_east(self):
+        result = self.analyze([(50, 200), (350, 200)])
+        p = result["points"]
+        self.assertEqual(result["outside_dem"], 0)
+        self.assertAllClose(p["slope_lat"], SLOPE)
+        self.assertAllClose(p["slope_long"], 0.0)
+        self.assertAllClose(p["heading"], 0.0)
+
+    def test_driving_north(self):
+        p = self.analyze([(200, 50), (200, 350)])["points"]
+        self.assertAllClose(p["slope_long"], -SLOPE)
+        self.assertAllClose(p["slope_lat"], 0.0)
+
+    def test_driving_west_and_south(self):
+        # Sens inverse : signes inversés
+        self.assertAllClose(self.analyze([(350, 200), (50, 200)])["points"]["slope_lat"], -SLOPE)
+        self.assertAllClose(self.analyze([(200, 350), (200, 50)])["points"]["slope_long"], SLOPE)
+
+    def test_dem_path(self):
+        # Même résultat en passant le chemin du `.npy` (sidecar relu)
+        a = self.analyze([(50, 200), (350, 200)])
+        b = self.analyze([(50, 200), (350, 200)], dem=str(self.dem_path))
+        self.assertEqual(a, b)
+
+    def test_outside_raster(self):
+        # 300 m dans le raster, 200 m au-delà du bord est (x = 400)
+        result = self.analyze([(100, 200), (600, 200)], step=2.0)
+        p = result["points"]
+        x = np.asarray(p["x"], dtype=float)
+        na = np.array([value is None for value in p["slope_lat"]])
+
+        self.assertEqual(result["outside_dem"], int(na.sum()))
+        self.assertTrue(np.all(na[x > X0 + SIZE]))
+        self.assertFalse(np.any(na[x < X0 + SIZE - 10]))
+        for i in np.flatnonzero(na):
+            self.assertIsNone(p["slope_long"][i])
+            self.assertEqual(p["status"][i], "—")
+            for key, column in p.items():
+                if key.startswith("I_"):
+                    self.assertIsNone(column[i], key)
+        self.assertAllClose([p["slope_lat"][i] for i in np.flatnonzero(~na)], SLOPE)
+
+    def test_turn_radius_on_arc(self):
+        radius = 30.0
+        theta = np.radians(np.arange(0.0, 180.5, 0.5))
+        points = np.column_stack([200 + radius * np.cos(theta), 200 + radius * np.sin(theta)])
+
+        p = self.analyze(points, step=1.0, turn_span=5.0)["points"]
+        interior = np.asarray(p["turn_radius"][10:-10], dtype=float)
+        self.assertAllClose(interior, radius, tol=0.05 * radius)
+
+        x = np.asarray(p["x"], dtype=float)
+        y = np.asarray(p["y"], dtype=float)
+        self.assertAllClose(turn_radii(x, y, 5)[10:-10], radius, tol=0.05 * radius)
+
+    def test_straight_line_has_no_turn(self):
+        x = np.linspace(0.0, 100.0, 51)
+        self.assertTrue(np.all(turn_radii(x, 0.5 * x, 5) == 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
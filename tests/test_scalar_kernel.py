@@ -0,0 +1,187 @@
+"""
+test_scalar_kernel.py — Noyau scalaire ≡ noyau NumPy (au bit près)
+------------------------------------------------------------------
+
+solve(..., kernel="scalar") et solve(..., kernel="numpy") doivent donner
+EXACTEMENT les mêmes résultats (cf. scalar.py) ; le pipeline mémoïsé par
+défaut (kernel="auto") aussi, y compris quand ses étapes sont servies
+depuis le cache.
+
+Scénarios tirés du catalogue (graine fixe) : chargeur automatique ou
+imposé, levage continu et charge du godet, masses additionnelles,
+lestage à l'eau, poses nommées machine et chargeur.
+
+Lancement :
+    python -m unittest discover -s tests
+"""
+
+import contextlib
+import copy
+import io
+import json
+import math
+import random
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from solver_v19.loader_registry import default_registry
+from solver_v19.solver import solve
+
+
+N_SCENARIOS = 1000
+
+
+def _load(directory):
+    return {p.stem: json.loads(p.read_text(encoding="utf-8"))
+            for p in sorted((ROOT / directory).glob("*.json"))}
+
+
+TRACTORS = _load("tractors")
+MACHINES = _load("machines")
+TIRES = json.loads((ROOT / "data" / "tires.json").read_text(encoding="utf-8"))
+
+
+def _with_poses(machine, loader):
+    """Copies avec des poses nommées (aucune n'est déclarée dans le catalogue)."""
+    machine = copy.deepcopy(machine)
+    machine["poses"] = {
+        "work_left": {"x_rel": 1.2, "y_rel": 1.9, "z_rel": 0.6},
+        "headland":  {"x_rel": 0.6, "y_rel": 0.0, "z_rel": 1.4},
+    }
+    loader = copy.deepcopy(loader)
+    loader["poses"] = {
+        "loader_raised": {"loader_mode": "high", "machine": "transport"},
+        "loader_low_work": {"loader_mode": "low", "machine": "work"},
+    }
+    return machine, loader
+
+
+def scenarios(n=N_SCENARIOS, seed=0):
+    """(tractor, machine, options, env) tirés du catalogue."""
+    rng = random.Random(seed)
+    registry = default_registry()
+    loader_names = registry.names()
+    tractor_keys, machine_keys, tire_keys = sorted(TRACTORS), sorted(MACHINES), sorted(TIRES)
+
+    for i in range(n):
+        tractor = TRACTORS[rng.choice(tractor_keys)]
+        machine = MACHINES[rng.choice(machine_keys)]
+        options = {"rear_tire": rng.choice([tractor["tire_defaults"]["rear"],
+                                            rng.choice(tire_keys)])}
+
+        if rng.random() < 0.5:
+            options["loader_enabled"] = True
+            options["loader_mode"] = rng.choice(["low", "high"])
+            if rng.random() < 0.5:
+                options["loader"] = registry.get(rng.choice(loader_names))
+            if rng.random() < 0.4:
+                options["loader_lift"] = rng.choice([0.0, 0.35, 1.0, rng.random()])
+            if rng.random() < 0.4:
+                options["loader_payload"] = rng.choice([0, 250.0, 800.5])
+            loader = options.get("loader") or registry.select(tractor["mass"])
+            if rng.random() < 0.3 and loader is not None:
+                machine, options["loader"] = _with_poses(machine, loader)
+        elif rng.random() < 0.2:
+            machine, _ = _with_poses(machine, registry.get(loader_names[0]))
+
+        if rng.random() < 0.3:
+            options["water_ballast"] = True
+        for key in ("wheel_weight_ARG", "wheel_weight_ARD",
+                    "front_ballast_mass", "rear_ballast_mass"):
+            if rng.random() < 0.4:
+                options[key] = rng.choice([0, 100, 250.5, 800])
+        for key in ("front_ballast_offset", "rear_ballast_offset"):
+            if rng.random() < 0.4:
+                options[key] = rng.choice([0, 0.3, 1.0])
+
+        env = {
+            "slope_lat":   rng.choice([0, 5, rng.uniform(-30, 30)]),
+            "slope_long":  rng.choice([0, -7, rng.uniform(-30, 30)]),
+            "speed":       rng.choice([0, rng.uniform(0, 10)]),
+            "turn_radius": rng.choice([0, rng.uniform(1, 50)]),
+            "accel_long":  rng.choice([0, rng.uniform(-3, 3)]),
+        }
+        yield tractor, machine, options, env
+
+
+def _solve(tractor, machine, options, env, kernel):
+    """solve() silencieux ; une ValueError est retournée comme résultat."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            return solve(tractor, machine, None, TIRES, options, env, kernel=kernel)
+        except ValueError as e:
+            return e
+
+
+def differences(a, b, path=""):
+    """Chemins où a et b diffèrent (flottants comparés au bit près)."""
+    if isinstance(a, dict) or isinstance(b, dict):
+        if not (isinstance(a, dict) and isinstance(b, dict)) or set(a) != set(b):
+            return [path]
+        return [d for k in a for d in differences(a[k], b[k], f"{path}.{k}")]
+    if isinstance(a, (list, tuple, np.ndarray)) or isinstance(b, (list, tuple, np.ndarray)):
+        if len(a) != len(b):
+            return [path]
+        return [d for i, (x, y) in enumerate(zip(a, b)) for d in differences(x, y, f"{path}[{i}]")]
+    if a is None or b is None or isinstance(a, str) or isinstance(b, str):
+        return [] if a == b else [path]
+    x, y = float(a), float(b)
+    if x == y and math.copysign(1.0, x) == math.copysign(1.0, y):
+        return []
+    if math.isnan(x) and math.isnan(y):
+        return []
+    return [f"{path} ({x!r} != {y!r})"]
+
+
+class ScalarKernelTest(unittest.TestCase):
+
+    def assertSameResult(self, a, b):
+        if isinstance(a, Exception) or isinstance(b, Exception):
+            self.assertEqual(repr(a), repr(b))
+            return
+        self.assertEqual(differences(a, b), [])
+
+    def test_scalar_equals_numpy(self):
+        for i, (tractor, machine, options, env) in enumerate(scenarios()):
+            with self.subTest(i=i, tractor=tractor["name"], machine=machine["model"]):
+                self.assertSameResult(_solve(tractor, machine, options, env, "scalar"),
+                                      _solve(tractor, machine, options, env, "numpy"))
+
+    def test_lateral_force_rounding(self):
+        # 8.144269461371094 ** 2 (pow de la libm) diffère d'un ulp du carré NumPy
+        tractor = TRACTORS[sorted(TRACTORS)[0]]
+        machine = MACHINES[sorted(MACHINES)[0]]
+        options = {"rear_tire": tractor["tire_defaults"]["rear"]}
+        env = {"slope_lat": 5, "speed": 8.144269461371094, "turn_radius": 37.685870466769245}
+        self.assertSameResult(_solve(tractor, machine, options, env, "scalar"),
+                              _solve(tractor, machine, options, env, "numpy"))
+
+    def test_auto_equals_scalar(self):
+        # Deux passes : la seconde est servie par les caches du pipeline
+        cases = list(scenarios(n=100, seed=1))
+        for _ in range(2):
+            for i, (tractor, machine, options, env) in enumerate(cases):
+                with self.subTest(i=i):
+                    self.assertSameResult(_solve(tractor, machine, options, env, "auto"),
+                                          _solve(tractor, machine, options, env, "scalar"))
+
+    def test_named_poses_are_solved(self):
+        tractor = TRACTORS[sorted(TRACTORS)[0]]
+        machine, loader = _with_poses(MACHINES[sorted(MACHINES)[0]],
+                                      default_registry().select(tractor["mass"]))
+        options = {"rear_tire": tractor["tire_defaults"]["rear"],
+                   "loader_enabled": True, "loader": loader}
+        result = _solve(tractor, machine, options, {"slope_lat": 10}, "scalar")
+        self.assertEqual(result["cases"], ["transport", "work", "work_left", "headland",
+                                           "loader_raised", "loader_low_work"])
+        self.assertSameResult(result, _solve(tractor, machine, options, {"slope_lat": 10}, "numpy"))
+
+
+if __name__ == "__main__":
+    unittest.main()